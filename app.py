@@ -1,133 +1,1275 @@
-from flask import Flask, request, jsonify, render_template, session, redirect, url_for, flash
+from flask import Flask, Response, request, jsonify, render_template, session, redirect, url_for, flash, g, has_app_context, has_request_context, make_response, send_from_directory
 from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.exceptions import NotFound
+from werkzeug.middleware.proxy_fix import ProxyFix
 from functools import wraps
-import sqlite3, os
+from pathlib import Path
+import sqlite3, os, sys, queue, threading, time, json, base64, csv, io, zipfile, bisect, re, logging, uuid, random, atexit, math, multiprocessing, hashlib, mimetypes, zlib
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from xml.sax.saxutils import escape as xml_escape
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as TempoEsgotado
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
 from datetime import datetime
 
+import brotli
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos, apenas entre threads
+    fcntl = None
+
 app = Flask(__name__)
 app.secret_key = os.getenv("FLASK_SECRET_KEY", "period_grade_system_secret_key")
+app.config['DATABASE'] = os.getenv('DATABASE_PATH', 'alunos.db')
+app.config['DB_POOL'] = os.getenv('DB_POOL', '1') != '0'
+app.config['DB_READ_POOL_SIZE'] = int(os.getenv('DB_READ_POOL_SIZE', '8'))
+# Espera máxima (segundos) por uma conexão de leitura livre; depois disso a requisição recebe 503
+app.config['DB_POOL_TIMEOUT'] = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+app.config['WRITE_QUEUE'] = os.getenv('WRITE_QUEUE', '1') != '0'
+app.config['WRITE_BATCH_SIZE'] = int(os.getenv('WRITE_BATCH_SIZE', '64'))
+app.config['METRICS'] = os.getenv('METRICS', '1') != '0'
+app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+app.config['ACL_TTL'] = float(os.getenv('ACL_TTL', '60'))
+# Intervalo mínimo entre verificações de TableVersions pelos dados de referência
+app.config['REFERENCE_CHECK_SECONDS'] = float(os.getenv('REFERENCE_CHECK_SECONDS', '5'))
+app.config['SLOW_QUERY_MS'] = float(os.getenv('SLOW_QUERY_MS', '100'))
+app.config['SLOW_QUERY_LOG'] = os.getenv('SLOW_QUERY_LOG', 'slow_queries.log')
+app.config['SLOW_QUERY_LOG_BYTES'] = int(os.getenv('SLOW_QUERY_LOG_BYTES', str(5 * 2 ** 20)))
+app.config['SLOW_QUERY_LOG_BACKUPS'] = int(os.getenv('SLOW_QUERY_LOG_BACKUPS', '3'))
+# Login: processos que verificam senhas (0 = na própria thread) e verificações simultâneas aceitas
+app.config['LOGIN_WORKERS'] = int(os.getenv('LOGIN_WORKERS', str(min(4, os.cpu_count() or 1))))
+app.config['LOGIN_MAX_PENDING'] = int(os.getenv('LOGIN_MAX_PENDING', '16'))
+app.config['LOGIN_TIMEOUT'] = float(os.getenv('LOGIN_TIMEOUT', '10'))
+# Bloqueio após falhas seguidas dentro da janela, por usuário e (opcional) por IP. Atrás de um
+# balanceador sem X-Forwarded-For todos os clientes têm o mesmo IP, por isso 0 (desligado) é o padrão
+app.config['LOGIN_MAX_FAILURES'] = int(os.getenv('LOGIN_MAX_FAILURES', '5'))
+app.config['LOGIN_MAX_FAILURES_IP'] = int(os.getenv('LOGIN_MAX_FAILURES_IP', '0'))
+app.config['LOGIN_FAILURE_WINDOW'] = float(os.getenv('LOGIN_FAILURE_WINDOW', '300'))
+app.config['LOGIN_LOCKOUT'] = float(os.getenv('LOGIN_LOCKOUT', '300'))
+# Razão faltas / max_absences a partir da qual a matrícula aparece em /api/periods/<id>/at-risk
+app.config['AT_RISK_MIN_RATIO'] = float(os.getenv('AT_RISK_MIN_RATIO', '0.75'))
+# Streams SSE: limite por processo, eventos pendentes por cliente, heartbeat, leitura
+# de ChangeEvents, duração máxima de um stream e eventos guardados para reconexão
+app.config['STREAM_MAX_CLIENTS'] = int(os.getenv('STREAM_MAX_CLIENTS', '1000'))
+app.config['STREAM_BUFFER'] = int(os.getenv('STREAM_BUFFER', '100'))
+app.config['STREAM_HEARTBEAT'] = float(os.getenv('STREAM_HEARTBEAT', '15'))
+app.config['STREAM_POLL_SECONDS'] = float(os.getenv('STREAM_POLL_SECONDS', '1'))
+app.config['STREAM_MAX_SECONDS'] = float(os.getenv('STREAM_MAX_SECONDS', '600'))
+app.config['STREAM_RETRY_SECONDS'] = float(os.getenv('STREAM_RETRY_SECONDS', '3'))
+app.config['STREAM_HISTORY'] = int(os.getenv('STREAM_HISTORY', '10000'))
+# Saída do build dos arquivos estáticos (gerar_estaticos.py)
+app.config['STATIC_DIST'] = os.getenv('STATIC_DIST', os.path.join(app.static_folder, 'dist'))
+# Compressão das respostas: tamanho mínimo (bytes) e níveis padrão de gzip (1-9) e brotli (0-11)
+app.config['COMPRESS'] = os.getenv('COMPRESS', '1') != '0'
+app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+app.config['COMPRESS_LEVEL_GZIP'] = int(os.getenv('COMPRESS_LEVEL_GZIP', '6'))
+app.config['COMPRESS_LEVEL_BR'] = int(os.getenv('COMPRESS_LEVEL_BR', '4'))
+# Proxies HTTP confiáveis na frente da aplicação: com N > 0, o IP do cliente vem de X-Forwarded-For
+app.config['TRUSTED_PROXY_HOPS'] = int(os.getenv('TRUSTED_PROXY_HOPS', '0'))
+if app.config['TRUSTED_PROXY_HOPS'] > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXY_HOPS'], x_proto=app.config['TRUSTED_PROXY_HOPS'])
+
+# Logs estruturados: as rotas só enfileiram o registro; uma thread de fundo
+# (QueueListener) formata em JSON e escreve na saída
+log = logging.getLogger('aplicacao')
+
+def taxas_amostragem(texto):
+    """'endpoint=taxa,...' -> {endpoint: taxa}"""
+    taxas = {}
+    for item in filter(None, (parte.strip() for parte in texto.split(','))):
+        endpoint, _, taxa = item.partition('=')
+        taxas[endpoint.strip()] = float(taxa)
+    return taxas
+
+app.config['LOG_LEVEL'] = os.getenv('LOG_LEVEL', 'INFO').upper()
+app.config['LOG_FILE'] = os.getenv('LOG_FILE')
+# Fração das requisições de cada rota cujos logs DEBUG/INFO são mantidos (padrão 1)
+app.config['LOG_SAMPLE_RATES'] = taxas_amostragem(os.getenv('LOG_SAMPLE_RATES', ''))
+
+class FormatadorJSON(logging.Formatter):
+    CAMPOS_EXTRAS = ('request_id', 'endpoint', 'method', 'path', 'user_id')
+
+    def format(self, record):
+        registro = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'pid': record.process,
+        }
+        for campo in self.CAMPOS_EXTRAS:
+            valor = getattr(record, campo, None)
+            if valor is not None:
+                registro[campo] = valor
+        if record.exc_info:
+            registro['exc'] = self.formatException(record.exc_info)
+        return json.dumps(registro, ensure_ascii=False, default=str)
+
+class FilaLogHandler(QueueHandler):
+    """QueueHandler que anexa o contexto da requisição e aplica a amostragem por rota.
+
+    Diferente do QueueHandler padrão, não formata a mensagem na thread da
+    requisição: args vão para a fila e a formatação fica com o listener.
+    """
+
+    def prepare(self, record):
+        return record
+
+    def filter(self, record):
+        contexto = g.get('contexto_log') if has_request_context() else None
+        if contexto is not None:
+            amostrado, record.request_id, record.endpoint, record.method, record.path = contexto
+            if not amostrado and record.levelno < logging.WARNING:
+                return False
+            # Lido só aqui: acessar a sessão em toda requisição acrescentaria Vary: Cookie
+            record.user_id = session.get('user_id')
+        return super().filter(record)
+
+ouvinte_logs = None
+
+def configurar_logs():
+    """(Re)criar fila e thread escritora; chamado no import e em cada processo filho após fork"""
+    global ouvinte_logs
+    if ouvinte_logs is not None and ouvinte_logs._thread is not None:
+        ouvinte_logs.stop()
+    if app.config['LOG_FILE']:
+        destino = logging.FileHandler(app.config['LOG_FILE'], encoding='utf-8')
+    else:
+        destino = logging.StreamHandler(sys.stdout)
+    destino.setFormatter(FormatadorJSON())
+    fila = queue.SimpleQueue()
+    # O logger do Flask (exceções não tratadas) passa pela mesma fila
+    for logger in (log, app.logger):
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
+        logger.addHandler(FilaLogHandler(fila))
+        logger.setLevel(app.config['LOG_LEVEL'])
+        logger.propagate = False
+    ouvinte_logs = QueueListener(fila, destino, respect_handler_level=True)
+    ouvinte_logs.start()
+
+def esvaziar_logs():
+    """Escrever tudo o que está na fila (testes e encerramento)"""
+    if ouvinte_logs is not None and ouvinte_logs._thread is not None:
+        ouvinte_logs.stop()
+        ouvinte_logs.start()
+
+configurar_logs()
+atexit.register(lambda: ouvinte_logs._thread is not None and ouvinte_logs.stop())
+if hasattr(os, 'register_at_fork'):
+    # A thread do listener não existe no processo filho (workers do gunicorn)
+    os.register_at_fork(after_in_child=configurar_logs)
+
+@app.before_request
+def identificar_requisicao():
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+    # A decisão de amostragem vale para a requisição inteira
+    taxa = app.config['LOG_SAMPLE_RATES'].get(request.endpoint, 1.0)
+    amostrado = taxa >= 1.0 or random.random() < taxa
+    g.contexto_log = (amostrado, g.request_id, request.endpoint, request.method, request.path)
+
+@app.after_request
+def devolver_request_id(response):
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
+    return response
+
+# Pragmas aplicados a toda conexão aberta pelo pool
+PRAGMAS_CONEXAO = (
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA mmap_size = 268435456',
+    'PRAGMA cache_size = -16000',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA busy_timeout = 5000',
+)
+
+# Contadores de SQL da requisição atual (por thread)
+medicao_sql = threading.local()
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """Cursor que soma o número de consultas e o tempo gasto no SQLite"""
+
+    def execute(self, sql, parametros=()):
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            duracao = time.perf_counter() - inicio
+            registrar_consulta(duracao)
+            if duracao * 1000 >= app.config['SLOW_QUERY_MS']:
+                registrar_consulta_lenta(self.connection, sql, parametros, duracao)
+
+    def executemany(self, sql, parametros):
+        if not isinstance(parametros, (list, tuple)):
+            parametros = list(parametros)
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, parametros)
+        finally:
+            duracao = time.perf_counter() - inicio
+            registrar_consulta(duracao)
+            if duracao * 1000 >= app.config['SLOW_QUERY_MS']:
+                registrar_consulta_lenta(self.connection, sql, parametros[0] if parametros else (), duracao, len(parametros))
+
+def registrar_consulta(duracao):
+    if getattr(medicao_sql, 'ativa', False):
+        medicao_sql.consultas += 1
+        medicao_sql.segundos += duracao
+    elif app.config['METRICS']:
+        # Consultas fora de requisição (fila de escrita, inicialização)
+        metricas.registrar_sql('sem_requisicao', 1, duracao)
+
+# Log de consultas lentas: uma linha JSON por consulta acima de SLOW_QUERY_MS
+log_consultas_lentas = logging.getLogger('consultas_lentas')
+log_consultas_lentas.setLevel(logging.INFO)
+log_consultas_lentas.propagate = False
+planos_capturados = set()
+trava_consultas_lentas = threading.Lock()
+arquivo_consultas_lentas = None
+
+def obter_log_consultas_lentas():
+    """Logger com arquivo rotativo; recriado se SLOW_QUERY_LOG mudar"""
+    global arquivo_consultas_lentas
+    caminho = os.path.abspath(app.config['SLOW_QUERY_LOG'])
+    with trava_consultas_lentas:
+        if arquivo_consultas_lentas is None or arquivo_consultas_lentas.baseFilename != caminho:
+            if arquivo_consultas_lentas is not None:
+                log_consultas_lentas.removeHandler(arquivo_consultas_lentas)
+                arquivo_consultas_lentas.close()
+            arquivo_consultas_lentas = RotatingFileHandler(caminho, maxBytes=app.config['SLOW_QUERY_LOG_BYTES'],
+                                                           backupCount=app.config['SLOW_QUERY_LOG_BACKUPS'], encoding='utf-8')
+            arquivo_consultas_lentas.setFormatter(logging.Formatter('%(message)s'))
+            log_consultas_lentas.addHandler(arquivo_consultas_lentas)
+    return log_consultas_lentas
+
+def formato_parametros(parametros):
+    """Tipos dos parâmetros, sem os valores (que podem conter dados dos alunos)"""
+    if isinstance(parametros, dict):
+        return {nome: type(valor).__name__ for nome, valor in parametros.items()}
+    return [type(valor).__name__ for valor in parametros]
+
+def registrar_consulta_lenta(conn, sql, parametros, duracao, linhas=None):
+    if not app.config['SLOW_QUERY_LOG']:
+        return
+    sql = re.sub(r'\s+', ' ', sql).strip()
+    with trava_consultas_lentas:
+        primeira = sql not in planos_capturados
+        planos_capturados.add(sql)
+    plano = None
+    if primeira:
+        # O plano é capturado só na primeira ocorrência de cada consulta (por processo)
+        try:
+            cursor = conn.cursor(sqlite3.Cursor)
+            plano = [linha[3] for linha in cursor.execute('EXPLAIN QUERY PLAN ' + sql, parametros)]
+        except (sqlite3.Error, ValueError):
+            plano = None
+    registro = {
+        'ts': datetime.now().isoformat(timespec='seconds'),
+        'ms': round(duracao * 1000, 3),
+        'sql': sql,
+        'params': formato_parametros(parametros),
+        # Escritas da fila rodam fora da requisição; a origem vem junto com a tarefa
+        'endpoint': request.endpoint if has_request_context() else getattr(medicao_sql, 'origem', (None, None))[0],
+        'path': request.path if has_request_context() else getattr(medicao_sql, 'origem', (None, None))[1],
+        'pid': os.getpid(),
+    }
+    if linhas is not None:
+        registro['rows'] = linhas
+    if plano is not None:
+        registro['plan'] = plano
+    try:
+        obter_log_consultas_lentas().info(json.dumps(registro, ensure_ascii=False))
+    except OSError:
+        pass
+
+def ler_consultas_lentas():
+    """Resumo do log (arquivos rotacionados incluídos), agrupado por SQL e ordenado pelo tempo total"""
+    caminho = app.config['SLOW_QUERY_LOG']
+    if not caminho:
+        return []
+    arquivos = [f'{caminho}.{i}' for i in range(app.config['SLOW_QUERY_LOG_BACKUPS'], 0, -1)] + [caminho]
+    resumo = {}
+    for arquivo in arquivos:
+        if not os.path.exists(arquivo):
+            continue
+        with open(arquivo, encoding='utf-8') as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    continue
+                item = resumo.setdefault(registro['sql'], {
+                    'sql': registro['sql'], 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'endpoints': set(), 'params': registro.get('params'), 'plan': None, 'last_seen': None
+                })
+                item['count'] += 1
+                item['total_ms'] += registro['ms']
+                item['max_ms'] = max(item['max_ms'], registro['ms'])
+                if registro.get('endpoint'):
+                    item['endpoints'].add(registro['endpoint'])
+                if registro.get('plan'):
+                    item['plan'] = registro['plan']
+                item['last_seen'] = registro['ts']
+    itens = sorted(resumo.values(), key=lambda item: item['total_ms'], reverse=True)
+    for item in itens:
+        item['avg_ms'] = round(item['total_ms'] / item['count'], 3)
+        item['total_ms'] = round(item['total_ms'], 3)
+        item['endpoints'] = sorted(item['endpoints'])
+        # "SCAN (subquery-N)" e "SCAN CONSTANT ROW" não leem tabela
+        item['full_scan'] = any(re.match(r'SCAN (?!\(|CONSTANT ROW)', passo) for passo in item['plan'] or [])
+    return itens
+
+class ConexaoPool(sqlite3.Connection):
+    """Conexão SQLite que volta para o pool quando as rotas chamam close()"""
+    pool = None
+    somente_leitura = False
+    emprestimos = 0
+
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        return self.cursor().executemany(sql, parametros)
+
+    def close(self):
+        if self.pool is None:
+            super().close()
+            return
+        if has_app_context():
+            emprestadas = g.get('conexoes_bd')
+            if emprestadas and self in emprestadas:
+                emprestadas.remove(self)
+        self.pool.devolver(self)
+
+    def fechar(self):
+        super().close()
+
+class TravaEscritor:
+    """Trava de arquivo (flock) que deixa um único processo worker escrever por vez.
+
+    Com vários workers sobre o mesmo arquivo, quem espera fica bloqueado aqui
+    em vez de receber "database is locked" do SQLite ao fim do busy_timeout.
+    """
+
+    def __init__(self, caminho_bd):
+        self.caminho = caminho_bd + '-writer.lock'
+        self._fd = None
+
+    def adquirir(self):
+        if fcntl is None:
+            return
+        if self._fd is None:
+            self._fd = os.open(self.caminho, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    def liberar(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def fechar(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+class PoolEsgotado(Exception):
+    """Nenhuma conexão de leitura ficou livre dentro de DB_POOL_TIMEOUT"""
+
+class PoolConexoes:
+    """Pool de conexões: uma única conexão de escrita e N conexões somente leitura"""
+
+    def __init__(self, caminho, tamanho_leitura=8, cached_statements=256, espera_leitura=10):
+        self.caminho = caminho
+        self.tamanho_leitura = tamanho_leitura
+        self.espera_leitura = espera_leitura
+        self.cached_statements = cached_statements
+        self.pid = os.getpid()
+        self._livres = queue.LifoQueue()
+        self._abertas = 0
+        self._trava = threading.Lock()
+        self._trava_escrita = threading.RLock()
+        self._escritor = TravaEscritor(caminho)
+        self._escrita = None
+        self._arquivo_pronto = False
+        self.dono_escrita = None
+
+    def _preparar_arquivo(self):
+        """Criar o arquivo e ativar o WAL antes da primeira leitura, sem a trava de escrita"""
+        with self._trava:
+            if self._arquivo_pronto:
+                return
+            conn = sqlite3.connect(self.caminho)
+            try:
+                conn.execute('PRAGMA journal_mode = WAL')
+            finally:
+                conn.close()
+            self._arquivo_pronto = True
+
+    def _abrir(self, somente_leitura=False):
+        if somente_leitura:
+            alvo = Path(self.caminho).resolve().as_uri() + '?mode=ro'
+        else:
+            alvo = self.caminho
+        conn = sqlite3.connect(alvo, uri=somente_leitura, factory=ConexaoPool,
+                               check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        conn.row_factory = sqlite3.Row
+        if somente_leitura:
+            # Sem BEGIN implícito: cada SELECT enxerga o último commit
+            conn.isolation_level = None
+        else:
+            conn.execute('PRAGMA journal_mode = WAL')
+        for pragma in PRAGMAS_CONEXAO:
+            conn.execute(pragma)
+        conn.pool = self
+        conn.somente_leitura = somente_leitura
+        return conn
+
+    def escrita(self):
+        """Empresta a conexão de escrita; bloqueia enquanto outra thread ou outro processo escreve"""
+        self._trava_escrita.acquire()
+        try:
+            if self._escrita is None:
+                self._escrita = self._abrir()
+            if self._escrita.emprestimos == 0:
+                self._escritor.adquirir()
+                self.dono_escrita = threading.get_ident()
+        except BaseException:
+            self._trava_escrita.release()
+            raise
+        self._escrita.emprestimos += 1
+        return self._escrita
+
+    def escrevendo_nesta_thread(self):
+        return self._escrita is not None and self._escrita.emprestimos > 0 and self.dono_escrita == threading.get_ident()
+
+    def leitura(self):
+        """Empresta uma conexão somente leitura do pool"""
+        try:
+            conn = self._livres.get_nowait()
+        except queue.Empty:
+            with self._trava:
+                abrir = self._abertas < self.tamanho_leitura
+                if abrir:
+                    self._abertas += 1
+            if abrir:
+                # A conexão de escrita só abre na primeira escrita: workers que apenas
+                # leem não disputam a trava de escrita entre processos
+                if self._escrita is None and not self._arquivo_pronto:
+                    self._preparar_arquivo()
+                conn = self._abrir(somente_leitura=True)
+            else:
+                try:
+                    conn = self._livres.get(timeout=self.espera_leitura)
+                except queue.Empty:
+                    raise PoolEsgotado(f'{self.tamanho_leitura} conexões de leitura ocupadas por mais de {self.espera_leitura:g} s') from None
+        conn.emprestimos = 1
+        return conn
+
+    def devolver(self, conn):
+        if conn.emprestimos <= 0:
+            return
+        conn.emprestimos -= 1
+        if conn.emprestimos == 0 and conn.in_transaction:
+            # Mesmo comportamento de fechar sem commit: descartar a transação
+            conn.rollback()
+        if conn.somente_leitura:
+            self._livres.put(conn)
+            return
+        if conn.emprestimos == 0:
+            self.dono_escrita = None
+            self._escritor.liberar()
+        self._trava_escrita.release()
+
+    def fechar(self):
+        while True:
+            try:
+                self._livres.get_nowait().fechar()
+            except queue.Empty:
+                break
+        if self._escrita is not None:
+            self._escrita.fechar()
+            self._escrita = None
+        self._escritor.fechar()
+        self._abertas = 0
+
+def obter_pool():
+    pool = app.extensions.get('pool_bd')
+    # Depois de um fork (workers do gunicorn) cada processo abre as próprias conexões
+    if pool is None or pool.caminho != app.config['DATABASE'] or pool.pid != os.getpid():
+        if pool is not None and pool.pid == os.getpid():
+            pool.fechar()
+        pool = PoolConexoes(app.config['DATABASE'], app.config['DB_READ_POOL_SIZE'],
+                            espera_leitura=app.config['DB_POOL_TIMEOUT'])
+        app.extensions['pool_bd'] = pool
+    return pool
+
+def fechar_pool():
+    pool = app.extensions.pop('pool_bd', None)
+    if pool is not None and pool.pid == os.getpid():
+        pool.fechar()
+
+class FilaEscrita:
+    """Thread escritora com group commit.
+
+    As funções de escrita enviadas por várias threads são executadas em
+    sequência pela mesma thread; tudo o que estiver na fila entra em uma
+    única transação, com um SAVEPOINT por função para que a falha de uma
+    não desfaça as outras. Cada chamador só recebe o resultado depois do commit.
+    """
+
+    def __init__(self):
+        self._fila = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._trava = threading.Lock()
+        self.lotes = 0
+        self.tarefas = 0
+
+    def _garantir_thread(self):
+        with self._trava:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._fila = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._trabalhar, name='fila-escrita', daemon=True)
+                self._thread.start()
+
+    def executar(self, funcao, *args):
+        self._garantir_thread()
+        futuro = Future()
+        origem = (request.endpoint, request.path) if has_request_context() else (None, None)
+        self._fila.put((funcao, args, futuro, origem))
+        return futuro.result()
+
+    def _trabalhar(self):
+        fila = self._fila
+        while True:
+            lote = [fila.get()]
+            while len(lote) < app.config['WRITE_BATCH_SIZE']:
+                try:
+                    lote.append(fila.get_nowait())
+                except queue.Empty:
+                    break
+            self._executar_lote(lote)
+
+    def _executar_lote(self, lote):
+        try:
+            conn = obter_pool().escrita()
+        except BaseException as e:
+            for _, _, futuro, _ in lote:
+                futuro.set_exception(e)
+            return
+        resultados = []
+        try:
+            cursor = conn.cursor()
+            if not conn.in_transaction:
+                cursor.execute('BEGIN')
+            for funcao, args, futuro, origem in lote:
+                medicao_sql.origem = origem
+                cursor.execute('SAVEPOINT tarefa')
+                try:
+                    resultados.append((futuro, funcao(cursor, *args), None))
+                    cursor.execute('RELEASE tarefa')
+                except Exception as e:
+                    cursor.execute('ROLLBACK TO tarefa')
+                    cursor.execute('RELEASE tarefa')
+                    resultados.append((futuro, None, e))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            resultados = [(futuro, None, e) for _, _, futuro, _ in lote]
+        finally:
+            medicao_sql.origem = (None, None)
+            conn.close()
+        self.lotes += 1
+        self.tarefas += len(lote)
+        for futuro, resultado, erro in resultados:
+            if erro is None:
+                futuro.set_result(resultado)
+            else:
+                futuro.set_exception(erro)
+
+fila_escrita = FilaEscrita()
+
+def executar_escrita(funcao, *args):
+    """Executar `funcao(cursor, *args)` em uma transação de escrita e devolver o resultado.
+
+    Com o pool e a fila ativos, a função roda na thread escritora (group
+    commit). A função não deve chamar commit; exceções chegam ao chamador.
+    """
+    if app.config['DB_POOL'] and app.config['WRITE_QUEUE'] and not obter_pool().escrevendo_nesta_thread():
+        return fila_escrita.executar(funcao, *args)
+    conn = conectar_bd(somente_leitura=False)
+    try:
+        resultado = funcao(conn.cursor(), *args)
+        conn.commit()
+        return resultado
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def conectar_bd(somente_leitura=None):
+    """Obter conexão com o banco.
+
+    Requisições GET recebem uma conexão somente leitura do pool; as demais
+    usam a conexão única de escrita. As conexões emprestadas durante a
+    requisição são devolvidas no teardown, mesmo que a rota não chame close().
+    """
+    if not app.config['DB_POOL']:
+        conn = sqlite3.connect(app.config['DATABASE'], factory=ConexaoPool)
+        conn.row_factory = sqlite3.Row
+        return conn
 
-def conectar_bd():
-    conn = sqlite3.connect('alunos.db')
-    conn.row_factory = sqlite3.Row
+    if somente_leitura is None:
+        somente_leitura = has_request_context() and request.method in ('GET', 'HEAD')
+
+    pool = obter_pool()
+    conn = pool.leitura() if somente_leitura else pool.escrita()
+    if has_app_context():
+        g.setdefault('conexoes_bd', []).append(conn)
     return conn
 
+@app.teardown_appcontext
+def devolver_conexoes(exception=None):
+    for conn in g.pop('conexoes_bd', []):
+        conn.pool.devolver(conn)
+
+# Métricas no formato de texto do Prometheus
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 500)
+
+class Histograma:
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+
+    def observar(self, valor):
+        self.contagens[bisect.bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+
+    def exportar(self, nome, rotulos):
+        linhas = []
+        acumulado = 0
+        for limite, contagem in zip(self.limites + ('+Inf',), self.contagens):
+            acumulado += contagem
+            linhas.append(f'{nome}_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+        linhas.append(f'{nome}_sum{{{rotulos}}} {self.soma:.6f}')
+        linhas.append(f'{nome}_count{{{rotulos}}} {acumulado}')
+        return linhas
+
+class MetricasRequisicoes:
+    """Latência por rota e tempo de SQL por rota, acumulados neste processo"""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.limpar()
+
+    def limpar(self):
+        with self._trava:
+            self.latencia = {}
+            self.consultas_por_requisicao = {}
+            self.respostas = {}
+            self.sql = {}
+
+    def registrar_requisicao(self, endpoint, metodo, status, duracao, consultas, segundos_sql):
+        chave = (endpoint, metodo)
+        with self._trava:
+            if chave not in self.latencia:
+                self.latencia[chave] = Histograma(LIMITES_LATENCIA)
+                self.consultas_por_requisicao[chave] = Histograma(LIMITES_CONSULTAS)
+            self.latencia[chave].observar(duracao)
+            self.consultas_por_requisicao[chave].observar(consultas)
+            self.respostas[chave + (status,)] = self.respostas.get(chave + (status,), 0) + 1
+            self._somar_sql(endpoint, consultas, segundos_sql)
+
+    def registrar_sql(self, endpoint, consultas, segundos):
+        with self._trava:
+            self._somar_sql(endpoint, consultas, segundos)
+
+    def _somar_sql(self, endpoint, consultas, segundos):
+        total = self.sql.setdefault(endpoint, [0, 0.0])
+        total[0] += consultas
+        total[1] += segundos
+
+    def exportar(self):
+        with self._trava:
+            linhas = [
+                '# HELP app_http_request_duration_seconds Latência das requisições por rota.',
+                '# TYPE app_http_request_duration_seconds histogram',
+            ]
+            for (endpoint, metodo), histograma in sorted(self.latencia.items()):
+                linhas += histograma.exportar('app_http_request_duration_seconds', f'endpoint="{endpoint}",method="{metodo}"')
+            linhas += [
+                '# HELP app_http_requests_total Respostas por rota e status.',
+                '# TYPE app_http_requests_total counter',
+            ]
+            for (endpoint, metodo, status), total in sorted(self.respostas.items()):
+                linhas.append(f'app_http_requests_total{{endpoint="{endpoint}",method="{metodo}",status="{status}"}} {total}')
+            linhas += [
+                '# HELP app_sql_queries_per_request Consultas SQL executadas por requisição.',
+                '# TYPE app_sql_queries_per_request histogram',
+            ]
+            for (endpoint, metodo), histograma in sorted(self.consultas_por_requisicao.items()):
+                linhas += histograma.exportar('app_sql_queries_per_request', f'endpoint="{endpoint}",method="{metodo}"')
+            linhas += [
+                '# HELP app_sql_queries_total Consultas SQL executadas por rota.',
+                '# TYPE app_sql_queries_total counter',
+            ]
+            linhas += [f'app_sql_queries_total{{endpoint="{endpoint}"}} {consultas}'
+                       for endpoint, (consultas, _) in sorted(self.sql.items())]
+            linhas += [
+                '# HELP app_sql_duration_seconds_total Tempo gasto no SQLite por rota.',
+                '# TYPE app_sql_duration_seconds_total counter',
+            ]
+            linhas += [f'app_sql_duration_seconds_total{{endpoint="{endpoint}"}} {segundos:.6f}'
+                       for endpoint, (_, segundos) in sorted(self.sql.items())]
+        return '\n'.join(linhas) + '\n'
+
+metricas = MetricasRequisicoes()
+
+@app.before_request
+def iniciar_medicao():
+    if app.config['METRICS']:
+        medicao_sql.ativa = True
+        medicao_sql.consultas = 0
+        medicao_sql.segundos = 0.0
+        medicao_sql.inicio = time.perf_counter()
+
+@app.after_request
+def registrar_medicao(response):
+    if getattr(medicao_sql, 'ativa', False):
+        medicao_sql.ativa = False
+        metricas.registrar_requisicao(
+            request.endpoint or 'nao_encontrado', request.method, response.status_code,
+            time.perf_counter() - medicao_sql.inicio, medicao_sql.consultas, medicao_sql.segundos
+        )
+    return response
+
+@app.teardown_request
+def encerrar_medicao(exception=None):
+    # Requisições que terminaram em exceção não passam pelo after_request
+    medicao_sql.ativa = False
+
 def inicializar_bd():
     """Inicializar banco de dados com nova estrutura do period-grade-system"""
     try:
         conn = conectar_bd()
-        cursor = conn.cursor()
-        
-        # Remover tabelas antigas se existirem
-        cursor.execute('DROP TABLE IF EXISTS module_data')
-        cursor.execute('DROP TABLE IF EXISTS modules')
-        cursor.execute('DROP TABLE IF EXISTS Alunos')
-        
-        # Criar nova estrutura
-        # Tabela Users
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL UNIQUE,
-                password_hash TEXT NOT NULL,
-                role TEXT NOT NULL CHECK (role IN ('admin', 'coordinator', 'professor')),
-                full_name TEXT NOT NULL,
-                email TEXT NOT NULL UNIQUE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Tabela AcademicPeriods
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS AcademicPeriods (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
-                coordinator_id INTEGER NOT NULL,
-                start_date DATE,
-                end_date DATE,
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (coordinator_id) REFERENCES Users(id) ON DELETE CASCADE
-            )
-        ''')
-        
-        # Tabela Students
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Students (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_number TEXT NOT NULL UNIQUE,
-                full_name TEXT NOT NULL,
-                email TEXT,
-                academic_period_id INTEGER NOT NULL,
-                enrollment_date DATE NOT NULL,
-                medical_certificates INTEGER DEFAULT 0,
-                referral_info TEXT,
-                observations TEXT,
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (academic_period_id) REFERENCES AcademicPeriods(id) ON DELETE CASCADE
-            )
-        ''')
-        
-        # Tabela Modules
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Modules (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                code TEXT NOT NULL,
-                professor_id INTEGER NOT NULL,
-                academic_period_id INTEGER NOT NULL,
-                credits INTEGER DEFAULT 4,
-                max_absences INTEGER DEFAULT 10,
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (professor_id) REFERENCES Users(id) ON DELETE CASCADE,
-                FOREIGN KEY (academic_period_id) REFERENCES AcademicPeriods(id) ON DELETE CASCADE,
-                UNIQUE(code, academic_period_id)
-            )
-        ''')
-        
-        # Tabela Enrollments
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Enrollments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id INTEGER NOT NULL,
-                module_id INTEGER NOT NULL,
-                enrollment_date DATE DEFAULT (date('now')),
-                status TEXT DEFAULT 'active' CHECK (status IN ('active', 'dropped', 'completed')),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (student_id) REFERENCES Students(id) ON DELETE CASCADE,
-                FOREIGN KEY (module_id) REFERENCES Modules(id) ON DELETE CASCADE,
-                UNIQUE(student_id, module_id)
-            )
-        ''')
-        
-        # Tabela Grades
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Grades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                enrollment_id INTEGER NOT NULL,
-                tutor_grade REAL DEFAULT 0.0,
-                regular_exam_grade REAL DEFAULT 0.0,
-                makeup_exam_grade REAL DEFAULT 0.0,
-                final_grade REAL DEFAULT 0.0,
-                absences INTEGER DEFAULT 0,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (enrollment_id) REFERENCES Enrollments(id) ON DELETE CASCADE
-            )
-        ''')
-        
-        conn.commit()
-        print("Banco de dados reestruturado com sucesso!")
+        aplicar_migracoes(conn)
+        log.info("Banco de dados reestruturado com sucesso!")
         
         # Popular com dados de exemplo
         popular_dados_exemplo(conn)
         
     except sqlite3.Error as e:
-        print(f"Erro ao inicializar o banco de dados: {e}")
+        log.error("Erro ao inicializar o banco de dados: %s", e)
     finally:
         conn.close()
 
+def aplicar_migracoes(conn):
+    """Aplicar em ordem as migrações ainda não registradas em PRAGMA user_version.
+
+    Cada migração roda na sua própria transação junto com a atualização de
+    user_version, então uma falha no meio não deixa o banco meio migrado.
+    Retorna a versão final do esquema.
+    """
+    versao = conn.execute('PRAGMA user_version').fetchone()[0]
+    for numero, descricao, migracao in MIGRACOES:
+        if numero <= versao:
+            continue
+        cursor = conn.cursor()
+        cursor.execute('BEGIN')
+        try:
+            migracao(cursor)
+            cursor.execute(f'PRAGMA user_version = {numero}')
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        versao = numero
+        log.info("Migração %s aplicada: %s", numero, descricao)
+    return versao
+
+def migracao_esquema_inicial(cursor):
+    """Tabelas do period-grade-system (idempotente para bancos anteriores às migrações)"""
+    # Remover tabelas antigas se existirem. A antiga `modules` fica de fora:
+    # nomes de tabela não diferenciam maiúsculas e o DROP apagaria Modules.
+    cursor.execute('DROP TABLE IF EXISTS module_data')
+    cursor.execute('DROP TABLE IF EXISTS Alunos')
+    
+    # Criar nova estrutura
+    # Tabela Users
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            password_hash TEXT NOT NULL,
+            role TEXT NOT NULL CHECK (role IN ('admin', 'coordinator', 'professor')),
+            full_name TEXT NOT NULL,
+            email TEXT NOT NULL UNIQUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Tabela AcademicPeriods
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS AcademicPeriods (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            coordinator_id INTEGER NOT NULL,
+            start_date DATE,
+            end_date DATE,
+            is_active BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (coordinator_id) REFERENCES Users(id) ON DELETE CASCADE
+        )
+    ''')
+    
+    # Tabela Students
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Students (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_number TEXT NOT NULL UNIQUE,
+            full_name TEXT NOT NULL,
+            email TEXT,
+            academic_period_id INTEGER NOT NULL,
+            enrollment_date DATE NOT NULL,
+            medical_certificates INTEGER DEFAULT 0,
+            referral_info TEXT,
+            observations TEXT,
+            is_active BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (academic_period_id) REFERENCES AcademicPeriods(id) ON DELETE CASCADE
+        )
+    ''')
+    
+    # Tabela Modules
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Modules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            code TEXT NOT NULL,
+            professor_id INTEGER NOT NULL,
+            academic_period_id INTEGER NOT NULL,
+            credits INTEGER DEFAULT 4,
+            max_absences INTEGER DEFAULT 10,
+            is_active BOOLEAN DEFAULT 1,
+            student_count INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (professor_id) REFERENCES Users(id) ON DELETE CASCADE,
+            FOREIGN KEY (academic_period_id) REFERENCES AcademicPeriods(id) ON DELETE CASCADE,
+            UNIQUE(code, academic_period_id)
+        )
+    ''')
+    
+    # Tabela Enrollments
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Enrollments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            module_id INTEGER NOT NULL,
+            enrollment_date DATE DEFAULT (date('now')),
+            status TEXT DEFAULT 'active' CHECK (status IN ('active', 'dropped', 'completed')),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (student_id) REFERENCES Students(id) ON DELETE CASCADE,
+            FOREIGN KEY (module_id) REFERENCES Modules(id) ON DELETE CASCADE,
+            UNIQUE(student_id, module_id)
+        )
+    ''')
+    
+    # Tabela Grades
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Grades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            enrollment_id INTEGER NOT NULL,
+            tutor_grade REAL DEFAULT 0.0,
+            regular_exam_grade REAL DEFAULT 0.0,
+            makeup_exam_grade REAL DEFAULT 0.0,
+            final_grade REAL DEFAULT 0.0,
+            absences INTEGER DEFAULT 0,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (enrollment_id) REFERENCES Enrollments(id) ON DELETE CASCADE
+        )
+    ''')
+
+def migracao_indices(cursor):
+    """Índices para as buscas por professor, coordenador, período e módulo"""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_modules_professor ON Modules(professor_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_modules_period ON Modules(academic_period_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_periods_coordinator ON AcademicPeriods(coordinator_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_enrollments_module ON Enrollments(module_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_students_period ON Students(academic_period_id)')
+
+def migracao_notas_unicas(cursor):
+    """Um único registro de notas por matrícula (mantém o mais recente)"""
+    cursor.execute('''
+        DELETE FROM Grades WHERE id NOT IN (
+            SELECT MAX(id) FROM Grades GROUP BY enrollment_id
+        )
+    ''')
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS ux_grades_enrollment ON Grades(enrollment_id)')
+    cursor.execute('ANALYZE')
+
+def migracao_indices_paginacao(cursor):
+    """Índices na ordem (full_name, id) usada pela paginação por keyset"""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_students_period_name ON Students(academic_period_id, full_name)')
+    cursor.execute('DROP INDEX IF EXISTS idx_students_period')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_name ON Users(full_name)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_modules_created ON Modules(created_at)')
+
+# Tabelas com contador de alterações em TableVersions (base dos ETags das APIs)
+TABELAS_VERSIONADAS = ('Users', 'AcademicPeriods', 'Modules', 'Students', 'Enrollments', 'Grades')
+# Condição dos triggers por linha que um recálculo em lote pode pausar (ver recalcular_notas)
+SEM_PAUSA_SQL = "NOT EXISTS (SELECT 1 FROM TriggerPauses WHERE table_name = '{}')"
+
+def garantir_pausa_triggers(cursor):
+    """Tabela consultada pelos triggers pausáveis: uma linha com o nome da tabela os desliga.
+
+    A linha é gravada e removida dentro da mesma transação de escrita, então
+    nenhuma outra conexão chega a vê-la.
+    """
+    cursor.execute('CREATE TABLE IF NOT EXISTS TriggerPauses (table_name TEXT PRIMARY KEY) WITHOUT ROWID')
+
+def migracao_versoes_tabelas(cursor):
+    """Contador por tabela incrementado por triggers a cada linha inserida, alterada ou excluída.
+
+    Como fica no banco, enxerga as escritas de todos os processos.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS TableVersions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    cursor.executemany('INSERT OR IGNORE INTO TableVersions (table_name) VALUES (?)', [(t,) for t in TABELAS_VERSIONADAS])
+    garantir_pausa_triggers(cursor)
+    for tabela in TABELAS_VERSIONADAS:
+        for operacao in ('INSERT', 'UPDATE', 'DELETE'):
+            # O UPDATE de Grades é pausado nos recálculos em lote, que sobem o contador uma vez no fim
+            quando = f"WHEN {SEM_PAUSA_SQL.format('Grades')}" if (tabela, operacao) == ('Grades', 'UPDATE') else ''
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{tabela.lower()}_{operacao.lower()}_version AFTER {operacao} ON {tabela}
+                {quando}
+                BEGIN
+                    UPDATE TableVersions SET version = version + 1 WHERE table_name = '{tabela}';
+                END
+            ''')
+
+def garantir_contador_matriculas(cursor):
+    """Criar a coluna Modules.student_count e os triggers que a mantêm"""
+    colunas = [coluna['name'] for coluna in cursor.execute('PRAGMA table_info(Modules)')]
+    if 'student_count' not in colunas:
+        cursor.execute('ALTER TABLE Modules ADD COLUMN student_count INTEGER NOT NULL DEFAULT 0')
+        cursor.execute('''
+            UPDATE Modules SET student_count = (
+                SELECT COUNT(*) FROM Enrollments e WHERE e.module_id = Modules.id
+            )
+        ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_enrollments_insert_count AFTER INSERT ON Enrollments
+        BEGIN
+            UPDATE Modules SET student_count = student_count + 1 WHERE id = NEW.module_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_enrollments_delete_count AFTER DELETE ON Enrollments
+        BEGIN
+            UPDATE Modules SET student_count = student_count - 1 WHERE id = OLD.module_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_enrollments_update_count AFTER UPDATE OF module_id ON Enrollments
+        WHEN OLD.module_id <> NEW.module_id
+        BEGIN
+            UPDATE Modules SET student_count = student_count - 1 WHERE id = OLD.module_id;
+            UPDATE Modules SET student_count = student_count + 1 WHERE id = NEW.module_id;
+        END
+    ''')
+
+def migracao_regras_notas(cursor):
+    """Regras de cálculo da nota final por período (sem linha = REGRAS_NOTAS_PADRAO)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS GradingRules (
+            academic_period_id INTEGER PRIMARY KEY,
+            tutor_weight REAL NOT NULL DEFAULT 0.0 CHECK (tutor_weight BETWEEN 0 AND 1),
+            makeup_policy TEXT NOT NULL DEFAULT 'max' CHECK (makeup_policy IN ('max', 'replace', 'none')),
+            absence_grade_cap REAL,
+            rounding_step REAL NOT NULL DEFAULT 0.1 CHECK (rounding_step > 0),
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (academic_period_id) REFERENCES AcademicPeriods(id) ON DELETE CASCADE
+        )
+    ''')
+
+# Faixa do histograma de GradeSummary: a nota final truncada em décimos (0 a 100), de modo
+# que faixa >= 70 equivale a nota >= 7.0; sem nota conta como 0
+FAIXA_NOTA_SQL = 'MAX(0, MIN(100, CAST(COALESCE({}, 0) * 10 + 1e-9 AS INTEGER)))'
+
+def garantir_resumo_notas(cursor):
+    """Criar GradeSummary e os triggers que a mantêm a cada nota gravada.
+
+    GradeSummary guarda, por módulo, quantas notas finais caem em cada décimo
+    de 0 a 10. As análises de notas leem esse histograma em vez de varrer
+    Grades. A exclusão de uma matrícula desconta a nota antes de a linha sumir;
+    uma nota órfã excluída depois não acha a matrícula e não desconta de novo.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS GradeSummary (
+            module_id INTEGER NOT NULL,
+            bucket INTEGER NOT NULL CHECK (bucket BETWEEN 0 AND 100),
+            students INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (module_id, bucket),
+            FOREIGN KEY (module_id) REFERENCES Modules(id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    ''')
+    garantir_pausa_triggers(cursor)
+    faixa_nova, faixa_antiga = FAIXA_NOTA_SQL.format('NEW.final_grade'), FAIXA_NOTA_SQL.format('OLD.final_grade')
+    somar = f'''
+        INSERT INTO GradeSummary (module_id, bucket, students)
+        SELECT module_id, {faixa_nova}, 1 FROM Enrollments WHERE id = NEW.enrollment_id
+        ON CONFLICT(module_id, bucket) DO UPDATE SET students = students + 1;
+    '''
+    descontar = f'''
+        UPDATE GradeSummary SET students = students - 1
+        WHERE module_id = (SELECT module_id FROM Enrollments WHERE id = OLD.enrollment_id) AND bucket = {faixa_antiga};
+    '''
+    cursor.execute(f'CREATE TRIGGER IF NOT EXISTS trg_grades_insert_summary AFTER INSERT ON Grades BEGIN {somar} END')
+    cursor.execute(f'CREATE TRIGGER IF NOT EXISTS trg_grades_delete_summary AFTER DELETE ON Grades BEGIN {descontar} END')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_grades_update_summary AFTER UPDATE OF final_grade, enrollment_id ON Grades
+        WHEN ({faixa_antiga} <> {faixa_nova} OR OLD.enrollment_id <> NEW.enrollment_id) AND {SEM_PAUSA_SQL.format('Grades')}
+        BEGIN {descontar} {somar} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_enrollments_delete_summary BEFORE DELETE ON Enrollments
+        BEGIN
+            UPDATE GradeSummary SET students = students - 1
+            WHERE module_id = OLD.module_id
+              AND bucket = (SELECT {FAIXA_NOTA_SQL.format('final_grade')} FROM Grades WHERE enrollment_id = OLD.id);
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_enrollments_move_summary AFTER UPDATE OF module_id ON Enrollments
+        WHEN OLD.module_id <> NEW.module_id
+        BEGIN
+            UPDATE GradeSummary SET students = students - 1
+            WHERE module_id = OLD.module_id
+              AND bucket = (SELECT {FAIXA_NOTA_SQL.format('final_grade')} FROM Grades WHERE enrollment_id = NEW.id);
+            INSERT INTO GradeSummary (module_id, bucket, students)
+            SELECT NEW.module_id, {FAIXA_NOTA_SQL.format('final_grade')}, 1 FROM Grades WHERE enrollment_id = NEW.id
+            ON CONFLICT(module_id, bucket) DO UPDATE SET students = students + 1;
+        END
+    ''')
+
+def migracao_resumo_notas(cursor):
+    """Histograma de notas finais por módulo, preenchido a partir das notas existentes"""
+    garantir_resumo_notas(cursor)
+    reconstruir_resumo_notas(cursor)
+
+def migracao_pausa_triggers_notas(cursor):
+    """Recriar os triggers de UPDATE em Grades com a condição de pausa"""
+    cursor.execute('DROP TRIGGER IF EXISTS trg_grades_update_version')
+    cursor.execute('DROP TRIGGER IF EXISTS trg_grades_update_summary')
+    migracao_versoes_tabelas(cursor)
+    garantir_resumo_notas(cursor)
+
+# Índice de risco por faltas: uma linha por registro de notas, com a razão faltas / max_absences
+RAZAO_FALTAS_SQL = 'COALESCE({faltas}, 0) * 1.0 / MAX(COALESCE({limite}, 0), 1)'
+
+def gravar_risco_faltas_sql(filtro):
+    """INSERT ... SELECT que grava em AbsenceRisk as linhas de notas que atendem `filtro`.
+
+    Usa ON CONFLICT DO UPDATE e não INSERT OR REPLACE: dentro de um trigger, o
+    OR REPLACE seria trocado pela política do comando que disparou o trigger.
+    """
+    return f'''
+        INSERT INTO AbsenceRisk (enrollment_id, academic_period_id, module_id, student_id, absences, max_absences, ratio)
+        SELECT e.id, m.academic_period_id, m.id, e.student_id, COALESCE(g.absences, 0), m.max_absences,
+               {RAZAO_FALTAS_SQL.format(faltas='g.absences', limite='m.max_absences')}
+        FROM Grades g
+        JOIN Enrollments e ON g.enrollment_id = e.id
+        JOIN Modules m ON e.module_id = m.id
+        WHERE {filtro}
+        ON CONFLICT(enrollment_id) DO UPDATE SET
+            academic_period_id = excluded.academic_period_id,
+            module_id = excluded.module_id,
+            student_id = excluded.student_id,
+            absences = excluded.absences,
+            max_absences = excluded.max_absences,
+            ratio = excluded.ratio;
+    '''
+
+def garantir_risco_faltas(cursor):
+    """Criar AbsenceRisk e os triggers que a mantêm.
+
+    A tabela repete o período, o módulo e o aluno de cada matrícula para que a
+    lista de risco de um período seja lida em ordem por um índice, sem juntar
+    Grades, Enrollments e Modules. Os triggers acompanham as faltas gravadas,
+    a troca de módulo da matrícula e a mudança de max_absences do módulo.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS AbsenceRisk (
+            enrollment_id INTEGER PRIMARY KEY,
+            academic_period_id INTEGER NOT NULL,
+            module_id INTEGER NOT NULL,
+            student_id INTEGER NOT NULL,
+            absences INTEGER NOT NULL,
+            max_absences INTEGER,
+            ratio REAL NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_absence_risk_period ON AbsenceRisk(academic_period_id, ratio, enrollment_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_absence_risk_module ON AbsenceRisk(module_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_absence_risk_student ON AbsenceRisk(student_id)')
+
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_grades_insert_risk AFTER INSERT ON Grades
+        BEGIN {gravar_risco_faltas_sql('g.id = NEW.id')} END
+    ''')
+    # Caso comum, só as faltas mudam: um UPDATE pela chave, sem as junções
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_grades_update_risk AFTER UPDATE OF absences ON Grades
+        WHEN OLD.absences IS NOT NEW.absences AND OLD.enrollment_id = NEW.enrollment_id
+        BEGIN
+            UPDATE AbsenceRisk SET absences = COALESCE(NEW.absences, 0),
+                                   ratio = {RAZAO_FALTAS_SQL.format(faltas='NEW.absences', limite='max_absences')}
+            WHERE enrollment_id = NEW.enrollment_id;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_grades_move_risk AFTER UPDATE OF enrollment_id ON Grades
+        WHEN OLD.enrollment_id <> NEW.enrollment_id
+        BEGIN
+            DELETE FROM AbsenceRisk WHERE enrollment_id = OLD.enrollment_id;
+            {gravar_risco_faltas_sql('g.id = NEW.id')}
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_grades_delete_risk AFTER DELETE ON Grades
+        BEGIN
+            DELETE FROM AbsenceRisk WHERE enrollment_id = OLD.enrollment_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_enrollments_delete_risk AFTER DELETE ON Enrollments
+        BEGIN
+            DELETE FROM AbsenceRisk WHERE enrollment_id = OLD.id;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_enrollments_update_risk AFTER UPDATE OF module_id, student_id ON Enrollments
+        BEGIN {gravar_risco_faltas_sql('e.id = NEW.id')} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_modules_update_risk AFTER UPDATE OF max_absences, academic_period_id ON Modules
+        WHEN OLD.max_absences IS NOT NEW.max_absences OR OLD.academic_period_id <> NEW.academic_period_id
+        BEGIN
+            UPDATE AbsenceRisk SET academic_period_id = NEW.academic_period_id, max_absences = NEW.max_absences,
+                                   ratio = {RAZAO_FALTAS_SQL.format(faltas='absences', limite='NEW.max_absences')}
+            WHERE module_id = NEW.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_modules_delete_risk AFTER DELETE ON Modules
+        BEGIN
+            DELETE FROM AbsenceRisk WHERE module_id = OLD.id;
+        END
+    ''')
+
+def reconstruir_risco_faltas(cursor):
+    """Refazer AbsenceRisk inteira a partir das notas (cargas em lote e reparo)"""
+    cursor.execute('DELETE FROM AbsenceRisk')
+    cursor.execute(gravar_risco_faltas_sql('1'))
+    return cursor.rowcount
+
+def migracao_risco_faltas(cursor):
+    """Índice de risco por faltas, preenchido com as notas existentes"""
+    garantir_risco_faltas(cursor)
+    reconstruir_risco_faltas(cursor)
+
+# Busca textual de alunos: índice FTS5 com o conteúdo lido de Students (content=)
+COLUNAS_BUSCA_ALUNOS = ('full_name', 'student_number', 'email', 'observations', 'referral_info')
+
+def garantir_busca_alunos(cursor):
+    """Criar StudentSearch e os triggers que a mantêm em sincronia com Students.
+
+    O índice não guarda cópia dos textos (tabela de conteúdo externo): os
+    triggers só informam ao FTS5 o que entrou e o que saiu. Acentos são
+    ignorados na busca e prefixos de 2 e 3 letras têm índice próprio.
+    """
+    colunas = ', '.join(COLUNAS_BUSCA_ALUNOS)
+    novos = ', '.join(f'NEW.{coluna}' for coluna in COLUNAS_BUSCA_ALUNOS)
+    antigos = ', '.join(f'OLD.{coluna}' for coluna in COLUNAS_BUSCA_ALUNOS)
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS StudentSearch USING fts5(
+            {colunas}, content='Students', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_students_insert_search AFTER INSERT ON Students
+        BEGIN
+            INSERT INTO StudentSearch (rowid, {colunas}) VALUES (NEW.id, {novos});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_students_delete_search AFTER DELETE ON Students
+        BEGIN
+            INSERT INTO StudentSearch (StudentSearch, rowid, {colunas}) VALUES ('delete', OLD.id, {antigos});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_students_update_search AFTER UPDATE OF {colunas} ON Students
+        BEGIN
+            INSERT INTO StudentSearch (StudentSearch, rowid, {colunas}) VALUES ('delete', OLD.id, {antigos});
+            INSERT INTO StudentSearch (rowid, {colunas}) VALUES (NEW.id, {novos});
+        END
+    ''')
+
+def reconstruir_busca_alunos(cursor):
+    """Refazer o índice FTS5 a partir de Students (cargas em lote e reparo)"""
+    cursor.execute("INSERT INTO StudentSearch (StudentSearch) VALUES ('rebuild')")
+
+def migracao_busca_alunos(cursor):
+    """Índice FTS5 dos alunos, preenchido com os alunos existentes"""
+    garantir_busca_alunos(cursor)
+    reconstruir_busca_alunos(cursor)
+
+def migracao_eventos(cursor):
+    """Eventos de alteração por período, lidos pelos streams SSE de todos os workers"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ChangeEvents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            academic_period_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            data TEXT NOT NULL DEFAULT '{}',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_change_events_period ON ChangeEvents(academic_period_id, id)')
+
+# Migrações numeradas: (versão, descrição, função). Novas migrações entram no fim.
+MIGRACOES = [
+    (1, 'Esquema inicial do period-grade-system', migracao_esquema_inicial),
+    (2, 'Contador de alunos por módulo', garantir_contador_matriculas),
+    (3, 'Índices secundários', migracao_indices),
+    (4, 'Registro de notas único por matrícula', migracao_notas_unicas),
+    (5, 'Índices para paginação por nome', migracao_indices_paginacao),
+    (6, 'Contadores de alteração por tabela', migracao_versoes_tabelas),
+    (7, 'Regras de nota final por período', migracao_regras_notas),
+    (8, 'Histograma de notas finais por módulo', migracao_resumo_notas),
+    (9, 'Índice de risco por faltas', migracao_risco_faltas),
+    (10, 'Busca textual de alunos (FTS5)', migracao_busca_alunos),
+    (11, 'Eventos de alteração para os streams SSE', migracao_eventos),
+    (12, 'Pausa dos triggers de notas nos recálculos em lote', migracao_pausa_triggers_notas),
+]
+
 def popular_dados_exemplo(conn):
     """Popular banco com dados de exemplo"""
     cursor = conn.cursor()
@@ -140,7 +1282,7 @@ def popular_dados_exemplo(conn):
         ('prof2', generate_password_hash('prof123'), 'professor', 'Ana Costa Professora', 'ana@escola.com'),
     ]
     
-    print("Inserindo usuários de exemplo...")  # Debug log
+    log.debug("Inserindo usuários de exemplo...")
     
     cursor.executemany('''
         INSERT OR IGNORE INTO Users (username, password_hash, role, full_name, email) 
@@ -150,7 +1292,7 @@ def popular_dados_exemplo(conn):
     # Verificar se os professores foram inseridos
     cursor.execute('SELECT id, username, full_name, role FROM Users WHERE role = "professor"')
     professores_inseridos = cursor.fetchall()
-    print(f"Professores inseridos: {professores_inseridos}")  # Debug log
+    log.debug("Professores inseridos: %s", [dict(row) for row in professores_inseridos])
     
     # Períodos acadêmicos
     periodos = [
@@ -210,7 +1352,6 @@ def popular_dados_exemplo(conn):
     cursor.execute('SELECT id FROM Enrollments')
     enrollments = cursor.fetchall()
     
-    import random
     notas = []
     for enrollment in enrollments:
         tutor = round(random.uniform(5.0, 10.0), 1)
@@ -227,7 +1368,596 @@ def popular_dados_exemplo(conn):
     ''', notas)
     
     conn.commit()
-    print("Dados de exemplo populados com sucesso!")
+    log.info("Dados de exemplo populados com sucesso!")
+
+def matricular_alunos(cursor, periodo_id, modulo_id=None, aluno_id=None, professor_id=None, aluno_id_minimo=None):
+    """Matricular em lote os alunos ativos de um período nos módulos do período.
+
+    Os filtros opcionais restringem a um módulo, a um aluno, aos alunos com id
+    a partir de `aluno_id_minimo` (os recém-importados) ou aos módulos de um
+    professor. Cada matrícula nova recebe um registro de notas zerado.
+    Tudo roda em dois INSERT ... SELECT dentro da transação de quem chama.
+    Retorna o número de matrículas criadas.
+    """
+    filtros = ['s.academic_period_id = ?', 's.is_active = 1']
+    parametros = [periodo_id]
+    if modulo_id is not None:
+        filtros.append('m.id = ?')
+        parametros.append(modulo_id)
+    if aluno_id is not None:
+        filtros.append('s.id = ?')
+        parametros.append(aluno_id)
+    if aluno_id_minimo is not None:
+        filtros.append('s.id >= ?')
+        parametros.append(aluno_id_minimo)
+    if professor_id is not None:
+        filtros.append('m.professor_id = ?')
+        parametros.append(professor_id)
+
+    # Matrículas novas sempre recebem ids maiores que o maior id atual (AUTOINCREMENT)
+    cursor.execute('SELECT COALESCE(MAX(id), 0) AS ultimo FROM Enrollments')
+    ultimo_id = cursor.fetchone()['ultimo']
+
+    cursor.execute(f'''
+        INSERT OR IGNORE INTO Enrollments (student_id, module_id)
+        SELECT s.id, m.id FROM Students s
+        JOIN Modules m ON m.academic_period_id = s.academic_period_id
+        WHERE {' AND '.join(filtros)}
+    ''', parametros)
+    criadas = cursor.rowcount
+
+    if criadas:
+        cursor.execute('''
+            INSERT INTO Grades (enrollment_id, tutor_grade, regular_exam_grade, makeup_exam_grade, final_grade, absences)
+            SELECT id, 0.0, 0.0, 0.0, 0.0, 0 FROM Enrollments WHERE id > ?
+        ''', (ultimo_id,))
+
+    return criadas
+
+# Cache em memória de consultas que dependem de tabelas
+versoes_tabelas = {}
+trava_versoes = threading.Lock()
+
+def registrar_escrita(*tabelas):
+    """Marcar tabelas como alteradas; invalida as entradas de cache que dependem delas"""
+    with trava_versoes:
+        for tabela in tabelas:
+            versoes_tabelas[tabela] = versoes_tabelas.get(tabela, 0) + 1
+    # Eventos gravados junto com a escrita chegam aos streams deste processo sem esperar a próxima leitura
+    difusor.acordar()
+
+def versao_tabelas(tabelas):
+    with trava_versoes:
+        return tuple(versoes_tabelas.get(tabela, 0) for tabela in tabelas)
+
+def versoes_bd(tabelas):
+    """Contadores de TableVersions (mantidos por triggers): enxergam escritas de qualquer processo"""
+    conn = conectar_bd(somente_leitura=True)
+    try:
+        return tuple(sorted(map(tuple, conn.execute(
+            f"SELECT table_name, version FROM TableVersions WHERE table_name IN ({','.join('?' * len(tabelas))})",
+            tabelas).fetchall())))
+    finally:
+        conn.close()
+
+class CacheConsultas:
+    """Resultados guardados por chave e válidos enquanto as tabelas de origem não mudarem.
+
+    Por padrão as versões das tabelas são as deste processo (registrar_escrita),
+    que não enxergam escritas de outros workers. Com `versoes_do_banco` a
+    versão vem de TableVersions, ao custo de uma consulta por leitura; com
+    `ttl` (segundos), as entradas expiram e o TTL limita por quanto tempo uma
+    escrita feita por outro worker fica invisível.
+    """
+
+    def __init__(self, nome, ttl=None, versoes_do_banco=False):
+        self.nome = nome
+        self.ttl = ttl
+        self.versoes_do_banco = versoes_do_banco
+        self._entradas = {}
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.tempo_recalculo = 0.0
+
+    def obter(self, chave, tabelas, calcular):
+        # A versão é lida antes do cálculo: uma escrita concorrente força novo cálculo
+        versao = versoes_bd(tabelas) if self.versoes_do_banco else versao_tabelas(tabelas)
+        agora = time.monotonic()
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and entrada[0] == versao and (entrada[2] is None or entrada[2] > agora):
+                self.acertos += 1
+                return entrada[1]
+        inicio = time.perf_counter()
+        valor = calcular()
+        duracao = time.perf_counter() - inicio
+        with self._trava:
+            self.falhas += 1
+            self.tempo_recalculo += duracao
+            self._entradas[chave] = (versao, valor, agora + self.ttl if self.ttl else None)
+        return valor
+
+    def descartar(self, chave):
+        with self._trava:
+            self._entradas.pop(chave, None)
+
+    def limpar(self):
+        with self._trava:
+            self._entradas.clear()
+
+    def estatisticas(self):
+        with self._trava:
+            total = self.acertos + self.falhas
+            return {
+                'entries': len(self._entradas),
+                'hits': self.acertos,
+                'misses': self.falhas,
+                'hit_ratio': self.acertos / total if total else 0.0,
+                'recompute_seconds_total': self.tempo_recalculo,
+                'recompute_seconds_avg': self.tempo_recalculo / self.falhas if self.falhas else 0.0,
+            }
+
+# O dashboard é servido a todos os workers: a versão vem do banco
+cache_dashboard = CacheConsultas('dashboard', versoes_do_banco=True)
+
+# Permissões por usuário: IDs de módulos, períodos, alunos e matrículas acessíveis.
+# Cada papel depende só das tabelas das próprias consultas; uma escrita nelas
+# invalida as entradas do papel, recalculadas uma a uma na próxima requisição
+# de cada usuário (poucas consultas indexadas por usuário ativo)
+cache_acl = CacheConsultas('acl', ttl=app.config['ACL_TTL'])
+TABELAS_ACL = {
+    'professor': ('Modules', 'Enrollments'),
+    'coordinator': ('AcademicPeriods', 'Modules', 'Students'),
+}
+# Versões de TableVersions vistas no último cálculo das permissões de cada usuário
+versoes_acl = {}
+CONSULTAS_ACL = {
+    'professor': {
+        'modulos': 'SELECT id FROM Modules WHERE professor_id = ?',
+        'periodos': 'SELECT DISTINCT academic_period_id FROM Modules WHERE professor_id = ?',
+        'alunos': '''
+            SELECT DISTINCT e.student_id FROM Enrollments e
+            JOIN Modules m ON e.module_id = m.id WHERE m.professor_id = ?
+        ''',
+        'matriculas': '''
+            SELECT e.id FROM Enrollments e
+            JOIN Modules m ON e.module_id = m.id WHERE m.professor_id = ?
+        ''',
+    },
+    'coordinator': {
+        'periodos': 'SELECT id FROM AcademicPeriods WHERE coordinator_id = ?',
+        'modulos': '''
+            SELECT m.id FROM Modules m
+            JOIN AcademicPeriods ap ON m.academic_period_id = ap.id WHERE ap.coordinator_id = ?
+        ''',
+        'alunos': '''
+            SELECT s.id FROM Students s
+            JOIN AcademicPeriods ap ON s.academic_period_id = ap.id WHERE ap.coordinator_id = ?
+        ''',
+    },
+}
+
+def calcular_permissoes(user_role, user_id):
+    conn = conectar_bd(somente_leitura=True)
+    try:
+        return {tipo: frozenset(row[0] for row in conn.execute(sql, (user_id,)))
+                for tipo, sql in CONSULTAS_ACL.get(user_role, {}).items()}
+    finally:
+        conn.close()
+
+def permissoes_usuario():
+    """Conjuntos de IDs que o usuário da sessão pode acessar"""
+    chave = (session.get('user_role'), session.get('user_id'))
+    tabelas = TABELAS_ACL.get(chave[0], ())
+
+    def calcular():
+        # Lida antes das consultas: uma escrita concorrente força nova recarga
+        versoes_acl[chave] = versoes_bd(tabelas)
+        return calcular_permissoes(*chave)
+
+    return cache_acl.obter(chave, tabelas, calcular)
+
+def tem_acesso(tipo, id_recurso):
+    """Verificação O(1): `tipo` é 'modulos', 'periodos', 'alunos' ou 'matriculas' (só professores)"""
+    if id_recurso in permissoes_usuario().get(tipo, ()):
+        return True
+    # Negado pela cópia em cache: a permissão pode ter sido criada em outro
+    # worker. Só recarrega se TableVersions mudou desde o último cálculo; sem
+    # isso a negação custa uma leitura de TableVersions. Revogações esperam o TTL.
+    chave = (session.get('user_role'), session.get('user_id'))
+    tabelas = TABELAS_ACL.get(chave[0])
+    if not tabelas or versoes_acl.get(chave) == versoes_bd(tabelas):
+        return False
+    cache_acl.descartar(chave)
+    return id_recurso in permissoes_usuario().get(tipo, ())
+
+# Dados de referência: professores, coordenadores e períodos ativos
+class DadosReferencia:
+    """Listas pequenas e muito lidas, carregadas uma vez por processo.
+
+    Recarregam quando Users ou AcademicPeriods mudam: na hora para escritas
+    deste processo (registrar_escrita) e, para as de outros workers, pela
+    leitura de TableVersions, feita no máximo a cada REFERENCE_CHECK_SECONDS.
+    Fora isso, servir os dados não custa nenhuma consulta.
+    """
+
+    TABELAS = ('Users', 'AcademicPeriods')
+    nome = 'referencia'
+
+    def __init__(self):
+        self._dados = None
+        self._caminho = None
+        self._versao_local = None
+        self._versao_bd = None
+        self._verificado = 0.0
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.tempo_recalculo = 0.0
+
+    def obter(self):
+        versao_local = versao_tabelas(self.TABELAS)
+        agora = time.monotonic()
+        with self._trava:
+            if (self._dados is not None and self._caminho == app.config['DATABASE'] and versao_local == self._versao_local
+                    and agora - self._verificado < app.config['REFERENCE_CHECK_SECONDS']):
+                self.acertos += 1
+                return self._dados
+            conn = conectar_bd(somente_leitura=True)
+            try:
+                versao_bd = tuple(conn.execute('SELECT table_name, version FROM TableVersions WHERE table_name IN (?, ?) ORDER BY table_name',
+                                               self.TABELAS).fetchall())
+                if self._dados is None or self._caminho != app.config['DATABASE'] or versao_bd != self._versao_bd:
+                    inicio = time.perf_counter()
+                    self._dados = self._carregar(conn)
+                    self.tempo_recalculo += time.perf_counter() - inicio
+                    self.falhas += 1
+                else:
+                    self.acertos += 1
+            finally:
+                conn.close()
+            self._caminho = app.config['DATABASE']
+            self._versao_bd = versao_bd
+            self._versao_local = versao_local
+            self._verificado = agora
+            return self._dados
+
+    def _carregar(self, conn):
+        usuarios = lambda papel: [dict(row) for row in conn.execute(
+            'SELECT id, full_name FROM Users WHERE role = ? ORDER BY full_name', (papel,))]
+        dados = {
+            'professors': usuarios('professor'),
+            'coordinators': usuarios('coordinator'),
+            'periods': [dict(row) for row in conn.execute('SELECT * FROM AcademicPeriods WHERE is_active = 1 ORDER BY name')],
+        }
+        dados['versao'] = self._resumo(dados)
+        # Corpo do /api/bootstrap já serializado; coordenadores só para o admin
+        dados['bootstrap'] = {}
+        for admin in (False, True):
+            corpo = {chave: dados[chave] for chave in ('professors', 'periods', 'coordinators')[:3 if admin else 2]}
+            dados['bootstrap'][admin] = (self._resumo(corpo), app.json.dumps(corpo))
+        return dados
+
+    @staticmethod
+    def _resumo(valor):
+        return hashlib.blake2b(json.dumps(valor, sort_keys=True, default=str).encode(), digest_size=12).hexdigest()
+
+    def limpar(self):
+        with self._trava:
+            self._dados = None
+
+    def estatisticas(self):
+        with self._trava:
+            total = self.acertos + self.falhas
+            return {
+                'entries': int(self._dados is not None),
+                'hits': self.acertos,
+                'misses': self.falhas,
+                'hit_ratio': self.acertos / total if total else 0.0,
+                'recompute_seconds_total': self.tempo_recalculo,
+                'recompute_seconds_avg': self.tempo_recalculo / self.falhas if self.falhas else 0.0,
+            }
+
+dados_referencia = DadosReferencia()
+
+def url_bootstrap():
+    """URL versionada do /api/bootstrap: muda quando os dados mudam, então pode ficar em cache"""
+    versao, _ = dados_referencia.obter()['bootstrap'][session.get('user_role') == 'admin']
+    return url_for('api_bootstrap', v=versao)
+
+@app.context_processor
+def injetar_url_bootstrap():
+    return {'url_bootstrap': url_bootstrap}
+
+# Arquivos estáticos versionados: gerar_estaticos.py grava em STATIC_DIST os arquivos
+# minificados com o hash do conteúdo no nome, as versões .gz/.br e o manifest.json
+CODIFICACOES_ESTATICOS = (('br', '.br'), ('gzip', '.gz'))
+_manifesto_estaticos = (None, {})
+
+def manifesto_estaticos():
+    """{nome original: nome versionado} do último build; relido quando o manifest.json muda"""
+    global _manifesto_estaticos
+    caminho = os.path.join(app.config['STATIC_DIST'], 'manifest.json')
+    try:
+        estado = os.stat(caminho)
+    except FileNotFoundError:
+        return {}
+    chave = (caminho, estado.st_mtime_ns, estado.st_size)
+    if _manifesto_estaticos[0] != chave:
+        with open(caminho, encoding='utf-8') as arquivo:
+            _manifesto_estaticos = (chave, json.load(arquivo))
+    return _manifesto_estaticos[1]
+
+def url_estatico(filename):
+    """url_for('static') com o nome versionado do build; sem build, o arquivo original"""
+    versionado = manifesto_estaticos().get(filename)
+    if versionado is None:
+        return url_for('static', filename=filename)
+    return url_for('estatico_versionado', filename=versionado)
+
+@app.context_processor
+def injetar_url_estatico():
+    return {'url_estatico': url_estatico}
+
+@app.route('/static/dist/<path:filename>')
+def estatico_versionado(filename):
+    """Arquivo do build, pré-comprimido conforme o Accept-Encoding.
+
+    O nome muda quando o conteúdo muda, então o navegador guarda o arquivo
+    por um ano sem revalidar.
+    """
+    if filename not in manifesto_estaticos().values():
+        raise NotFound()
+    diretorio = app.config['STATIC_DIST']
+    tipo = mimetypes.guess_type(filename)[0]
+    for codificacao, extensao in CODIFICACOES_ESTATICOS:
+        if request.accept_encodings[codificacao] and os.path.isfile(os.path.join(diretorio, filename + extensao)):
+            resposta = send_from_directory(diretorio, filename + extensao, mimetype=tipo)
+            resposta.headers['Content-Encoding'] = codificacao
+            break
+    else:
+        resposta = send_from_directory(diretorio, filename, mimetype=tipo)
+    resposta.vary.add('Accept-Encoding')
+    resposta.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return resposta
+
+def responder_referencia(valor, versao):
+    """JSON com ETag `versao`; If-None-Match igual recebe 304"""
+    resposta = jsonify(valor)
+    resposta.set_etag(versao, weak=True)
+    resposta.headers['Cache-Control'] = 'private, no-cache'
+    return resposta.make_conditional(request)
+
+CACHES = {cache_dashboard.nome: cache_dashboard, cache_acl.nome: cache_acl, dados_referencia.nome: dados_referencia}
+
+# Compressão das respostas (gzip ou brotli, conforme o Accept-Encoding)
+TIPOS_COMPRIMIVEIS = frozenset(('application/json', 'text/html', 'text/csv', 'text/plain'))
+
+def compressao(gzip=None, br=None, ativa=True):
+    """Níveis de compressão da rota no lugar de COMPRESS_LEVEL_GZIP (1-9) e COMPRESS_LEVEL_BR (0-11);
+    ativa=False deixa as respostas da rota sem compressão"""
+    def decorator(f):
+        f.compressao = {'gzip': gzip, 'br': br, 'ativa': ativa}
+        return f
+    return decorator
+
+def compressor(codificacao, nivel):
+    """(comprimir, finalizar) de um compressor incremental de `codificacao`"""
+    if codificacao == 'br':
+        objeto = brotli.Compressor(quality=nivel)
+        return objeto.process, objeto.finish
+    objeto = zlib.compressobj(nivel, zlib.DEFLATED, 31)  # wbits 31: formato gzip
+    return objeto.compress, objeto.flush
+
+class CompressaoRespostas:
+    """Comprime as respostas e conta, por codificação, bytes antes e depois e o tempo gasto.
+
+    Respostas inteiras abaixo de COMPRESS_MIN_SIZE ficam como estão; as em
+    streaming (gerador) são comprimidas pedaço a pedaço, sem juntar o corpo.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        # codificação -> [respostas, bytes antes, bytes depois, segundos]
+        self._contadores = {'br': [0, 0, 0, 0.0], 'gzip': [0, 0, 0, 0.0]}
+
+    def aplicar(self, response):
+        if (not app.config['COMPRESS'] or request.method == 'HEAD' or response.status_code < 200
+                or response.status_code in (204, 206, 304) or response.direct_passthrough
+                or 'Content-Encoding' in response.headers or response.mimetype not in TIPOS_COMPRIMIVEIS):
+            return response
+        ajustes = getattr(app.view_functions.get(request.endpoint), 'compressao', None) or {}
+        if not ajustes.get('ativa', True):
+            return response
+        response.vary.add('Accept-Encoding')
+        qualidade_br, qualidade_gzip = request.accept_encodings['br'], request.accept_encodings['gzip']
+        if not (qualidade_br or qualidade_gzip):
+            return response
+        codificacao = 'br' if qualidade_br >= qualidade_gzip else 'gzip'
+        nivel = ajustes.get(codificacao)
+        if nivel is None:
+            nivel = app.config['COMPRESS_LEVEL_BR' if codificacao == 'br' else 'COMPRESS_LEVEL_GZIP']
+
+        if response.is_streamed:
+            response.response = self._comprimir_partes(response.response, codificacao, nivel)
+            response.headers.pop('Content-Length', None)
+        else:
+            dados = response.get_data()
+            if len(dados) < app.config['COMPRESS_MIN_SIZE']:
+                return response
+            inicio = time.perf_counter()
+            comprimir, finalizar = compressor(codificacao, nivel)
+            comprimido = comprimir(dados) + finalizar()
+            self._contar(codificacao, len(dados), len(comprimido), time.perf_counter() - inicio)
+            response.set_data(comprimido)
+        response.headers['Content-Encoding'] = codificacao
+        return response
+
+    def _comprimir_partes(self, partes, codificacao, nivel):
+        comprimir, finalizar = compressor(codificacao, nivel)
+        entrada, saida, segundos = 0, 0, 0.0
+        try:
+            for parte in partes:
+                if isinstance(parte, str):
+                    parte = parte.encode('utf-8')
+                inicio = time.perf_counter()
+                dados = comprimir(parte)
+                segundos += time.perf_counter() - inicio
+                entrada += len(parte)
+                saida += len(dados)
+                if dados:
+                    yield dados
+            inicio = time.perf_counter()
+            dados = finalizar()
+            segundos += time.perf_counter() - inicio
+            saida += len(dados)
+            yield dados
+        finally:
+            # O servidor fecha só o gerador externo; o original pode ter conexões a devolver
+            if hasattr(partes, 'close'):
+                partes.close()
+            self._contar(codificacao, entrada, saida, segundos)
+
+    def _contar(self, codificacao, entrada, saida, segundos):
+        with self._trava:
+            contador = self._contadores[codificacao]
+            contador[0] += 1
+            contador[1] += entrada
+            contador[2] += saida
+            contador[3] += segundos
+
+    def estatisticas(self):
+        with self._trava:
+            return {codificacao: {'responses': respostas, 'bytes_in': entrada, 'bytes_out': saida, 'seconds': segundos}
+                    for codificacao, (respostas, entrada, saida, segundos) in self._contadores.items()}
+
+    def exportar_metricas(self):
+        estatisticas = self.estatisticas()
+        linhas = []
+        for nome, chave, tipo, ajuda in (
+            ('app_compression_responses_total', 'responses', 'counter', 'Respostas comprimidas.'),
+            ('app_compression_bytes_in_total', 'bytes_in', 'counter', 'Bytes das respostas antes da compressão.'),
+            ('app_compression_bytes_out_total', 'bytes_out', 'counter', 'Bytes das respostas depois da compressão.'),
+            ('app_compression_seconds_total', 'seconds', 'counter', 'Tempo gasto comprimindo respostas.'),
+        ):
+            linhas += [f'# HELP {nome} {ajuda}', f'# TYPE {nome} {tipo}']
+            linhas += [f'{nome}{{encoding="{codificacao}"}} {valores[chave]}' for codificacao, valores in estatisticas.items()]
+        return '\n'.join(linhas) + '\n'
+
+compressao_respostas = CompressaoRespostas()
+
+@app.after_request
+def comprimir_resposta(response):
+    return compressao_respostas.aplicar(response)
+
+# Listas grandes: paginação por keyset e JSON em streaming
+LIMITE_PAGINA_MAXIMO = 1000
+
+def codificar_cursor(valores):
+    return base64.urlsafe_b64encode(json.dumps(list(valores)).encode()).decode()
+
+def decodificar_cursor(cursor, tamanho):
+    """Valores do cursor enviado pelo cliente, ou None se não for uma lista de `tamanho` escalares"""
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(valores, list) or len(valores) != tamanho:
+        return None
+    if not all(valor is None or isinstance(valor, (str, int, float)) for valor in valores):
+        return None
+    return valores
+
+def responder_lista(consulta, parametros=(), ordem=('full_name', 'id'), decrescente=False, limite_padrao=None):
+    """Responder com o resultado de `consulta` como array JSON.
+
+    A consulta não deve ter ORDER BY: a ordenação é feita pelas colunas de
+    `ordem`, que também formam a chave da paginação. Parâmetros aceitos:
+
+    - `limit`: tamanho da página (sem ele, `limite_padrao`; None = tudo); o cursor
+      da próxima página vai no header X-Next-Cursor.
+    - `after`: cursor recebido da página anterior.
+    - `stream=1`: escreve o array linha a linha direto do cursor do SQLite; com
+      `limit`, o X-Next-Cursor também é enviado.
+    """
+    limite = request.args.get('limit')
+    if limite is None:
+        limite = limite_padrao
+    else:
+        try:
+            limite = int(limite)
+        except ValueError:
+            limite = 0
+        if limite <= 0:
+            return jsonify({'error': 'Parâmetro limit inválido.'}), 400
+    if limite is not None:
+        limite = min(limite, LIMITE_PAGINA_MAXIMO)
+
+    comparacao = '<' if decrescente else '>'
+    direcao = ' DESC' if decrescente else ''
+    chave = f"({', '.join(ordem)})"
+    marcadores = f"({', '.join('?' * len(ordem))})"
+    condicoes = []
+    parametros = list(parametros)
+
+    after = request.args.get('after')
+    if after:
+        valores = decodificar_cursor(after, len(ordem))
+        if valores is None:
+            return jsonify({'error': 'Cursor de paginação inválido.'}), 400
+        condicoes.append(f'{chave} {comparacao} {marcadores}')
+        parametros.extend(valores)
+
+    def montar(condicoes, limite):
+        sql = f'SELECT * FROM ({consulta})'
+        if condicoes:
+            sql += ' WHERE ' + ' AND '.join(condicoes)
+        sql += ' ORDER BY ' + ', '.join(coluna + direcao for coluna in ordem)
+        if limite is not None:
+            # Uma linha a mais indica se existe próxima página
+            sql += f' LIMIT {limite + 1:d}'
+        return sql
+
+    sql = montar(condicoes, limite)
+
+    if request.args.get('stream') == '1':
+        cabecalhos = {}
+        if limite is not None:
+            # Os headers saem antes do corpo: as chaves da página são lidas primeiro e o
+            # stream vai até a chave do cursor, sem depender de um LIMIT na segunda consulta
+            conn = conectar_bd()
+            chaves = conn.execute(f"SELECT {', '.join(ordem)} FROM ({sql})", parametros).fetchall()
+            conn.close()
+            if len(chaves) > limite:
+                proxima = list(chaves[limite - 1])
+                cabecalhos['X-Next-Cursor'] = codificar_cursor(proxima)
+                sql = montar(condicoes + [f"{chave} {'>=' if decrescente else '<='} {marcadores}"], None)
+                parametros.extend(proxima)
+                limite = None
+        return Response(gerar_json_em_streaming(sql, parametros, limite), mimetype='application/json', headers=cabecalhos)
+
+    conn = conectar_bd()
+    linhas = [dict(row) for row in conn.execute(sql, parametros)]
+    conn.close()
+
+    resposta = jsonify(linhas[:limite] if limite is not None else linhas)
+    if limite is not None and len(linhas) > limite:
+        resposta.headers['X-Next-Cursor'] = codificar_cursor(linhas[limite - 1][coluna] for coluna in ordem)
+    return resposta
+
+def gerar_json_em_streaming(sql, parametros, limite=None):
+    # Fora do contexto da requisição: a conexão é devolvida aqui, não no teardown
+    conn = conectar_bd(somente_leitura=True)
+    try:
+        yield '['
+        for indice, linha in enumerate(conn.execute(sql, parametros)):
+            if limite is not None and indice >= limite:
+                break
+            yield (',' if indice else '') + app.json.dumps(dict(linha))
+        yield ']'
+    finally:
+        conn.close()
 
 # Decoradores para controle de acesso
 def login_required(f):
@@ -254,6 +1984,378 @@ def role_required(required_roles):
         return decorated_function
     return decorator
 
+# Login: o PBKDF2 roda em um pool de processos limitado e falhas seguidas
+# bloqueiam o usuário/IP antes de qualquer hash
+class VerificadorSenhas:
+    """Pool de processos para check_password_hash.
+
+    No máximo LOGIN_MAX_PENDING verificações ficam em andamento ou na fila;
+    acima disso o login é recusado na hora, sem ocupar a thread da requisição
+    esperando. Cada processo do gunicorn cria o próprio pool.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._pid = None
+        self._sem_pool = None  # pid em que o pool não pôde ser iniciado
+        self._trava = threading.Lock()
+        self.pendentes = 0
+        self.recusadas = 0
+
+    def _garantir_pool(self):
+        if self._sem_pool == os.getpid():
+            return None
+        if self._executor is None or self._pid != os.getpid():
+            # spawn: os processos não herdam threads nem conexões do worker
+            self._executor = ProcessPoolExecutor(max_workers=app.config['LOGIN_WORKERS'],
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            self._pid = os.getpid()
+            self.pendentes = 0
+        return self._executor
+
+    def verificar(self, password_hash, senha):
+        """True/False, ou None quando a fila está cheia ou a verificação demorou demais"""
+        if app.config['LOGIN_WORKERS'] <= 0:
+            return check_password_hash(password_hash, senha)
+        with self._trava:
+            executor = self._garantir_pool()
+            if self.pendentes >= app.config['LOGIN_MAX_PENDING']:
+                self.recusadas += 1
+                return None
+            self.pendentes += 1
+        futuro = None
+        try:
+            if executor is not None:
+                try:
+                    futuro = executor.submit(check_password_hash, password_hash, senha)
+                    # A vaga só volta quando a verificação termina de fato, mesmo
+                    # que a requisição desista antes por tempo esgotado
+                    futuro.add_done_callback(self._liberar)
+                    return futuro.result(timeout=app.config['LOGIN_TIMEOUT'])
+                except BrokenProcessPool:
+                    # Um processo do pool morreu: o pool é recriado na próxima verificação
+                    with self._trava:
+                        if self._executor is executor:
+                            self._executor = None
+                except RuntimeError:
+                    # spawn exige a guarda `if __name__ == '__main__'` no script principal
+                    log.warning('Pool de verificação de senhas indisponível; verificando na thread da requisição', exc_info=True)
+                    with self._trava:
+                        self._sem_pool = os.getpid()
+                        self._executor = None
+            return check_password_hash(password_hash, senha)
+        except TempoEsgotado:
+            # Ainda na fila: o cancelamento libera a vaga pelo callback; em
+            # execução, ela continua ocupada até o processo terminar
+            futuro.cancel()
+            return None
+        finally:
+            if futuro is None:
+                self._liberar()
+
+    def _liberar(self, futuro=None):
+        with self._trava:
+            # O contador zera quando o pool é recriado; callbacks do pool antigo não o deixam negativo
+            self.pendentes = max(self.pendentes - 1, 0)
+
+    def fechar(self):
+        with self._trava:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+verificador_senhas = VerificadorSenhas()
+
+class TentativasLogin:
+    """Falhas de login recentes por chave ('usuario', nome) ou ('ip', endereço).
+
+    Ao atingir o limite dentro de LOGIN_FAILURE_WINDOW a chave fica
+    bloqueada por LOGIN_LOCKOUT segundos. Fica em memória, por processo.
+    """
+
+    MAXIMO_CHAVES = 100000
+
+    def __init__(self):
+        self._falhas = {}  # chave -> (falhas, início da janela, bloqueada até)
+        self._trava = threading.Lock()
+
+    def bloqueio(self, chaves):
+        """Segundos restantes do bloqueio mais longo entre as chaves (0 se nenhuma bloqueada)"""
+        agora = time.monotonic()
+        with self._trava:
+            restantes = [self._falhas[chave][2] - agora for chave in chaves if chave in self._falhas]
+        return max(restantes, default=0)
+
+    def registrar_falha(self, chaves):
+        agora = time.monotonic()
+        limites = {'usuario': app.config['LOGIN_MAX_FAILURES'], 'ip': app.config['LOGIN_MAX_FAILURES_IP']}
+        with self._trava:
+            if len(self._falhas) >= self.MAXIMO_CHAVES:
+                self._descartar_expiradas(agora)
+            for chave in chaves:
+                falhas, inicio, bloqueada_ate = self._falhas.get(chave, (0, agora, 0))
+                if agora - inicio > app.config['LOGIN_FAILURE_WINDOW']:
+                    falhas, inicio = 0, agora
+                falhas += 1
+                if falhas >= limites[chave[0]]:
+                    falhas, inicio, bloqueada_ate = 0, agora, agora + app.config['LOGIN_LOCKOUT']
+                    log.warning('Login bloqueado por %.0f s: %s=%s', app.config['LOGIN_LOCKOUT'], *chave)
+                self._falhas[chave] = (falhas, inicio, bloqueada_ate)
+
+    def _descartar_expiradas(self, agora):
+        janela = app.config['LOGIN_FAILURE_WINDOW']
+        for chave, (_, inicio, bloqueada_ate) in list(self._falhas.items()):
+            if bloqueada_ate <= agora and agora - inicio > janela:
+                del self._falhas[chave]
+        # Ainda cheio (muitos usuários diferentes na janela): descartar as mais antigas
+        if len(self._falhas) >= self.MAXIMO_CHAVES:
+            for chave in sorted(self._falhas, key=lambda c: self._falhas[c][1])[:self.MAXIMO_CHAVES // 10]:
+                del self._falhas[chave]
+
+    def limpar(self, *chaves):
+        with self._trava:
+            for chave in chaves or list(self._falhas):
+                self._falhas.pop(chave, None)
+
+tentativas_login = TentativasLogin()
+
+# Respostas condicionais: ETag a partir dos contadores de TableVersions
+def etag_tabelas(tabelas):
+    """ETag da requisição atual: rota, URL com query string, usuário e versões das tabelas"""
+    chave = json.dumps([request.endpoint, request.full_path, session.get('user_id'), session.get('user_role'),
+                        versoes_bd(tabelas)])
+    return hashlib.blake2b(chave.encode(), digest_size=12).hexdigest()
+
+def resposta_condicional(*tabelas):
+    """GET com ETag derivado das versões de `tabelas`.
+
+    Se o If-None-Match bate, responde 304 sem executar a rota. As tabelas
+    devem incluir as que decidem o acesso (ex.: Modules para rotas checadas
+    por tem_acesso), senão um 304 sobreviveria à perda da permissão.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method != 'GET':
+                return f(*args, **kwargs)
+            etag = etag_tabelas(tabelas)
+            if request.if_none_match.contains_weak(etag):
+                resposta = Response(status=304)
+            else:
+                resposta = make_response(f(*args, **kwargs))
+                if resposta.status_code != 200:
+                    return resposta
+            # no-cache: o navegador guarda, mas revalida a cada uso
+            resposta.set_etag(etag, weak=True)
+            resposta.headers['Cache-Control'] = 'private, no-cache'
+            return resposta
+        return decorated_function
+    return decorator
+
+# Eventos em tempo real (Server-Sent Events): as escritas gravam eventos em
+# ChangeEvents e cada worker os repassa aos streams abertos nele
+def podar_eventos(cursor):
+    """Em uma a cada cem publicações, descartar os eventos além do histórico guardado para reconexões"""
+    if random.random() < 0.01:
+        cursor.execute('DELETE FROM ChangeEvents WHERE id <= (SELECT MAX(id) FROM ChangeEvents) - ?',
+                       (app.config['STREAM_HISTORY'],))
+
+def publicar_evento(cursor, periodo_id, tipo, **dados):
+    """Gravar um evento do período na transação de `cursor` (dentro de executar_escrita ou antes do commit)"""
+    cursor.execute('INSERT INTO ChangeEvents (academic_period_id, kind, data) VALUES (?, ?, ?)',
+                   (periodo_id, tipo, json.dumps(dados)))
+    podar_eventos(cursor)
+
+def publicar_evento_modulo(cursor, modulo_id, tipo, **dados):
+    """publicar_evento no período do módulo"""
+    cursor.execute('''
+        INSERT INTO ChangeEvents (academic_period_id, kind, data) SELECT academic_period_id, ?, ? FROM Modules WHERE id = ?
+    ''', (tipo, json.dumps(dict(dados, module_id=modulo_id)), modulo_id))
+    podar_eventos(cursor)
+
+def publicar_evento_aluno(cursor, aluno_id, tipo, **dados):
+    """publicar_evento no período do aluno"""
+    cursor.execute('''
+        INSERT INTO ChangeEvents (academic_period_id, kind, data) SELECT academic_period_id, ?, ? FROM Students WHERE id = ?
+    ''', (tipo, json.dumps(dict(dados, student_id=aluno_id)), aluno_id))
+    podar_eventos(cursor)
+
+def publicar_evento_notas(cursor, matriculas):
+    """Um evento 'grades' por módulo das matrículas alteradas (ids só quando são poucos)"""
+    cursor.execute('''
+        INSERT INTO ChangeEvents (academic_period_id, kind, data)
+        SELECT m.academic_period_id, 'grades',
+               json_object('module_id', m.id, 'count', COUNT(*),
+                           'enrollments', CASE WHEN COUNT(*) <= 100 THEN json_group_array(e.id) END)
+        FROM Enrollments e JOIN Modules m ON e.module_id = m.id
+        WHERE e.id IN (SELECT value FROM json_each(?))
+        GROUP BY m.id
+    ''', (json.dumps(list(matriculas)),))
+    podar_eventos(cursor)
+
+class Assinatura:
+    """Stream de um cliente: fila limitada de eventos e o sinal que acorda o gerador"""
+
+    __slots__ = ('periodo_id', 'fila', 'sinal', 'expulsa')
+
+    def __init__(self, periodo_id):
+        self.periodo_id = periodo_id
+        self.fila = deque()
+        self.sinal = threading.Event()
+        self.expulsa = False
+
+class Difusor:
+    """Pub/sub em memória dos eventos de ChangeEvents para os streams deste processo.
+
+    Uma única thread por processo lê os eventos novos (a cada STREAM_POLL_SECONDS,
+    ou na hora quando uma escrita deste processo chama acordar()) e os
+    distribui pelas assinaturas do período. Uma assinatura parada custa um
+    objeto pequeno e um gerador esperando; não há consulta por cliente. Quem
+    acumula STREAM_BUFFER eventos sem ler é desconectado e, ao reconectar,
+    recebe o que perdeu pelo Last-Event-ID.
+    """
+
+    nome = 'stream'
+
+    def __init__(self):
+        self._assinaturas = {}
+        self._total = 0
+        self._trava = threading.Lock()
+        self._acordar = threading.Event()
+        self._pid = None
+        self._ultimo_id = None
+        self.distribuidos = 0
+        self.expulsos = 0
+
+    def assinar(self, periodo_id):
+        """Nova assinatura do período, ou None se o processo já está no limite de streams"""
+        with self._trava:
+            if self._total >= app.config['STREAM_MAX_CLIENTS']:
+                return None
+            if self._pid != os.getpid() or not self._total:
+                # Primeira assinatura do processo (ou filho após fork) ou a primeira depois de
+                # um tempo sem clientes: começa do último evento atual. Sem assinaturas a
+                # thread não lê ChangeEvents, e o que foi gravado nesse intervalo não é repassado
+                conn = conectar_bd(somente_leitura=True)
+                self._ultimo_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM ChangeEvents').fetchone()[0]
+                conn.close()
+                if self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    threading.Thread(target=self._laco, name='difusor-sse', daemon=True).start()
+            assinatura = Assinatura(periodo_id)
+            self._assinaturas.setdefault(periodo_id, set()).add(assinatura)
+            self._total += 1
+            return assinatura
+
+    def cancelar(self, assinatura):
+        with self._trava:
+            assinaturas = self._assinaturas.get(assinatura.periodo_id)
+            if assinaturas and assinatura in assinaturas:
+                assinaturas.remove(assinatura)
+                self._total -= 1
+                if not assinaturas:
+                    del self._assinaturas[assinatura.periodo_id]
+
+    def acordar(self):
+        if self._total:
+            self._acordar.set()
+
+    def _laco(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            self._acordar.wait(app.config['STREAM_POLL_SECONDS'])
+            self._acordar.clear()
+            if not self._total:
+                continue
+            try:
+                conn = conectar_bd(somente_leitura=True)
+                try:
+                    eventos = conn.execute('''
+                        SELECT id, academic_period_id, kind, data FROM ChangeEvents WHERE id > ? ORDER BY id
+                    ''', (self._ultimo_id,)).fetchall()
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                log.exception('Falha ao ler eventos para os streams')
+                continue
+            with self._trava:
+                # assinar() pode ter avançado o ponto de partida durante a leitura
+                eventos = [tuple(evento) for evento in eventos if evento['id'] > self._ultimo_id]
+                if eventos:
+                    self._ultimo_id = eventos[-1][0]
+            if eventos:
+                self.distribuir(eventos)
+
+    def distribuir(self, eventos):
+        """Entregar (id, período, tipo, dados) às assinaturas dos períodos; expulsa quem está com a fila cheia"""
+        limite = app.config['STREAM_BUFFER']
+        with self._trava:
+            for evento in eventos:
+                for assinatura in tuple(self._assinaturas.get(evento[1], ())):
+                    if len(assinatura.fila) >= limite:
+                        assinatura.expulsa = True
+                        self._assinaturas[evento[1]].discard(assinatura)
+                        self._total -= 1
+                        self.expulsos += 1
+                    else:
+                        assinatura.fila.append(evento)
+                        self.distribuidos += 1
+                    assinatura.sinal.set()
+            for periodo_id in [p for p, assinaturas in self._assinaturas.items() if not assinaturas]:
+                del self._assinaturas[periodo_id]
+
+    def estatisticas(self):
+        with self._trava:
+            return {'clientes': self._total, 'periodos': len(self._assinaturas),
+                    'distribuidos': self.distribuidos, 'expulsos': self.expulsos}
+
+    def exportar_metricas(self):
+        estatisticas = self.estatisticas()
+        return '\n'.join([
+            '# HELP app_sse_clients Streams SSE abertos neste processo.',
+            '# TYPE app_sse_clients gauge',
+            f"app_sse_clients {estatisticas['clientes']}",
+            '# HELP app_sse_events_total Eventos entregues às filas dos streams.',
+            '# TYPE app_sse_events_total counter',
+            f"app_sse_events_total {estatisticas['distribuidos']}",
+            '# HELP app_sse_evicted_total Streams desconectados por não acompanharem os eventos.',
+            '# TYPE app_sse_evicted_total counter',
+            f"app_sse_evicted_total {estatisticas['expulsos']}",
+        ]) + '\n'
+
+difusor = Difusor()
+
+def formatar_evento_sse(evento):
+    id_evento, _, tipo, dados = evento
+    return f'id: {id_evento}\nevent: {tipo}\ndata: {dados}\n\n'
+
+def gerar_stream(assinatura, perdidos):
+    """Corpo text/event-stream: eventos perdidos desde o Last-Event-ID, depois os novos e heartbeats.
+
+    Termina quando a assinatura é expulsa ou após STREAM_MAX_SECONDS; o
+    EventSource do navegador reconecta sozinho.
+    """
+    try:
+        yield f"retry: {int(app.config['STREAM_RETRY_SECONDS'] * 1000)}\n\n"
+        ultimo = 0
+        for evento in perdidos:
+            ultimo = evento[0]
+            yield formatar_evento_sse(evento)
+        fim = time.monotonic() + app.config['STREAM_MAX_SECONDS']
+        while not assinatura.expulsa and time.monotonic() < fim:
+            if not assinatura.sinal.wait(app.config['STREAM_HEARTBEAT']):
+                # Comentário SSE: mantém a conexão viva nos proxies e revela clientes que já saíram
+                yield ': ping\n\n'
+                continue
+            assinatura.sinal.clear()
+            while assinatura.fila:
+                evento = assinatura.fila.popleft()
+                if evento[0] > ultimo:
+                    ultimo = evento[0]
+                    yield formatar_evento_sse(evento)
+    finally:
+        difusor.cancelar(assinatura)
+
 # Rotas de Autenticação
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -261,13 +2363,27 @@ def login():
         username = request.form['username']
         password = request.form['password']
 
-        conn = conectar_bd()
+        chaves = (('usuario', username.strip().lower()),)
+        if app.config['LOGIN_MAX_FAILURES_IP'] > 0:
+            chaves += (('ip', request.remote_addr),)
+        espera = tentativas_login.bloqueio(chaves)
+        if espera > 0:
+            flash(f'Muitas tentativas de login. Tente novamente em {math.ceil(espera / 60)} minuto(s).', 'error')
+            return render_template('auth/login.html'), 429, {'Retry-After': str(math.ceil(espera))}
+
+        conn = conectar_bd(somente_leitura=True)
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM Users WHERE username = ?', (username,))
         user = cursor.fetchone()
         conn.close()
 
-        if user and check_password_hash(user['password_hash'], password):
+        valida = verificador_senhas.verificar(user['password_hash'], password) if user else False
+        if valida is None:
+            flash('Servidor ocupado. Tente novamente em instantes.', 'error')
+            return render_template('auth/login.html'), 503, {'Retry-After': '1'}
+
+        if valida:
+            tentativas_login.limpar(chaves[0])
             session['user_id'] = user['id']
             session['user_role'] = user['role']
             session['user_name'] = user['full_name']
@@ -276,6 +2392,7 @@ def login():
             flash(f'Bem-vindo, {user["full_name"]}!', 'success')
             return redirect(url_for('dashboard'))
         else:
+            tentativas_login.registrar_falha(chaves)
             flash('Usuário ou senha inválidos.', 'error')
     
     return render_template('auth/login.html')
@@ -287,73 +2404,83 @@ def logout():
     return redirect(url_for('login'))
 
 # Rota Principal - Dashboard
+# Uma consulta agregada por papel: (tabelas de origem, SQL)
+CONSULTAS_DASHBOARD = {
+    'admin': (('Users', 'AcademicPeriods', 'Students', 'Modules'), '''
+        SELECT (SELECT COUNT(*) FROM Users) AS total_users,
+               (SELECT COUNT(*) FROM AcademicPeriods) AS total_periods,
+               (SELECT COUNT(*) FROM Students) AS total_students,
+               (SELECT COUNT(*) FROM Modules) AS total_modules
+    '''),
+    'coordinator': (('AcademicPeriods', 'Students', 'Modules'), '''
+        SELECT COUNT(*) AS my_periods,
+               (SELECT COUNT(*) FROM Students s
+                JOIN AcademicPeriods ap ON s.academic_period_id = ap.id
+                WHERE ap.coordinator_id = :user_id) AS my_students,
+               (SELECT COUNT(*) FROM Modules m
+                JOIN AcademicPeriods ap ON m.academic_period_id = ap.id
+                WHERE ap.coordinator_id = :user_id) AS my_modules
+        FROM AcademicPeriods WHERE coordinator_id = :user_id
+    '''),
+    # Alunos pelo contador dos módulos e aprovados pelo histograma GradeSummary,
+    # sem varrer as matrículas e notas do professor
+    'professor': (('Modules', 'Enrollments', 'Grades'), '''
+        SELECT COUNT(*) AS my_modules,
+               COALESCE(SUM(student_count), 0) AS my_students,
+               (SELECT COALESCE(SUM(gs.students), 0) FROM GradeSummary gs
+                JOIN Modules m ON gs.module_id = m.id
+                WHERE m.professor_id = :user_id AND gs.bucket >= 70) AS approved_students
+        FROM Modules WHERE professor_id = :user_id
+    '''),
+}
+
+def calcular_estatisticas(user_role, user_id):
+    """Estatísticas do dashboard de um usuário, servidas pelo cache_dashboard"""
+    if user_role not in CONSULTAS_DASHBOARD:
+        return {}
+    tabelas, consulta = CONSULTAS_DASHBOARD[user_role]
+
+    def calcular():
+        conn = conectar_bd()
+        stats = dict(conn.execute(consulta, {'user_id': user_id}).fetchone())
+        conn.close()
+        return stats
+
+    return dict(cache_dashboard.obter((user_role, user_id), tabelas, calcular))
+
 @app.route('/')
 @login_required
 def dashboard():
     user_role = session.get('user_role')
     user_id = session.get('user_id')
 
-    conn = conectar_bd()
-    cursor = conn.cursor()
+    stats = calcular_estatisticas(user_role, user_id)
 
-    stats = {}
-    
-    if user_role == 'admin':
-        # Estatísticas para administrador
-        cursor.execute('SELECT COUNT(*) as total FROM Users')
-        stats['total_users'] = cursor.fetchone()['total']
-        
-        cursor.execute('SELECT COUNT(*) as total FROM AcademicPeriods')
-        stats['total_periods'] = cursor.fetchone()['total']
-        
-        cursor.execute('SELECT COUNT(*) as total FROM Students')
-        stats['total_students'] = cursor.fetchone()['total']
-        
-        cursor.execute('SELECT COUNT(*) as total FROM Modules')
-        stats['total_modules'] = cursor.fetchone()['total']
-        
-    elif user_role == 'coordinator':
-        # Estatísticas para coordenador
-        cursor.execute('SELECT COUNT(*) as total FROM AcademicPeriods WHERE coordinator_id = ?', (user_id,))
-        stats['my_periods'] = cursor.fetchone()['total']
-        
-        cursor.execute('''
-            SELECT COUNT(*) as total FROM Students s 
-            JOIN AcademicPeriods ap ON s.academic_period_id = ap.id 
-            WHERE ap.coordinator_id = ?
-        ''', (user_id,))
-        stats['my_students'] = cursor.fetchone()['total']
-        
-        cursor.execute('''
-            SELECT COUNT(*) as total FROM Modules m 
-            JOIN AcademicPeriods ap ON m.academic_period_id = ap.id 
-            WHERE ap.coordinator_id = ?
-        ''', (user_id,))
-        stats['my_modules'] = cursor.fetchone()['total']
-        
-    elif user_role == 'professor':
-        # Estatísticas para professor
-        cursor.execute('SELECT COUNT(*) as total FROM Modules WHERE professor_id = ?', (user_id,))
-        stats['my_modules'] = cursor.fetchone()['total']
-        
-        cursor.execute('''
-            SELECT COUNT(*) as total FROM Enrollments e 
-            JOIN Modules m ON e.module_id = m.id 
-            WHERE m.professor_id = ?
-        ''', (user_id,))
-        stats['my_students'] = cursor.fetchone()['total']
+    return render_template('dashboard.html', stats=stats, user_role=user_role)
 
-        cursor.execute('''
-            SELECT COUNT(*) as total FROM Grades g
-            JOIN Enrollments e ON g.enrollment_id = e.id
-            JOIN Modules m ON e.module_id = m.id
-            WHERE m.professor_id = ? AND g.final_grade >= 7.0
-        ''', (user_id,))
-        stats['approved_students'] = cursor.fetchone()['total']
-    
-    conn.close()
+@app.route('/api/cache/stats')
+@role_required(['admin'])
+def api_cache_stats():
+    """Taxa de acerto e tempo de recálculo dos caches em memória"""
+    return jsonify({nome: cache.estatisticas() for nome, cache in CACHES.items()})
 
-    return render_template('dashboard.html', stats=stats, user_role=user_role)
+ENDERECOS_LOCAIS = ('127.0.0.1', '::1')
+
+@app.route('/metrics')
+def metrics():
+    """Métricas do processo no formato de texto do Prometheus.
+
+    Liberado para a sessão de admin e para `Authorization: Bearer <METRICS_TOKEN>`.
+    Sem METRICS_TOKEN, o scraper só é aceito a partir do localhost.
+    """
+    token = app.config['METRICS_TOKEN']
+    if token:
+        permitido = request.headers.get('Authorization') == f'Bearer {token}'
+    else:
+        permitido = request.remote_addr in ENDERECOS_LOCAIS
+    if not permitido and session.get('user_role') != 'admin':
+        return jsonify({'error': 'Acesso negado.'}), 403
+    return Response(metricas.exportar() + difusor.exportar_metricas() + compressao_respostas.exportar_metricas(), mimetype='text/plain; version=0.0.4')
 
 # Rotas do Administrador
 @app.route('/admin')
@@ -371,6 +2498,18 @@ def manage_users():
 def manage_periods():
     return render_template('admin/periods.html')
 
+@app.route('/admin/slow-queries')
+@role_required(['admin'])
+def admin_slow_queries():
+    """Resumo do log de consultas lentas"""
+    return render_template('admin/slow_queries.html', consultas=ler_consultas_lentas(),
+                           limite_ms=app.config['SLOW_QUERY_MS'])
+
+@app.route('/api/slow-queries')
+@role_required(['admin'])
+def api_slow_queries():
+    return jsonify(ler_consultas_lentas())
+
 # Rotas do Coordenador
 @app.route('/coordinator')
 @role_required(['coordinator'])
@@ -427,145 +2566,93 @@ def criar_modulo():
     user_id = session.get('user_id')
     user_role = session.get('user_role')
     
-    conn = conectar_bd()
+    conn = conectar_bd(somente_leitura=True)
     cursor = conn.cursor()
-    
-    try:
-        if user_role == 'coordinator':
-            # Para coordenadores, criar módulo nos seus períodos
-            cursor.execute('SELECT id FROM AcademicPeriods WHERE coordinator_id = ? AND is_active = 1 LIMIT 1', (user_id,))
+    if user_role == 'coordinator':
+        # Para coordenadores, criar módulo nos seus períodos
+        cursor.execute('SELECT id FROM AcademicPeriods WHERE coordinator_id = ? AND is_active = 1 LIMIT 1', (user_id,))
+        period = cursor.fetchone()
+        if not period:
+            conn.close()
+            return jsonify({'error': 'Nenhum período ativo encontrado para este coordenador'}), 400
+    elif user_role == 'professor':
+        # Para professores, criar módulo nos períodos onde eles lecionam
+        cursor.execute('''
+            SELECT DISTINCT ap.id FROM AcademicPeriods ap
+            JOIN Modules m ON ap.id = m.academic_period_id
+            WHERE m.professor_id = ? AND ap.is_active = 1 LIMIT 1
+        ''', (user_id,))
+        period = cursor.fetchone()
+        
+        if not period:
+            # Se não tem módulos, pegar o primeiro período ativo
+            cursor.execute('SELECT id FROM AcademicPeriods WHERE is_active = 1 LIMIT 1')
             period = cursor.fetchone()
             
             if not period:
                 conn.close()
-                return jsonify({'error': 'Nenhum período ativo encontrado para este coordenador'}), 400
-            
-            # Gerar código automático para o módulo
-            import time
-            codigo = f"MOD{int(time.time() % 10000)}"
-            
-            cursor.execute('''
-                INSERT INTO Modules (name, code, professor_id, academic_period_id, credits, max_absences) 
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (nome, codigo, user_id, period['id'], 4, 10))
-            
-        elif user_role == 'professor':
-            # Para professores, criar módulo nos períodos onde eles lecionam
-            cursor.execute('''
-                SELECT DISTINCT ap.id FROM AcademicPeriods ap
-                JOIN Modules m ON ap.id = m.academic_period_id
-                WHERE m.professor_id = ? AND ap.is_active = 1 LIMIT 1
-            ''', (user_id,))
-            period = cursor.fetchone()
-            
-            if not period:
-                # Se não tem módulos, pegar o primeiro período ativo
-                cursor.execute('SELECT id FROM AcademicPeriods WHERE is_active = 1 LIMIT 1')
-                period = cursor.fetchone()
-                
-                if not period:
-                    conn.close()
-                    return jsonify({'error': 'Nenhum período ativo encontrado'}), 400
-            
-            # Gerar código automático para o módulo
-            import time
-            codigo = f"MOD{int(time.time() % 10000)}"
-            
-            cursor.execute('''
-                INSERT INTO Modules (name, code, professor_id, academic_period_id, credits, max_absences) 
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (nome, codigo, user_id, period['id'], 4, 10))
-            
-        else:
-            conn.close()
-            return jsonify({'error': 'Usuário não tem permissão para criar módulos'}), 403
-        
+                return jsonify({'error': 'Nenhum período ativo encontrado'}), 400
+    else:
+        conn.close()
+        return jsonify({'error': 'Usuário não tem permissão para criar módulos'}), 403
+    conn.close()
+    periodo_id = period['id']
+    # Gerar código automático para o módulo
+    codigo = f"MOD{int(time.time() % 10000)}"
+
+    def inserir(cursor):
+        cursor.execute('''
+            INSERT INTO Modules (name, code, professor_id, academic_period_id, credits, max_absences) 
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (nome, codigo, user_id, periodo_id, 4, 10))
         module_id = cursor.lastrowid
-        
         # Se houver alunos no período, matriculá-los automaticamente no novo módulo
-        cursor.execute('SELECT id FROM Students WHERE academic_period_id = ? AND is_active = 1', (period['id'],))
-        students = cursor.fetchall()
-        
-        for student in students:
-            cursor.execute('''
-                INSERT OR IGNORE INTO Enrollments (student_id, module_id) 
-                VALUES (?, ?)
-            ''', (student['id'], module_id))
-            
-            # Criar registro de notas vazio
-            cursor.execute('SELECT id FROM Enrollments WHERE student_id = ? AND module_id = ?', (student['id'], module_id))
-            enrollment = cursor.fetchone()
-            
-            if enrollment:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO Grades (enrollment_id, tutor_grade, regular_exam_grade, makeup_exam_grade, final_grade, absences) 
-                    VALUES (?, 0.0, 0.0, 0.0, 0.0, 0)
-                ''', (enrollment['id'],))
-        
-        conn.commit()
-        conn.close()
-        
-        return jsonify({
-            'message': f'Módulo "{nome}" criado com sucesso! {len(students)} alunos foram matriculados automaticamente.',
-            'module_id': module_id
-        })
-        
+        matriculados = matricular_alunos(cursor, periodo_id, modulo_id=module_id)
+        publicar_evento(cursor, periodo_id, 'modules', action='created', module_id=module_id)
+        return module_id, matriculados
+
+    try:
+        module_id, matriculados = executar_escrita(inserir)
     except sqlite3.IntegrityError as e:
-        conn.close()
         return jsonify({'error': 'Erro ao criar módulo. Código pode já existir.'}), 400
     except Exception as e:
-        conn.close()
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+    registrar_escrita('Modules', 'Enrollments', 'Grades')
+
+    return jsonify({
+        'message': f'Módulo "{nome}" criado com sucesso! {matriculados} alunos foram matriculados automaticamente.',
+        'module_id': module_id,
+        'enrollments_created': matriculados
+    })
 
 @app.route('/api/modulos')
 @login_required
+@resposta_condicional('Modules', 'Users', 'AcademicPeriods')
 def api_modulos():
     """API para listar módulos do usuário"""
     user_id = session.get('user_id')
     user_role = session.get('user_role')
     
-    conn = conectar_bd()
-    cursor = conn.cursor()
-    
+    consulta = '''
+        SELECT m.*, u.full_name as professor_name, ap.name as period_name
+        FROM Modules m
+        JOIN Users u ON m.professor_id = u.id
+        JOIN AcademicPeriods ap ON m.academic_period_id = ap.id
+    '''
     if user_role == 'coordinator':
         # Coordenador vê módulos dos seus períodos
-        cursor.execute('''
-            SELECT m.*, u.full_name as professor_name, ap.name as period_name
-            FROM Modules m
-            JOIN Users u ON m.professor_id = u.id
-            JOIN AcademicPeriods ap ON m.academic_period_id = ap.id
-            WHERE ap.coordinator_id = ?
-            ORDER BY m.created_at DESC
-        ''', (user_id,))
+        consulta += ' WHERE ap.coordinator_id = ?'
+        parametros = (user_id,)
     elif user_role == 'professor':
         # Professor vê seus próprios módulos
-        cursor.execute('''
-            SELECT m.*, u.full_name as professor_name, ap.name as period_name
-            FROM Modules m
-            JOIN Users u ON m.professor_id = u.id
-            JOIN AcademicPeriods ap ON m.academic_period_id = ap.id
-            WHERE m.professor_id = ?
-            ORDER BY m.created_at DESC
-        ''', (user_id,))
+        consulta += ' WHERE m.professor_id = ?'
+        parametros = (user_id,)
     else:
         # Admin vê todos os módulos
-        cursor.execute('''
-            SELECT m.*, u.full_name as professor_name, ap.name as period_name
-            FROM Modules m
-            JOIN Users u ON m.professor_id = u.id
-            JOIN AcademicPeriods ap ON m.academic_period_id = ap.id
-            ORDER BY m.created_at DESC
-        ''')
-    
-    modules = [dict(row) for row in cursor.fetchall()]
-    
-    # Adicionar contagem de alunos para cada módulo
-    for module in modules:
-        cursor.execute('SELECT COUNT(*) as count FROM Enrollments WHERE module_id = ?', (module['id'],))
-        module['student_count'] = cursor.fetchone()['count']
-    
-    conn.close()
-    return jsonify(modules)
+        parametros = ()
+
+    # student_count vem da própria linha de Modules, mantido pelos triggers de Enrollments
+    return responder_lista(consulta, parametros, ordem=('created_at', 'id'), decrescente=True)
 
 @app.route('/professor/module/<int:module_id>')
 @role_required(['professor'])
@@ -575,88 +2662,84 @@ def manage_grades(module_id):
 # API Routes
 @app.route('/api/users', methods=['GET', 'POST'])
 @role_required(['admin'])
+@resposta_condicional('Users')
 def api_users():
-    conn = conectar_bd()
-    cursor = conn.cursor()
-
     if request.method == 'GET':
-        cursor.execute('SELECT id, username, role, full_name, email, created_at FROM Users ORDER BY full_name')
-        users = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return jsonify(users)
+        return responder_lista('SELECT id, username, role, full_name, email, created_at FROM Users')
     
     elif request.method == 'POST':
         data = request.get_json()
-        try:
+        # O hash (lento) é calculado aqui, não na thread escritora
+        valores = (
+            data['username'],
+            generate_password_hash(data['password']),
+            data['role'],
+            data['full_name'],
+            data['email']
+        )
+
+        def inserir(cursor):
             cursor.execute('''
                 INSERT INTO Users (username, password_hash, role, full_name, email) 
                 VALUES (?, ?, ?, ?, ?)
-            ''', (
-                data['username'],
-                generate_password_hash(data['password']),
-                data['role'],
-                data['full_name'],
-                data['email']
-            ))
-            conn.commit()
-            conn.close()
-            return jsonify({'message': 'Usuário criado com sucesso!'}), 201
+            ''', valores)
+
+        try:
+            executar_escrita(inserir)
         except sqlite3.IntegrityError as e:
-            conn.close()
             return jsonify({'error': 'Usuário ou email já existe.'}), 400
+        registrar_escrita('Users')
+        return jsonify({'message': 'Usuário criado com sucesso!'}), 201
 
 @app.route('/api/users/<int:user_id>', methods=['PUT', 'DELETE'])
 @role_required(['admin'])
 def api_user(user_id):
-    conn = conectar_bd()
-    cursor = conn.cursor()
-
     if request.method == 'PUT':
         data = request.get_json()
+        if 'password' in data and data['password']:
+            sql = '''
+                UPDATE Users SET username=?, password_hash=?, role=?, full_name=?, email=? 
+                WHERE id=?
+            '''
+            valores = (
+                data['username'],
+                generate_password_hash(data['password']),
+                data['role'],
+                data['full_name'],
+                data['email'],
+                user_id
+            )
+        else:
+            sql = '''
+                UPDATE Users SET username=?, role=?, full_name=?, email=? 
+                WHERE id=?
+            '''
+            valores = (
+                data['username'],
+                data['role'],
+                data['full_name'],
+                data['email'],
+                user_id
+            )
         try:
-            if 'password' in data and data['password']:
-                cursor.execute('''
-                    UPDATE Users SET username=?, password_hash=?, role=?, full_name=?, email=? 
-                    WHERE id=?
-                ''', (
-                    data['username'],
-                    generate_password_hash(data['password']),
-                    data['role'],
-                    data['full_name'],
-                    data['email'],
-                    user_id
-                ))
-            else:
-                cursor.execute('''
-                    UPDATE Users SET username=?, role=?, full_name=?, email=? 
-                    WHERE id=?
-                ''', (
-                    data['username'],
-                    data['role'],
-                    data['full_name'],
-                    data['email'],
-                    user_id
-                ))
-            conn.commit()
-            conn.close()
-            return jsonify({'message': 'Usuário atualizado com sucesso!'})
+            executar_escrita(lambda cursor: cursor.execute(sql, valores))
         except sqlite3.IntegrityError:
-            conn.close()
             return jsonify({'error': 'Usuário ou email já existe.'}), 400
+        registrar_escrita('Users')
+        return jsonify({'message': 'Usuário atualizado com sucesso!'})
     
     elif request.method == 'DELETE':
-        cursor.execute('DELETE FROM Users WHERE id=?', (user_id,))
-        conn.commit()
-        conn.close()
+        executar_escrita(lambda cursor: cursor.execute('DELETE FROM Users WHERE id=?', (user_id,)))
+        registrar_escrita('Users')
         return jsonify({'message': 'Usuário excluído com sucesso!'})
 
 @app.route('/api/periods', methods=['GET', 'POST'])
 @role_required(['admin'])
+@resposta_condicional('AcademicPeriods', 'Users')
 def api_periods():
-    conn = conectar_bd()
-    cursor = conn.cursor()
-    
     if request.method == 'GET':
+        conn = conectar_bd()
+        cursor = conn.cursor()
         cursor.execute('''
             SELECT p.*, u.full_name as coordinator_name 
             FROM AcademicPeriods p 
@@ -669,27 +2752,27 @@ def api_periods():
 
     elif request.method == 'POST':
         data = request.get_json()
+        valores = (
+            data['name'],
+            data['coordinator_id'],
+            data['start_date'],
+            data['end_date'],
+            data.get('is_active', 1)
+        )
         try:
-            cursor.execute('''
+            executar_escrita(lambda cursor: cursor.execute('''
                 INSERT INTO AcademicPeriods (name, coordinator_id, start_date, end_date, is_active) 
                 VALUES (?, ?, ?, ?, ?)
-            ''', (
-                data['name'],
-                data['coordinator_id'],
-                data['start_date'],
-                data['end_date'],
-                data.get('is_active', 1)
-            ))
-            conn.commit()
-            conn.close()
-            return jsonify({'message': 'Período acadêmico criado com sucesso!'}), 201
+            ''', valores))
         except sqlite3.IntegrityError:
-            conn.close()
             return jsonify({'error': 'Nome do período já existe.'}), 400
+        registrar_escrita('AcademicPeriods')
+        return jsonify({'message': 'Período acadêmico criado com sucesso!'}), 201
 
 # API do Coordenador
 @app.route('/api/coordinator/periods')
 @role_required(['coordinator'])
+@resposta_condicional('AcademicPeriods')
 def api_coordinator_periods():
     user_id = session.get('user_id')
     conn = conectar_bd()
@@ -703,49 +2786,610 @@ def api_coordinator_periods():
 
 @app.route('/api/periods/<int:period_id>/students', methods=['GET', 'POST'])
 @role_required(['coordinator'])
+@resposta_condicional('Students', 'AcademicPeriods')
 def api_period_students(period_id):
+    # Verificar se o coordenador tem acesso a este período
+    if not tem_acesso('periodos', period_id):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    if request.method == 'GET':
+        return responder_lista('SELECT * FROM Students WHERE academic_period_id = ?', (period_id,))
+    
+    elif request.method == 'POST':
+        data = request.get_json()
+        valores = (
+            data['student_number'],
+            data['full_name'],
+            data.get('email', ''),
+            period_id,
+            data['enrollment_date'],
+            data.get('medical_certificates', 0),
+            data.get('referral_info', ''),
+            data.get('observations', '')
+        )
+
+        def inserir(cursor):
+            cursor.execute('''
+                INSERT INTO Students (student_number, full_name, email, academic_period_id, enrollment_date, medical_certificates, referral_info, observations) 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', valores)
+            publicar_evento(cursor, period_id, 'students', action='created', student_id=cursor.lastrowid)
+
+        try:
+            executar_escrita(inserir)
+        except sqlite3.IntegrityError:
+            return jsonify({'error': 'Número de matrícula já existe.'}), 400
+        registrar_escrita('Students')
+        return jsonify({'message': 'Estudante criado com sucesso!'}), 201
+
+# Busca textual de alunos
+MAXIMO_TERMOS_BUSCA = 8
+
+def expressao_busca(texto):
+    """Texto digitado -> expressão MATCH do FTS5, com todas as palavras obrigatórias.
+
+    Só a última palavra, a que ainda está sendo digitada, vale como prefixo:
+    prefixos curtos no meio da busca ("3"*) juntam milhares de termos do
+    índice. As aspas impedem que operadores do FTS5 (OR, NOT, NEAR, *, :)
+    venham do usuário.
+    """
+    termos = [f'"{termo}"' for termo in re.findall(r'\w+', texto or '')[:MAXIMO_TERMOS_BUSCA]]
+    if termos:
+        termos[-1] += '*'
+    return ' '.join(termos)
+
+@app.route('/api/students/search')
+@role_required(['admin', 'coordinator', 'professor'])
+@resposta_condicional('Students', 'Enrollments', 'Modules', 'AcademicPeriods')
+def api_students_search():
+    """Alunos visíveis ao usuário que casam com `q`, dos mais relevantes (bm25) para os menos.
+
+    Busca em nome, matrícula, email, observações e encaminhamentos. Aceita
+    `period_id` e a paginação de responder_lista (`limit`, padrão 50, e `after`).
+    """
+    expressao = expressao_busca(request.args.get('q'))
+    if not expressao:
+        return jsonify({'error': 'Informe o termo de busca em q.'}), 400
+
+    user_role = session.get('user_role')
+    filtros, parametros = ['StudentSearch MATCH ?'], [expressao]
+    if user_role == 'coordinator':
+        filtros.append('s.academic_period_id IN (SELECT id FROM AcademicPeriods WHERE coordinator_id = ?)')
+        parametros.append(session.get('user_id'))
+    elif user_role == 'professor':
+        filtros.append('''s.id IN (SELECT e.student_id FROM Enrollments e
+                                   JOIN Modules m ON e.module_id = m.id WHERE m.professor_id = ?)''')
+        parametros.append(session.get('user_id'))
+    if request.args.get('period_id'):
+        filtros.append('s.academic_period_id = ?')
+        parametros.append(request.args.get('period_id', type=int))
+
+    return responder_lista(f'''
+        SELECT s.*, ap.name AS period_name, StudentSearch.rank AS rank
+        FROM StudentSearch
+        JOIN Students s ON s.id = StudentSearch.rowid
+        JOIN AcademicPeriods ap ON s.academic_period_id = ap.id
+        WHERE {' AND '.join(filtros)}
+    ''', parametros, ordem=('rank', 'id'), limite_padrao=50)
+
+# Importação de alunos por CSV
+COLUNAS_IMPORTACAO = ('student_number', 'full_name', 'email', 'enrollment_date',
+                      'medical_certificates', 'referral_info', 'observations')
+COLUNAS_OBRIGATORIAS = ('student_number', 'full_name', 'enrollment_date')
+TAMANHO_LOTE_IMPORTACAO = 1000
+MAXIMO_ERROS_IMPORTACAO = 1000
+
+def validar_linha_importacao(linha):
+    """Converter uma linha do CSV nos valores do INSERT; retorna (valores, erro)"""
+    campos = {coluna: (linha.get(coluna) or '').strip() for coluna in COLUNAS_IMPORTACAO}
+    faltando = [coluna for coluna in COLUNAS_OBRIGATORIAS if not campos[coluna]]
+    if faltando:
+        return None, f"Campos obrigatórios ausentes: {', '.join(faltando)}"
+    try:
+        datetime.strptime(campos['enrollment_date'], '%Y-%m-%d')
+    except ValueError:
+        return None, 'enrollment_date deve estar no formato AAAA-MM-DD'
+    try:
+        certificados = int(campos['medical_certificates'] or 0)
+    except ValueError:
+        return None, 'medical_certificates deve ser um número inteiro'
+    return (campos['student_number'], campos['full_name'], campos['email'], campos['enrollment_date'],
+            certificados, campos['referral_info'], campos['observations']), None
+
+def importar_lote(cursor, period_id, lote, erros):
+    """Inserir um lote de (linha_csv, valores), descartando matrículas já existentes"""
+    numeros = [valores[0] for _, valores in lote]
+    cursor.execute(f"SELECT student_number FROM Students WHERE student_number IN ({', '.join('?' * len(numeros))})", numeros)
+    existentes = {row['student_number'] for row in cursor.fetchall()}
+
+    novos = []
+    for numero_linha, valores in lote:
+        if valores[0] in existentes:
+            erros.append({'line': numero_linha, 'student_number': valores[0], 'error': 'Número de matrícula já existe.'})
+            continue
+        existentes.add(valores[0])
+        novos.append(valores[:3] + (period_id,) + valores[3:])
+
+    cursor.executemany('''
+        INSERT INTO Students (student_number, full_name, email, academic_period_id, enrollment_date, medical_certificates, referral_info, observations)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', novos)
+    return len(novos)
+
+@app.route('/api/periods/<int:period_id>/students/import', methods=['POST'])
+@role_required(['coordinator'])
+def api_import_period_students(period_id):
+    """API para importar alunos de um CSV enviado no campo `file`.
+
+    O arquivo é lido como stream, linha a linha, e inserido em lotes dentro
+    de uma única tarefa da fila de escrita (uma transação). Os alunos novos
+    são matriculados em todos os módulos do período. Linhas inválidas não
+    interrompem a importação e voltam no relatório `errors`.
+    """
+    arquivo = request.files.get('file')
+    if arquivo is None:
+        return jsonify({'error': 'Envie o arquivo CSV no campo "file".'}), 400
+
+    # Verificar se o coordenador tem acesso a este período
+    if not tem_acesso('periodos', period_id):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    texto = io.TextIOWrapper(arquivo.stream, encoding='utf-8-sig', newline='')
+    cabecalho = texto.readline()
+    linha_cabecalho = 1
+    while cabecalho and not cabecalho.strip():
+        # Linhas em branco antes do cabeçalho são ignoradas
+        cabecalho = texto.readline()
+        linha_cabecalho += 1
+    delimitador = ';' if cabecalho.count(';') > cabecalho.count(',') else ','
+    colunas = [coluna.strip() for coluna in next(csv.reader([cabecalho], delimiter=delimitador), [])]
+    faltando = [coluna for coluna in COLUNAS_OBRIGATORIAS if coluna not in colunas]
+    if faltando:
+        return jsonify({'error': f"Colunas obrigatórias ausentes no cabeçalho: {', '.join(faltando)}"}), 400
+
+    def importar(cursor):
+        # O stream é lido aqui, na thread escritora: só um lote fica em memória por vez
+        cursor.execute('SELECT COALESCE(MAX(id), 0) + 1 AS proximo FROM Students')
+        primeiro_id = cursor.fetchone()['proximo']
+
+        erros = []
+        total_erros = 0
+        linhas = 0
+        inseridos = 0
+        lote = []
+        leitor = csv.DictReader(texto, fieldnames=colunas, delimiter=delimitador)
+        for numero_linha, linha in enumerate(leitor, start=linha_cabecalho + 1):
+            linhas += 1
+            valores, erro = validar_linha_importacao(linha)
+            if erro:
+                erros.append({'line': numero_linha, 'student_number': (linha.get('student_number') or '').strip(), 'error': erro})
+            else:
+                lote.append((numero_linha, valores))
+            if len(lote) >= TAMANHO_LOTE_IMPORTACAO:
+                inseridos += importar_lote(cursor, period_id, lote, erros)
+                lote = []
+            if len(erros) > MAXIMO_ERROS_IMPORTACAO:
+                # O relatório guarda só os primeiros erros; os demais entram na contagem
+                total_erros += len(erros) - MAXIMO_ERROS_IMPORTACAO
+                del erros[MAXIMO_ERROS_IMPORTACAO:]
+        if lote:
+            inseridos += importar_lote(cursor, period_id, lote, erros)
+
+        matriculas = matricular_alunos(cursor, period_id, aluno_id_minimo=primeiro_id) if inseridos else 0
+        if inseridos:
+            publicar_evento(cursor, period_id, 'students', action='imported', count=inseridos)
+        return linhas, inseridos, matriculas, erros, total_erros + len(erros)
+
+    try:
+        linhas, inseridos, matriculas, erros, total_erros = executar_escrita(importar)
+    except (csv.Error, UnicodeDecodeError) as e:
+        return jsonify({'error': f'Arquivo CSV inválido: {e}'}), 400
+    if inseridos:
+        registrar_escrita('Students', 'Enrollments', 'Grades')
+
+    return jsonify({
+        'message': f'{inseridos} de {linhas} alunos importados.',
+        'rows': linhas,
+        'imported': inseridos,
+        'enrollments_created': matriculas,
+        'error_count': total_erros,
+        'errors': erros[:MAXIMO_ERROS_IMPORTACAO]
+    }), 201 if inseridos else 200
+
+# Cálculo da nota final no servidor, em lote, com as regras do período. Sem
+# regras gravadas, a final é a prova (a recuperação, quando feita e maior), como nos dados de exemplo
+REGRAS_NOTAS_PADRAO = {'tutor_weight': 0.0, 'makeup_policy': 'max', 'absence_grade_cap': None, 'rounding_step': 0.1}
+POLITICAS_RECUPERACAO = {'none': 0, 'max': 1, 'replace': 2}
+LOTE_RECALCULO = 100000
+
+def calcular_notas_finais(notas, regras):
+    """Notas finais a partir de arrays por linha (NULL = nan).
+
+    `notas`: tutor, regular, recuperação e faltas; `regras`: max_absences do
+    módulo, peso do tutor, política de recuperação, teto por faltas e passo
+    de arredondamento.
+
+    - prova = regular; com recuperação feita (> 0), max(regular, recuperação)
+      na política 'max' ou a recuperação na política 'replace';
+    - final = peso_tutor * tutor + (1 - peso_tutor) * prova;
+    - acima de Modules.max_absences, a final é limitada a absence_grade_cap (se definido);
+    - arredondamento para o múltiplo de rounding_step mais próximo (metade para cima), entre 0 e 10.
+    """
+    tutor, regular, recuperacao, faltas = np.nan_to_num(notas).T
+    max_faltas, peso, politica, teto, passo = regras.T
+    fez_recuperacao = recuperacao > 0
+    prova = np.where(fez_recuperacao & (politica == POLITICAS_RECUPERACAO['max']), np.maximum(regular, recuperacao), regular)
+    prova = np.where(fez_recuperacao & (politica == POLITICAS_RECUPERACAO['replace']), recuperacao, prova)
+    final = peso * tutor + (1 - peso) * prova
+    # Comparações com nan são falsas: sem limite de faltas ou sem teto, nada muda
+    final = np.where(faltas > max_faltas, np.fmin(final, teto), final)
+    final = np.floor(final / passo + 0.5 + 1e-9) * passo
+    return np.round(np.clip(final, 0, 10), 4)
+
+def regras_por_modulo(cursor):
+    """Array indexado pelo id do módulo: max_absences e as regras do período (ou as padrão)"""
+    linhas = cursor.execute('''
+        SELECT m.id, m.max_absences,
+               COALESCE(r.tutor_weight, :tutor_weight),
+               CASE COALESCE(r.makeup_policy, :makeup_policy) WHEN 'none' THEN 0 WHEN 'replace' THEN 2 ELSE 1 END,
+               CASE WHEN r.academic_period_id IS NULL THEN :absence_grade_cap ELSE r.absence_grade_cap END,
+               COALESCE(r.rounding_step, :rounding_step)
+        FROM Modules m LEFT JOIN GradingRules r ON r.academic_period_id = m.academic_period_id
+    ''', REGRAS_NOTAS_PADRAO).fetchall()
+    dados = np.array(linhas, dtype=np.float64).reshape(-1, 6)
+    regras = np.full((int(dados[:, 0].max(initial=0)) + 1, 5), np.nan)
+    regras[dados[:, 0].astype(np.int64)] = dados[:, 1:]
+    return regras
+
+def recalcular_notas(cursor, periodo_id=None, modulo_id=None, matriculas=None):
+    """Recalcular e gravar final_grade das matrículas filtradas; devolve quantas notas mudaram.
+
+    As notas vêm de uma única consulta, lida em blocos de LOTE_RECALCULO; as
+    regras de cada módulo vêm de uma tabela pequena indexada pelo id. O
+    cálculo é feito com NumPy e só as notas que mudaram voltam ao banco em
+    um executemany. Roda dentro da transação de `cursor` (use com executar_escrita).
+    """
+    filtros, parametros, juncao = [], {}, ''
+    if periodo_id is not None:
+        juncao = 'JOIN Modules m ON e.module_id = m.id'
+        filtros.append('m.academic_period_id = :periodo')
+        parametros['periodo'] = periodo_id
+    if modulo_id is not None:
+        filtros.append('e.module_id = :modulo')
+        parametros['modulo'] = modulo_id
+    if matriculas is not None:
+        filtros.append('g.enrollment_id IN (SELECT value FROM json_each(:matriculas))')
+        parametros['matriculas'] = json.dumps(list(matriculas))
+    regras = regras_por_modulo(cursor)
+    leitura = cursor.connection.cursor()
+    leitura.execute(f'''
+        SELECT g.id, g.final_grade, g.tutor_grade, g.regular_exam_grade, g.makeup_exam_grade, g.absences, e.module_id
+        FROM Grades g
+        JOIN Enrollments e ON g.enrollment_id = e.id
+        {juncao}
+        {'WHERE ' + ' AND '.join(filtros) if filtros else ''}
+    ''', parametros)
+    alteradas = 0
+    pausado = False
+    while True:
+        linhas = leitura.fetchmany(LOTE_RECALCULO)
+        if not linhas:
+            break
+        dados = np.array(linhas, dtype=np.float64)
+        finais = calcular_notas_finais(dados[:, 2:6], regras[dados[:, 6].astype(np.int64)])
+        mudou = ~np.isclose(finais, dados[:, 1]) | np.isnan(dados[:, 1])
+        valores = list(zip(finais[mudou].tolist(), dados[mudou, 0].astype(np.int64).tolist()))
+        if len(valores) > LOTE_RECALCULO // 10 and not pausado:
+            # Recálculo grande: os triggers por linha ficam pausados; o contador de
+            # TableVersions sobe uma vez no fim e o histograma é refeito de uma vez
+            cursor.execute("INSERT OR IGNORE INTO TriggerPauses (table_name) VALUES ('Grades')")
+            pausado = True
+        cursor.executemany('UPDATE Grades SET final_grade = ?, last_updated = CURRENT_TIMESTAMP WHERE id = ?', valores)
+        alteradas += len(valores)
+    if pausado:
+        cursor.execute("DELETE FROM TriggerPauses WHERE table_name = 'Grades'")
+        # Filtro só por matrículas: o histograma é refeito por inteiro
+        reconstruir_resumo_notas(cursor, periodo_id=periodo_id, modulo_id=modulo_id)
+        cursor.execute("UPDATE TableVersions SET version = version + 1 WHERE table_name = 'Grades'")
+    return alteradas
+
+def salvar_notas_e_recalcular(cursor, valores):
+    """salvar_notas seguido do cálculo da final no servidor; devolve {enrollment_id: final_grade}"""
+    salvar_notas(cursor, valores)
+    matriculas = [linha[0] for linha in valores]
+    recalcular_notas(cursor, matriculas=matriculas)
+    publicar_evento_notas(cursor, matriculas)
+    return notas_finais(cursor, matriculas)
+
+def notas_finais(cursor, matriculas):
+    """{enrollment_id: final_grade} das matrículas, lido na transação de `cursor`"""
+    cursor.execute('SELECT enrollment_id, final_grade FROM Grades WHERE enrollment_id IN (SELECT value FROM json_each(?))',
+                   (json.dumps(matriculas),))
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+def validar_regras_notas(dados):
+    """Regras completas (padrão + enviadas) ou mensagem de erro"""
+    if not isinstance(dados, dict):
+        return None, 'Envie as regras em um objeto JSON.'
+    regras = dict(REGRAS_NOTAS_PADRAO)
+    numericos = [campo for campo in ('tutor_weight', 'rounding_step') if campo in dados]
+    if dados.get('absence_grade_cap') is not None:
+        numericos.append('absence_grade_cap')
+    for campo in numericos:
+        # bool é int em Python: true viraria 1.0 sem este teste
+        if isinstance(dados[campo], bool):
+            return None, 'Regras inválidas.'
+        try:
+            regras[campo] = float(dados[campo])
+        except (TypeError, ValueError):
+            return None, 'Regras inválidas.'
+        if not math.isfinite(regras[campo]):
+            return None, f'{campo} deve ser um número finito.'
+    regras['makeup_policy'] = dados.get('makeup_policy', regras['makeup_policy'])
+    if not 0 <= regras['tutor_weight'] <= 1:
+        return None, 'tutor_weight deve estar entre 0 e 1.'
+    if regras['rounding_step'] <= 0:
+        return None, 'rounding_step deve ser positivo.'
+    if not isinstance(regras['makeup_policy'], str) or regras['makeup_policy'] not in POLITICAS_RECUPERACAO:
+        return None, f"makeup_policy deve ser um de: {', '.join(POLITICAS_RECUPERACAO)}."
+    return regras, None
+
+def gravar_regras_notas(cursor, periodo_id, regras):
+    cursor.execute('''
+        INSERT INTO GradingRules (academic_period_id, tutor_weight, makeup_policy, absence_grade_cap, rounding_step)
+        VALUES (:periodo, :tutor_weight, :makeup_policy, :absence_grade_cap, :rounding_step)
+        ON CONFLICT(academic_period_id) DO UPDATE SET
+            tutor_weight = excluded.tutor_weight,
+            makeup_policy = excluded.makeup_policy,
+            absence_grade_cap = excluded.absence_grade_cap,
+            rounding_step = excluded.rounding_step,
+            updated_at = CURRENT_TIMESTAMP
+    ''', dict(regras, periodo=periodo_id))
+    alteradas = recalcular_notas(cursor, periodo_id=periodo_id)
+    publicar_evento(cursor, periodo_id, 'grades', rules=True, count=alteradas)
+    return alteradas
+
+# Nota mínima de aprovação usada nas análises e no dashboard
+NOTA_APROVACAO = 7.0
+FAIXAS_NOTA = 101
+
+def reconstruir_resumo_notas(cursor, periodo_id=None, modulo_id=None):
+    """Refazer GradeSummary dos módulos filtrados a partir de Grades; devolve quantas notas entraram.
+
+    Caminho de reparo e de cargas em lote: lê (módulo, nota) em blocos, monta
+    as chaves módulo * 101 + faixa com NumPy e conta com np.unique, sem
+    depender de quantos módulos existem. Roda dentro da transação de `cursor`.
+    """
+    filtros, parametros = [], {}
+    if periodo_id is not None:
+        filtros.append('module_id IN (SELECT id FROM Modules WHERE academic_period_id = :periodo)')
+        parametros['periodo'] = periodo_id
+    if modulo_id is not None:
+        filtros.append('module_id = :modulo')
+        parametros['modulo'] = modulo_id
+    where = 'WHERE ' + ' AND '.join(filtros) if filtros else ''
+    cursor.execute(f'DELETE FROM GradeSummary {where}', parametros)
+
+    leitura = cursor.connection.cursor()
+    leitura.execute(f'''
+        SELECT module_id, final_grade FROM (
+            SELECT e.module_id, g.final_grade FROM Grades g JOIN Enrollments e ON g.enrollment_id = e.id
+        ) {where}
+    ''', parametros)
+    chaves = []
+    while True:
+        linhas = leitura.fetchmany(LOTE_RECALCULO)
+        if not linhas:
+            break
+        dados = np.array(linhas, dtype=np.float64)
+        # Mesma faixa de FAIXA_NOTA_SQL (décimo truncado)
+        faixas = np.clip(np.floor(np.nan_to_num(dados[:, 1]) * 10 + 1e-9), 0, FAIXAS_NOTA - 1)
+        chaves.append(dados[:, 0].astype(np.int64) * FAIXAS_NOTA + faixas.astype(np.int64))
+    if not chaves:
+        return 0
+    chaves, contagens = np.unique(np.concatenate(chaves), return_counts=True)
+    modulos, faixas = np.divmod(chaves, FAIXAS_NOTA)
+    cursor.executemany('INSERT INTO GradeSummary (module_id, bucket, students) VALUES (?, ?, ?)',
+                       zip(modulos.tolist(), faixas.tolist(), contagens.tolist()))
+    return int(contagens.sum())
+
+def histogramas_notas(conn, modulos):
+    """Matriz len(modulos) x 101 com as contagens de GradeSummary, na ordem de `modulos`"""
+    histogramas = np.zeros((len(modulos), FAIXAS_NOTA), dtype=np.int64)
+    posicao = {modulo: i for i, modulo in enumerate(modulos)}
+    linhas = conn.execute('''
+        SELECT module_id, bucket, students FROM GradeSummary
+        WHERE module_id IN (SELECT value FROM json_each(?)) AND students > 0
+    ''', (json.dumps(list(modulos)),)).fetchall()
+    if linhas:
+        dados = np.array(linhas, dtype=np.int64)
+        histogramas[[posicao[m] for m in dados[:, 0].tolist()], dados[:, 1]] = dados[:, 2]
+    return histogramas
+
+def resumir_notas(histograma):
+    """Contagem, aprovação, média, percentis e distribuição em 10 faixas de um histograma de 101 décimos"""
+    total = int(histograma.sum())
+    notas = np.arange(FAIXAS_NOTA) / 10
+    if total == 0:
+        percentis = dict.fromkeys(('p25', 'median', 'p75', 'p90'))
+        return dict(students=0, passed=0, pass_rate=None, mean=None, **percentis, distribution=[0] * 10)
+    aprovados = int(histograma[notas >= NOTA_APROVACAO].sum())
+    # Percentil pelo posto mais próximo: a menor nota com acumulado >= p * total
+    acumulado = np.cumsum(histograma)
+    percentis = {nome: float(notas[np.searchsorted(acumulado, math.ceil(p * total))])
+                 for nome, p in (('p25', 0.25), ('median', 0.5), ('p75', 0.75), ('p90', 0.9))}
+    # Faixas [0, 1), [1, 2), ..., [9, 10]: o 10 entra na última
+    distribuicao = np.add.reduceat(histograma, np.arange(0, 100, 10))
+    return dict(students=total, passed=aprovados, pass_rate=round(aprovados / total, 4),
+                mean=round(float(histograma @ notas) / total, 2), **percentis,
+                distribution=distribuicao.tolist())
+
+@app.route('/api/periods/<int:period_id>/grading-rules', methods=['GET', 'PUT'])
+@role_required(['admin', 'coordinator'])
+def api_period_grading_rules(period_id):
+    """Regras de nota final do período; o PUT recalcula as notas de todo o período"""
+    if session.get('user_role') != 'admin' and not tem_acesso('periodos', period_id):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    conn = conectar_bd(somente_leitura=True)
+    periodo = conn.execute('SELECT id FROM AcademicPeriods WHERE id = ?', (period_id,)).fetchone()
+    regras = conn.execute('''
+        SELECT tutor_weight, makeup_policy, absence_grade_cap, rounding_step FROM GradingRules WHERE academic_period_id = ?
+    ''', (period_id,)).fetchone()
+    conn.close()
+    if periodo is None:
+        return jsonify({'error': 'Período não encontrado.'}), 404
+
+    if request.method == 'GET':
+        return jsonify(dict(regras) if regras else REGRAS_NOTAS_PADRAO)
+
+    regras, erro = validar_regras_notas(request.get_json(silent=True))
+    if erro:
+        return jsonify({'error': erro}), 400
+    alteradas = executar_escrita(gravar_regras_notas, period_id, regras)
+    registrar_escrita('Grades')
+    return jsonify({'message': f'Regras salvas; {alteradas} notas finais recalculadas.', 'rules': regras, 'recalculated': alteradas})
+
+@app.route('/api/modules/<int:module_id>/grades/recalculate', methods=['POST'])
+@role_required(['professor', 'coordinator'])
+def api_recalculate_module_grades(module_id):
+    """Recalcular as notas finais de um módulo com as regras do período"""
+    if not tem_acesso('modulos', module_id):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    def recalcular(cursor):
+        alteradas = recalcular_notas(cursor, modulo_id=module_id)
+        publicar_evento_modulo(cursor, module_id, 'grades', count=alteradas)
+        return alteradas
+
+    alteradas = executar_escrita(recalcular)
+    registrar_escrita('Grades')
+    return jsonify({'message': f'{alteradas} notas finais recalculadas.', 'recalculated': alteradas})
+
+# Análises de notas, lidas do histograma GradeSummary
+@app.route('/api/analytics/periods/<int:period_id>')
+@role_required(['admin', 'coordinator'])
+@resposta_condicional('Grades', 'Enrollments', 'Modules', 'AcademicPeriods')
+def api_period_analytics(period_id):
+    """Distribuição, aprovação, média e percentis do período e de cada módulo"""
+    if session.get('user_role') != 'admin' and not tem_acesso('periodos', period_id):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
     conn = conectar_bd()
-    cursor = conn.cursor()
+    periodo = conn.execute('SELECT id, name FROM AcademicPeriods WHERE id = ?', (period_id,)).fetchone()
+    if periodo is None:
+        conn.close()
+        return jsonify({'error': 'Período não encontrado.'}), 404
+    modulos = conn.execute('''
+        SELECT id, name, code FROM Modules WHERE academic_period_id = ? ORDER BY name, id
+    ''', (period_id,)).fetchall()
+    histogramas = histogramas_notas(conn, [modulo['id'] for modulo in modulos])
+    conn.close()
 
-    # Verificar se o coordenador tem acesso a este período
-    user_id = session.get('user_id')
-    cursor.execute('SELECT * FROM AcademicPeriods WHERE id = ? AND coordinator_id = ?', (period_id, user_id))
-    if not cursor.fetchone():
+    return jsonify({
+        'period_id': periodo['id'],
+        'period_name': periodo['name'],
+        'summary': resumir_notas(histogramas.sum(axis=0)),
+        'modules': [dict(module_id=modulo['id'], name=modulo['name'], code=modulo['code'], **resumir_notas(histograma))
+                    for modulo, histograma in zip(modulos, histogramas)],
+    })
+
+@app.route('/api/analytics/modules/<int:module_id>')
+@role_required(['admin', 'coordinator', 'professor'])
+@resposta_condicional('Grades', 'Enrollments', 'Modules')
+def api_module_analytics(module_id):
+    """Distribuição, aprovação, média e percentis das notas finais do módulo"""
+    if session.get('user_role') != 'admin' and not tem_acesso('modulos', module_id):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    conn = conectar_bd()
+    modulo = conn.execute('SELECT id, name, code FROM Modules WHERE id = ?', (module_id,)).fetchone()
+    if modulo is None:
         conn.close()
+        return jsonify({'error': 'Módulo não encontrado.'}), 404
+    histograma = histogramas_notas(conn, [module_id])[0]
+    conn.close()
+
+    return jsonify(dict(module_id=modulo['id'], name=modulo['name'], code=modulo['code'], **resumir_notas(histograma)))
+
+@app.route('/api/analytics/rebuild', methods=['POST'])
+@role_required(['admin'])
+def api_rebuild_analytics():
+    """Refazer o histograma de notas a partir de Grades (reparo após cargas diretas no banco)"""
+    def reconstruir(cursor):
+        total = reconstruir_resumo_notas(cursor)
+        cursor.execute("UPDATE TableVersions SET version = version + 1 WHERE table_name = 'Grades'")
+        return total
+
+    total = executar_escrita(reconstruir)
+    registrar_escrita('Grades')
+    return jsonify({'message': f'Histograma refeito com {total} notas.', 'grades': total})
+
+@app.route('/api/periods/<int:period_id>/at-risk')
+@role_required(['admin', 'coordinator'])
+@resposta_condicional('Grades', 'Enrollments', 'Modules', 'Students', 'AcademicPeriods')
+def api_period_at_risk(period_id):
+    """Matrículas do período perto do limite de faltas, da maior razão faltas / max_absences para a menor.
+
+    Lê o índice AbsenceRisk em ordem; aceita `min_ratio` (padrão AT_RISK_MIN_RATIO),
+    `module_id` e a paginação de responder_lista (`limit`, `after`, `stream`).
+    """
+    if session.get('user_role') != 'admin' and not tem_acesso('periodos', period_id):
         return jsonify({'error': 'Acesso negado.'}), 403
-    
-    if request.method == 'GET':
-        cursor.execute('SELECT * FROM Students WHERE academic_period_id = ? ORDER BY full_name', (period_id,))
-        students = [dict(row) for row in cursor.fetchall()]
+
+    razao_minima = request.args.get('min_ratio', app.config['AT_RISK_MIN_RATIO'], type=float)
+    filtros, parametros = ['r.academic_period_id = ?', 'r.ratio >= ?'], [period_id, razao_minima]
+    if request.args.get('module_id'):
+        filtros.append('r.module_id = ?')
+        parametros.append(request.args.get('module_id', type=int))
+    return responder_lista(f'''
+        SELECT r.enrollment_id, r.ratio, r.absences, r.max_absences,
+               r.student_id, s.student_number, s.full_name AS student_name,
+               r.module_id, m.code AS module_code, m.name AS module_name
+        FROM AbsenceRisk r
+        JOIN Students s ON r.student_id = s.id
+        JOIN Modules m ON r.module_id = m.id
+        WHERE {' AND '.join(filtros)}
+    ''', parametros, ordem=('ratio', 'enrollment_id'), decrescente=True)
+
+@app.route('/api/stream/periods/<int:period_id>')
+@role_required(['admin', 'coordinator'])
+def api_stream_period(period_id):
+    """Stream SSE com os eventos do período: 'grades', 'students' e 'modules' (e 'reset' se o histórico não cobre a reconexão)"""
+    if session.get('user_role') != 'admin' and not tem_acesso('periodos', period_id):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    assinatura = difusor.assinar(period_id)
+    if assinatura is None:
+        resposta = jsonify({'error': 'Limite de streams atingido; tente novamente.'})
+        resposta.headers['Retry-After'] = str(int(app.config['STREAM_RETRY_SECONDS']))
+        return resposta, 503
+
+    # Reconexão: repassar o que o cliente perdeu, se ainda estiver no histórico
+    perdidos = []
+    ultimo = request.headers.get('Last-Event-ID', type=int)
+    if ultimo is not None:
+        conn = conectar_bd()
+        perdidos = [tuple(row) for row in conn.execute('''
+            SELECT id, academic_period_id, kind, data FROM ChangeEvents
+            WHERE academic_period_id = ? AND id > ? ORDER BY id LIMIT ?
+        ''', (period_id, ultimo, app.config['STREAM_BUFFER'] + 1))]
+        primeiro, mais_recente = conn.execute('SELECT MIN(id), MAX(id) FROM ChangeEvents').fetchone()
         conn.close()
-        return jsonify(students)
-    
-    elif request.method == 'POST':
-        data = request.get_json()
-        try:
-            cursor.execute('''
-                INSERT INTO Students (student_number, full_name, email, academic_period_id, enrollment_date, medical_certificates, referral_info, observations) 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                data['student_number'],
-                data['full_name'],
-                data.get('email', ''),
-                period_id,
-                data['enrollment_date'],
-                data.get('medical_certificates', 0),
-                data.get('referral_info', ''),
-                data.get('observations', '')
-            ))
-            conn.commit()
-            conn.close()
-            return jsonify({'message': 'Estudante criado com sucesso!'}), 201
-        except sqlite3.IntegrityError:
-            conn.close()
-            return jsonify({'error': 'Número de matrícula já existe.'}), 400
+        if len(perdidos) > app.config['STREAM_BUFFER'] or (primeiro is not None and ultimo < primeiro - 1):
+            perdidos = [(mais_recente, period_id, 'reset', '{}')]
+
+    resposta = Response(gerar_stream(assinatura, perdidos), mimetype='text/event-stream')
+    resposta.headers['Cache-Control'] = 'no-cache'
+    resposta.headers['X-Accel-Buffering'] = 'no'
+    # Se o gerador nem chegar a rodar (cliente saiu antes), a assinatura é liberada aqui
+    resposta.call_on_close(lambda: difusor.cancelar(assinatura))
+    return resposta
 
 # API do Professor
 @app.route('/api/professor/modules')
 @role_required(['professor'])
+@resposta_condicional('Modules', 'AcademicPeriods')
 def api_professor_modules():
     user_id = session.get('user_id')
     conn = conectar_bd()
@@ -765,105 +3409,140 @@ def api_professor_modules():
 
 @app.route('/api/modules/<int:module_id>/students')
 @role_required(['professor'])
+@resposta_condicional('Students', 'Enrollments', 'Grades', 'Modules')
 def api_module_students(module_id):
-    user_id = session.get('user_id')
-    conn = conectar_bd()
-    cursor = conn.cursor()
-    
     # Verificar se o professor tem acesso a este módulo
-    cursor.execute('SELECT * FROM Modules WHERE id = ? AND professor_id = ?', (module_id, user_id))
-    if not cursor.fetchone():
-        conn.close()
+    if not tem_acesso('modulos', module_id):
         return jsonify({'error': 'Acesso negado.'}), 403
-    
-    cursor.execute('''
+
+    return responder_lista('''
         SELECT s.*, e.id as enrollment_id, e.status, 
                g.tutor_grade, g.regular_exam_grade, g.makeup_exam_grade, g.final_grade, g.absences 
         FROM Students s 
         JOIN Enrollments e ON s.id = e.student_id 
         LEFT JOIN Grades g ON e.id = g.enrollment_id 
-        WHERE e.module_id = ? 
-        ORDER BY s.full_name
+        WHERE e.module_id = ?
     ''', (module_id,))
-    students = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-
-    return jsonify(students)
 
 @app.route('/api/grades/<int:enrollment_id>', methods=['PUT'])
 @role_required(['professor'])
 def api_update_grades(enrollment_id):
-    user_id = session.get('user_id')
-    conn = conectar_bd()
-    cursor = conn.cursor()
-    
     # Verificar se o professor tem acesso a esta matrícula
-    cursor.execute('''
-        SELECT e.* FROM Enrollments e 
-        JOIN Modules m ON e.module_id = m.id 
-        WHERE e.id = ? AND m.professor_id = ?
-    ''', (enrollment_id, user_id))
-    if not cursor.fetchone():
-        conn.close()
+    if not tem_acesso('matriculas', enrollment_id):
         return jsonify({'error': 'Acesso negado.'}), 403
 
-    data = request.get_json()
-    
-    # Verificar se já existe registro de notas
-    cursor.execute('SELECT * FROM Grades WHERE enrollment_id = ?', (enrollment_id,))
-    existing_grade = cursor.fetchone()
-    
-    if existing_grade:
-        cursor.execute('''
-            UPDATE Grades SET tutor_grade=?, regular_exam_grade=?, makeup_exam_grade=?, final_grade=?, absences=?, last_updated=CURRENT_TIMESTAMP 
-            WHERE enrollment_id=?
-        ''', (
-            data['tutor_grade'],
-            data['regular_exam_grade'],
-            data['makeup_exam_grade'],
-            data['final_grade'],
-            data['absences'],
-            enrollment_id
-        ))
-    else:
-        cursor.execute('''
-            INSERT INTO Grades (enrollment_id, tutor_grade, regular_exam_grade, makeup_exam_grade, final_grade, absences) 
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            enrollment_id,
-            data['tutor_grade'],
-            data['regular_exam_grade'],
-            data['makeup_exam_grade'],
-            data['final_grade'],
-            data['absences']
-        ))
-    
-    conn.commit()
+    notas = validar_notas(request.get_json(silent=True))
+    if notas is None:
+        return jsonify({'error': 'Notas ausentes ou inválidas.'}), 400
+    finais = executar_escrita(salvar_notas_e_recalcular, [[enrollment_id] + notas])
+    registrar_escrita('Grades')
+
+    return jsonify({'message': 'Notas atualizadas com sucesso!', 'final_grade': finais.get(enrollment_id)})
+
+CAMPOS_NOTAS = ('tutor_grade', 'regular_exam_grade', 'makeup_exam_grade', 'final_grade', 'absences')
+
+def faltas_validas(valor):
+    """Número de faltas como int, ou None se não for um inteiro >= 0 (bool, fração, texto ou negativo)"""
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        return None
+    if not math.isfinite(valor) or valor != int(valor) or valor < 0:
+        return None
+    return int(valor)
+
+def validar_notas(linha):
+    """Valores de CAMPOS_NOTAS (notas entre 0 e 10, faltas >= 0) ou None se algum for inválido.
+
+    final_grade é opcional: é calculada no servidor com as regras do período e o valor enviado é ignorado.
+    """
+    if not isinstance(linha, dict):
+        return None
+    try:
+        notas = [float(linha.get(campo, 0.0) if campo == 'final_grade' else linha[campo]) for campo in CAMPOS_NOTAS[:-1]]
+        faltas = faltas_validas(linha['absences'])
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return None
+    if not all(0 <= nota <= 10 for nota in notas) or faltas is None:
+        return None
+    return notas + [faltas]
+
+def salvar_notas(cursor, valores):
+    """Gravar linhas [enrollment_id, *CAMPOS_NOTAS], criando o registro de notas se faltar"""
+    cursor.executemany('''
+        INSERT INTO Grades (enrollment_id, tutor_grade, regular_exam_grade, makeup_exam_grade, final_grade, absences)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(enrollment_id) DO UPDATE SET
+            tutor_grade = excluded.tutor_grade,
+            regular_exam_grade = excluded.regular_exam_grade,
+            makeup_exam_grade = excluded.makeup_exam_grade,
+            final_grade = excluded.final_grade,
+            absences = excluded.absences,
+            last_updated = CURRENT_TIMESTAMP
+    ''', valores)
+    return len(valores)
+
+@app.route('/api/modules/<int:module_id>/grades', methods=['PUT'])
+@role_required(['professor'])
+def api_update_module_grades(module_id):
+    """API para salvar de uma vez as notas de várias matrículas de um módulo"""
+    linhas = request.get_json(silent=True)
+    if not isinstance(linhas, list):
+        return jsonify({'error': 'Envie uma lista de notas.'}), 400
+    # Ids fora de int (listas, objetos) quebrariam a busca no conjunto de matrículas
+    if not all(isinstance(linha, dict) and type(linha.get('enrollment_id')) is int for linha in linhas):
+        return jsonify({'error': 'Cada item precisa de um enrollment_id inteiro.'}), 400
+
+    # Verificar uma única vez se o professor tem acesso ao módulo
+    if not tem_acesso('modulos', module_id):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    conn = conectar_bd(somente_leitura=True)
+    cursor = conn.cursor()
+    cursor.execute('SELECT id FROM Enrollments WHERE module_id = ?', (module_id,))
+    matriculas = {row['id'] for row in cursor.fetchall()}
     conn.close()
 
-    return jsonify({'message': 'Notas atualizadas com sucesso!'})
+    resultados = []
+    valores = []
+    for linha in linhas:
+        enrollment_id = linha['enrollment_id']
+        if enrollment_id not in matriculas:
+            resultados.append({'enrollment_id': enrollment_id, 'status': 'error', 'error': 'Matrícula não pertence ao módulo.'})
+            continue
+        notas = validar_notas(linha)
+        if notas is None:
+            resultados.append({'enrollment_id': enrollment_id, 'status': 'error', 'error': 'Notas ausentes ou inválidas.'})
+            continue
+        valores.append([enrollment_id] + notas)
+        resultados.append({'enrollment_id': enrollment_id, 'status': 'ok'})
+
+    if valores:
+        finais = executar_escrita(salvar_notas_e_recalcular, valores)
+        registrar_escrita('Grades')
+        for resultado in resultados:
+            if resultado['status'] == 'ok':
+                resultado['final_grade'] = finais.get(resultado['enrollment_id'])
+
+    return jsonify({
+        'message': f'{len(valores)} de {len(linhas)} registros de notas salvos.',
+        'saved': len(valores),
+        'results': resultados
+    })
 
 @app.route('/api/professor/students/<int:student_id>/absences', methods=['GET', 'PUT'])
 @role_required(['professor'])
+@resposta_condicional('Grades', 'Enrollments', 'Modules')
 def api_professor_absences(student_id):
     """API para professores visualizarem e atualizarem faltas de um aluno"""
     user_id = session.get('user_id')
-    conn = conectar_bd()
-    cursor = conn.cursor()
-    
+
     # Verificar se o professor tem acesso a este aluno
-    cursor.execute('''
-        SELECT s.* FROM Students s 
-        JOIN Enrollments e ON s.id = e.student_id
-        JOIN Modules m ON e.module_id = m.id
-        WHERE s.id = ? AND m.professor_id = ?
-    ''', (student_id, user_id))
-    if not cursor.fetchone():
-        conn.close()
+    if not tem_acesso('alunos', student_id):
         return jsonify({'error': 'Acesso negado.'}), 403
 
     if request.method == 'GET':
         # Buscar faltas do aluno nos módulos do professor
+        conn = conectar_bd()
+        cursor = conn.cursor()
         cursor.execute('''
             SELECT AVG(g.absences) as avg_absences, MAX(g.absences) as max_absences
             FROM Grades g
@@ -872,30 +3551,248 @@ def api_professor_absences(student_id):
             WHERE e.student_id = ? AND m.professor_id = ?
         ''', (student_id, user_id))
         result = cursor.fetchone()
+        # Faltas e razão sobre o limite em cada módulo, pelo índice AbsenceRisk
+        cursor.execute('''
+            SELECT r.module_id, m.name AS module_name, r.absences, r.max_absences, r.ratio
+            FROM AbsenceRisk r
+            JOIN Modules m ON r.module_id = m.id
+            WHERE r.student_id = ? AND m.professor_id = ?
+            ORDER BY r.ratio DESC, m.name
+        ''', (student_id, user_id))
+        modulos = [dict(row) for row in cursor.fetchall()]
         conn.close()
         
         return jsonify({
             'absences': int(result['avg_absences'] or 0),
-            'max_absences': int(result['max_absences'] or 0)
+            'max_absences': int(result['max_absences'] or 0),
+            'modules': modulos
         })
     
     elif request.method == 'PUT':
-        data = request.get_json()
-        
-        # Atualizar faltas em todas as matrículas do aluno nos módulos do professor
-        cursor.execute('''
-            UPDATE Grades SET absences = ?, last_updated = CURRENT_TIMESTAMP
-            WHERE enrollment_id IN (
-                SELECT e.id FROM Enrollments e
-                JOIN Modules m ON e.module_id = m.id
-                WHERE e.student_id = ? AND m.professor_id = ?
-            )
-        ''', (data['absences'], student_id, user_id))
-        
-        conn.commit()
+        data = request.get_json(silent=True)
+        faltas = faltas_validas(data.get('absences')) if isinstance(data, dict) else None
+        if faltas is None:
+            return jsonify({'error': 'absences deve ser um inteiro maior ou igual a zero.'}), 400
+        module_id = data.get('module_id')
+        if module_id is not None and type(module_id) is not int:
+            return jsonify({'error': 'module_id inválido.'}), 400
+        if module_id is not None and not tem_acesso('modulos', module_id):
+            return jsonify({'error': 'Acesso negado.'}), 403
+
+        # Com module_id, só a matrícula do aluno nesse módulo; sem ele, todas
+        # as matrículas do aluno nos módulos do professor
+        finais = executar_escrita(atualizar_faltas, faltas, student_id, user_id, module_id)
+        registrar_escrita('Grades')
+
+        return jsonify({
+            'message': 'Faltas atualizadas com sucesso!',
+            'results': [{'enrollment_id': matricula, 'final_grade': final} for matricula, final in finais.items()]
+        })
+
+def atualizar_faltas(cursor, faltas, student_id, professor_id, module_id=None):
+    """Gravar as faltas e recalcular a final (teto por faltas); devolve {enrollment_id: final_grade}"""
+    matriculas = [row[0] for row in cursor.execute('''
+        SELECT e.id FROM Enrollments e
+        JOIN Modules m ON e.module_id = m.id
+        WHERE e.student_id = ? AND m.professor_id = ? AND (? IS NULL OR m.id = ?)
+    ''', (student_id, professor_id, module_id, module_id))]
+    cursor.execute('''
+        UPDATE Grades SET absences = ?, last_updated = CURRENT_TIMESTAMP
+        WHERE enrollment_id IN (SELECT value FROM json_each(?))
+    ''', (faltas, json.dumps(matriculas)))
+    recalcular_notas(cursor, matriculas=matriculas)
+    publicar_evento_notas(cursor, matriculas)
+    return notas_finais(cursor, matriculas)
+
+# Exportação do boletim (CSV/XLSX) em streaming
+class SaidaStreaming(io.RawIOBase):
+    """Arquivo só de escrita que acumula bytes até o gerador da resposta recolhê-los"""
+
+    def __init__(self):
+        self._partes = []
+        self._posicao = 0
+
+    def writable(self):
+        return True
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        self._posicao += len(dados)
+        return len(dados)
+
+    def tell(self):
+        return self._posicao
+
+    def recolher(self):
+        dados = b''.join(self._partes)
+        self._partes = []
+        return dados
+
+def csv_em_streaming(linhas):
+    saida = io.StringIO()
+    escritor = csv.writer(saida)
+    yield '\ufeff'  # BOM para o Excel reconhecer UTF-8
+    for linha in linhas:
+        escritor.writerow(linha)
+        if saida.tell() > 65536:
+            yield saida.getvalue()
+            saida.seek(0)
+            saida.truncate()
+    yield saida.getvalue()
+
+XLSX_ESTRUTURA = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Boletim" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+def celula_xlsx(valor):
+    if valor is None or valor == '':
+        return '<c/>'
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return f'<c><v>{valor}</v></c>'
+    texto = xml_escape(str(valor))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+def xlsx_em_streaming(linhas):
+    """Planilha XLSX gerada linha a linha; o zip é escrito sem seek (data descriptors)"""
+    saida = SaidaStreaming()
+    with zipfile.ZipFile(saida, 'w', zipfile.ZIP_DEFLATED) as pacote:
+        for nome, conteudo in XLSX_ESTRUTURA.items():
+            pacote.writestr(nome, conteudo)
+        yield saida.recolher()
+        with pacote.open('xl/worksheets/sheet1.xml', 'w') as planilha:
+            planilha.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                           b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+            for numero, linha in enumerate(linhas, start=1):
+                celulas = ''.join(celula_xlsx(valor) for valor in linha)
+                planilha.write(f'<row r="{numero}">{celulas}</row>'.encode())
+                if numero % 1000 == 0:
+                    yield saida.recolher()
+            planilha.write(b'</sheetData></worksheet>')
+    yield saida.recolher()
+
+FORMATOS_BOLETIM = {
+    'csv': ('text/csv; charset=utf-8', csv_em_streaming),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', xlsx_em_streaming),
+}
+
+def responder_boletim(linhas, formato, nome_arquivo):
+    tipo, gerar = FORMATOS_BOLETIM[formato]
+    resposta = Response(gerar(linhas), mimetype=tipo)
+    resposta.headers['Content-Disposition'] = f'attachment; filename="{nome_arquivo}.{formato}"'
+    return resposta
+
+def linhas_boletim_periodo(period_id):
+    """Cabeçalho e uma linha por aluno com nota final e faltas de cada módulo do período"""
+    conn = conectar_bd(somente_leitura=True)
+    try:
+        modulos = conn.execute(
+            'SELECT id, code FROM Modules WHERE academic_period_id = ? ORDER BY code, id', (period_id,)
+        ).fetchall()
+        colunas = {modulo['id']: indice for indice, modulo in enumerate(modulos)}
+        cabecalho = ['student_number', 'full_name']
+        for modulo in modulos:
+            cabecalho += [f"{modulo['code']} final_grade", f"{modulo['code']} absences"]
+        yield cabecalho
+
+        cursor = conn.execute('''
+            SELECT s.id, s.student_number, s.full_name, e.module_id, g.final_grade, g.absences
+            FROM Students s
+            LEFT JOIN Enrollments e ON e.student_id = s.id
+            LEFT JOIN Grades g ON g.enrollment_id = e.id
+            WHERE s.academic_period_id = ?
+            ORDER BY s.full_name, s.id
+        ''', (period_id,))
+        # As linhas chegam agrupadas por aluno: só um aluno fica em memória por vez
+        atual = None
+        linha = None
+        for row in cursor:
+            if row['id'] != atual:
+                if linha is not None:
+                    yield linha
+                atual = row['id']
+                linha = [row['student_number'], row['full_name']] + [None] * (2 * len(modulos))
+            indice = colunas.get(row['module_id'])
+            if indice is not None:
+                linha[2 + 2 * indice] = row['final_grade']
+                linha[3 + 2 * indice] = row['absences']
+        if linha is not None:
+            yield linha
+    finally:
+        conn.close()
+
+def linhas_boletim_modulo(module_id):
+    """Cabeçalho e uma linha por matrícula do módulo com todas as notas"""
+    conn = conectar_bd(somente_leitura=True)
+    try:
+        colunas = ['student_number', 'full_name', 'status'] + list(CAMPOS_NOTAS)
+        yield colunas
+        cursor = conn.execute('''
+            SELECT s.student_number, s.full_name, e.status,
+                   g.tutor_grade, g.regular_exam_grade, g.makeup_exam_grade, g.final_grade, g.absences
+            FROM Enrollments e
+            JOIN Students s ON s.id = e.student_id
+            LEFT JOIN Grades g ON g.enrollment_id = e.id
+            WHERE e.module_id = ?
+            ORDER BY s.full_name, s.id
+        ''', (module_id,))
+        for row in cursor:
+            yield [row[coluna] for coluna in colunas]
+    finally:
         conn.close()
 
-        return jsonify({'message': 'Faltas atualizadas com sucesso!'})
+@app.route('/api/periods/<int:period_id>/gradebook.<formato>')
+@role_required(['coordinator'])
+@resposta_condicional('Students', 'Enrollments', 'Grades', 'Modules', 'AcademicPeriods')
+@compressao(gzip=1)  # CSV de vários MB: gzip 6 custa ~8x a CPU do nível 1 para ~20% menos bytes
+def api_period_gradebook(period_id, formato):
+    """Boletim do período (aluno x módulo) em CSV ou XLSX"""
+    if formato not in FORMATOS_BOLETIM:
+        return jsonify({'error': 'Formato não suportado.'}), 404
+
+    if not tem_acesso('periodos', period_id):
+        return jsonify({'error': 'Acesso negado.'}), 403
+    return responder_boletim(linhas_boletim_periodo(period_id), formato, f'boletim-periodo-{period_id}')
+
+@app.route('/api/modules/<int:module_id>/gradebook.<formato>')
+@role_required(['professor', 'coordinator'])
+@resposta_condicional('Students', 'Enrollments', 'Grades', 'Modules', 'AcademicPeriods')
+@compressao(gzip=1)  # CSV de vários MB: gzip 6 custa ~8x a CPU do nível 1 para ~20% menos bytes
+def api_module_gradebook(module_id, formato):
+    """Boletim de um módulo em CSV ou XLSX (professor do módulo ou coordenador do período)"""
+    if formato not in FORMATOS_BOLETIM:
+        return jsonify({'error': 'Formato não suportado.'}), 404
+
+    # Professor: módulos que leciona; coordenador: módulos dos seus períodos
+    if not tem_acesso('modulos', module_id):
+        return jsonify({'error': 'Acesso negado.'}), 403
+
+    return responder_boletim(linhas_boletim_modulo(module_id), formato, f'boletim-modulo-{module_id}')
 
 @app.errorhandler(404)
 def not_found(error):
@@ -905,6 +3802,13 @@ def not_found(error):
 def forbidden(error):
     return render_template('errors/403.html'), 403
 
+@app.errorhandler(PoolEsgotado)
+def pool_esgotado(error):
+    log.warning('Pool de leitura esgotado: %s', error)
+    resposta = jsonify({'error': 'Servidor ocupado; tente novamente.'})
+    resposta.headers['Retry-After'] = '1'
+    return resposta, 503
+
 @app.route('/test/professors')
 def test_professors_page():
     """Página de teste para verificar a API de professores"""
@@ -914,28 +3818,21 @@ def test_professors_page():
 @role_required(['admin'])
 def api_coordinators():
     """API para buscar coordenadores disponíveis"""
-    conn = conectar_bd()
-    cursor = conn.cursor()
-    cursor.execute('SELECT id, full_name FROM Users WHERE role = "coordinator" ORDER BY full_name')
-    coordinators = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return jsonify(coordinators)
+    dados = dados_referencia.obter()
+    return responder_referencia(dados['coordinators'], f"{dados['versao']}-coordinators")
 
 # API para o coordenador adicionar módulos
 @app.route('/api/coordinator/periods/<int:period_id>/modules', methods=['GET', 'POST'])
 @role_required(['coordinator'])
+@resposta_condicional('Modules', 'Users', 'AcademicPeriods')
 def api_coordinator_modules(period_id):
-    conn = conectar_bd()
-    cursor = conn.cursor()
-    
     # Verificar se o coordenador tem acesso a este período
-    user_id = session.get('user_id')
-    cursor.execute('SELECT * FROM AcademicPeriods WHERE id = ? AND coordinator_id = ?', (period_id, user_id))
-    if not cursor.fetchone():
-        conn.close()
+    if not tem_acesso('periodos', period_id):
         return jsonify({'error': 'Acesso negado.'}), 403
-    
+
     if request.method == 'GET':
+        conn = conectar_bd(somente_leitura=True)
+        cursor = conn.cursor()
         cursor.execute('''
             SELECT m.*, u.full_name as professor_name 
             FROM Modules m 
@@ -949,209 +3846,171 @@ def api_coordinator_modules(period_id):
     
     elif request.method == 'POST':
         data = request.get_json()
-        try:
+        valores = (
+            data['name'],
+            data['code'],
+            data['professor_id'],
+            period_id,
+            data.get('credits', 4),
+            data.get('max_absences', 10)
+        )
+
+        def inserir(cursor):
             cursor.execute('''
                 INSERT INTO Modules (name, code, professor_id, academic_period_id, credits, max_absences) 
                 VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                data['name'],
-                data['code'],
-                data['professor_id'],
-                period_id,
-                data.get('credits', 4),
-                data.get('max_absences', 10)
-            ))
-            conn.commit()
-            conn.close()
-            return jsonify({'message': 'Módulo criado com sucesso!'}), 201
+            ''', valores)
+            publicar_evento(cursor, period_id, 'modules', action='created', module_id=cursor.lastrowid)
+
+        try:
+            executar_escrita(inserir)
         except sqlite3.IntegrityError:
-            conn.close()
             return jsonify({'error': 'Código do módulo já existe neste período.'}), 400
+        registrar_escrita('Modules')
+        return jsonify({'message': 'Módulo criado com sucesso!'}), 201
+
+def atualizar_aluno(cursor, student_id, data):
+    """Atualizar os dados cadastrais do aluno; roda na fila de escrita"""
+    cursor.execute('''
+        UPDATE Students SET 
+            student_number=?, full_name=?, email=?, enrollment_date=?, 
+            medical_certificates=?, referral_info=?, observations=?
+        WHERE id=?
+    ''', (
+        data['student_number'],
+        data['full_name'],
+        data.get('email', ''),
+        data['enrollment_date'],
+        data.get('medical_certificates', 0),
+        data.get('referral_info', ''),
+        data.get('observations', ''),
+        student_id
+    ))
+    publicar_evento_aluno(cursor, student_id, 'students', action='updated')
 
 # API para o coordenador editar informações dos alunos
 @app.route('/api/coordinator/students/<int:student_id>', methods=['PUT', 'DELETE'])
 @role_required(['coordinator'])
 def api_coordinator_edit_student(student_id):
-    conn = conectar_bd()
-    cursor = conn.cursor()
-    
     # Verificar se o coordenador tem acesso a este aluno
-    user_id = session.get('user_id')
-    cursor.execute('''
-        SELECT s.* FROM Students s 
-        JOIN AcademicPeriods ap ON s.academic_period_id = ap.id 
-        WHERE s.id = ? AND ap.coordinator_id = ?
-    ''', (student_id, user_id))
-    if not cursor.fetchone():
-        conn.close()
+    if not tem_acesso('alunos', student_id):
         return jsonify({'error': 'Acesso negado.'}), 403
-    
+
     if request.method == 'PUT':
-        data = request.get_json()
         try:
-            cursor.execute('''
-                UPDATE Students SET 
-                    student_number=?, full_name=?, email=?, enrollment_date=?, 
-                    medical_certificates=?, referral_info=?, observations=?
-                WHERE id=?
-            ''', (
-                data['student_number'],
-                data['full_name'],
-                data.get('email', ''),
-                data['enrollment_date'],
-                data.get('medical_certificates', 0),
-                data.get('referral_info', ''),
-                data.get('observations', ''),
-                student_id
-            ))
-            conn.commit()
-            conn.close()
-            return jsonify({'message': 'Informações do estudante atualizadas com sucesso!'})
+            executar_escrita(atualizar_aluno, student_id, request.get_json())
         except sqlite3.IntegrityError:
-            conn.close()
             return jsonify({'error': 'Número de matrícula já existe.'}), 400
+        registrar_escrita('Students')
+        return jsonify({'message': 'Informações do estudante atualizadas com sucesso!'})
     
     elif request.method == 'DELETE':
-        try:
+        def excluir(cursor):
+            # O período vem do aluno: o evento é gravado antes da exclusão
+            publicar_evento_aluno(cursor, student_id, 'students', action='deleted')
             cursor.execute('DELETE FROM Students WHERE id = ?', (student_id,))
-            conn.commit()
-            conn.close()
-            return jsonify({'message': 'Estudante excluído com sucesso!'})
-        except sqlite3.Error as e:
-            conn.close()
+
+        try:
+            executar_escrita(excluir)
+        except sqlite3.Error:
             return jsonify({'error': 'Erro ao excluir estudante.'}), 500
+        registrar_escrita('Students')
+        return jsonify({'message': 'Estudante excluído com sucesso!'})
 
 # API para buscar professores disponíveis
 @app.route('/api/coordinator/professors')
 @role_required(['coordinator'])
 def api_coordinator_professors():
     """API para buscar professores disponíveis"""
-    print(f"API chamada por usuário: {session.get('user_id')}, role: {session.get('user_role')}")  # Debug log
-    conn = conectar_bd()
-    cursor = conn.cursor()
-    cursor.execute('SELECT id, full_name FROM Users WHERE role = "professor" ORDER BY full_name')
-    professors = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    print(f"Professores encontrados: {professors}")  # Debug log
-    return jsonify(professors)
+    log.debug("API chamada por usuário: %s, role: %s", session.get('user_id'), session.get('user_role'))
+    dados = dados_referencia.obter()
+    return responder_referencia(dados['professors'], f"{dados['versao']}-professors")
 
 # API para professores gerenciarem alunos
 @app.route('/api/professor/students', methods=['GET', 'POST'])
 @role_required(['professor'])
+@resposta_condicional('Students', 'AcademicPeriods', 'Enrollments', 'Modules')
 def api_professor_students():
     """API para professores gerenciarem alunos"""
     user_id = session.get('user_id')
-    conn = conectar_bd()
-    cursor = conn.cursor()
     
     if request.method == 'GET':
         # Buscar alunos dos módulos do professor
-        cursor.execute('''
+        return responder_lista('''
             SELECT DISTINCT s.*, ap.name as period_name
             FROM Students s 
             JOIN AcademicPeriods ap ON s.academic_period_id = ap.id
             JOIN Enrollments e ON s.id = e.student_id
             JOIN Modules m ON e.module_id = m.id
             WHERE m.professor_id = ?
-            ORDER BY s.full_name
         ''', (user_id,))
-        students = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return jsonify(students)
     
     elif request.method == 'POST':
         data = request.get_json()
-        print(f"[DEBUG] Dados recebidos para criação de aluno: {data}")  # Debug log
+        log.debug("Dados recebidos para criação de aluno: %s", data)
         try:
             # Verificar se o período existe e está ativo
-            cursor.execute('SELECT id FROM AcademicPeriods WHERE id = ? AND is_active = 1', (data['academic_period_id'],))
-            period_check = cursor.fetchone()
-            print(f"[DEBUG] Verificação de período - ID: {data['academic_period_id']}, Encontrado: {period_check}")  # Debug log
-            if not period_check:
+            conn = conectar_bd(somente_leitura=True)
+            try:
+                period_check = conn.execute('SELECT id FROM AcademicPeriods WHERE id = ? AND is_active = 1', (data['academic_period_id'],)).fetchone()
+            finally:
                 conn.close()
+            log.debug("Verificação de período - ID: %s, Encontrado: %s", data['academic_period_id'], period_check is not None)
+            if not period_check:
                 return jsonify({'error': 'Período acadêmico não encontrado ou inativo.'}), 400
-            
-            # Inserir novo aluno
-            cursor.execute('''
-                INSERT INTO Students (student_number, full_name, email, academic_period_id, enrollment_date, medical_certificates, referral_info, observations) 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                data['student_number'],
-                data['full_name'],
-                data.get('email', ''),
-                data['academic_period_id'],
-                data['enrollment_date'],
-                data.get('medical_certificates', 0),
-                data.get('referral_info', ''),
-                data.get('observations', '')
-            ))
-            
-            student_id = cursor.lastrowid
-            print(f"[DEBUG] Aluno criado com ID: {student_id}")  # Debug log
-            
-            # Matricular o aluno nos módulos do professor (se existirem)
-            cursor.execute('SELECT id FROM Modules WHERE professor_id = ? AND academic_period_id = ?', (user_id, data['academic_period_id']))
-            modules = cursor.fetchall()
-            print(f"[DEBUG] Módulos encontrados para matricular: {modules}")  # Debug log
-            
-            if modules:
-                for module in modules:
-                    cursor.execute('''
-                        INSERT OR IGNORE INTO Enrollments (student_id, module_id) 
-                        VALUES (?, ?)
-                    ''', (student_id, module['id']))
-                    
-                    # Buscar o ID da matrícula criada
-                    cursor.execute('SELECT id FROM Enrollments WHERE student_id = ? AND module_id = ?', (student_id, module['id']))
-                    enrollment = cursor.fetchone()
-                    
-                    if enrollment:
-                        # Criar registro de notas vazio
-                        cursor.execute('''
-                            INSERT OR IGNORE INTO Grades (enrollment_id, tutor_grade, regular_exam_grade, makeup_exam_grade, final_grade, absences) 
-                            VALUES (?, 0.0, 0.0, 0.0, 0.0, 0)
-                        ''', (enrollment['id'],))
-            else:
-                print(f"[DEBUG] Nenhum módulo encontrado para o professor {user_id} no período {data['academic_period_id']}")  # Debug log
-            
-            conn.commit()
-            print(f"[DEBUG] Transação commitada com sucesso!")  # Debug log
-            conn.close()
-            
-            if modules:
-                return jsonify({'message': f'Aluno criado e matriculado em {len(modules)} módulo(s) com sucesso!'}), 201
+
+            def inserir(cursor):
+                cursor.execute('''
+                    INSERT INTO Students (student_number, full_name, email, academic_period_id, enrollment_date, medical_certificates, referral_info, observations) 
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    data['student_number'],
+                    data['full_name'],
+                    data.get('email', ''),
+                    data['academic_period_id'],
+                    data['enrollment_date'],
+                    data.get('medical_certificates', 0),
+                    data.get('referral_info', ''),
+                    data.get('observations', '')
+                ))
+                student_id = cursor.lastrowid
+                log.debug("Aluno criado com ID: %s", student_id)
+
+                # Matricular o aluno nos módulos do professor (se existirem)
+                matriculas = matricular_alunos(cursor, data['academic_period_id'], aluno_id=student_id, professor_id=user_id)
+                publicar_evento(cursor, data['academic_period_id'], 'students', action='created', student_id=student_id)
+                return matriculas
+
+            matriculas = executar_escrita(inserir)
+            log.debug("Matrículas criadas: %s", matriculas)
+            if not matriculas:
+                log.debug("Nenhum módulo encontrado para o professor %s no período %s", user_id, data['academic_period_id'])
+            registrar_escrita('Students', 'Enrollments', 'Grades')
+
+            if matriculas:
+                return jsonify({'message': f'Aluno criado e matriculado em {matriculas} módulo(s) com sucesso!', 'enrollments_created': matriculas}), 201
             else:
-                return jsonify({'message': 'Aluno criado com sucesso! (Ainda não há módulos para matricular)'}), 201
+                return jsonify({'message': 'Aluno criado com sucesso! (Ainda não há módulos para matricular)', 'enrollments_created': 0}), 201
         except sqlite3.IntegrityError as e:
-            print(f"[DEBUG] Erro de integridade: {e}")  # Debug log
-            conn.close()
+            log.warning("Erro de integridade: %s", e)
             return jsonify({'error': 'Número de matrícula já existe.'}), 400
         except Exception as e:
-            print(f"[DEBUG] Erro inesperado: {e}")  # Debug log
-            conn.close()
+            log.exception("Erro inesperado ao criar aluno")
             return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
 @app.route('/api/professor/students/<int:student_id>', methods=['GET', 'PUT'])
 @role_required(['professor'])
+@resposta_condicional('Students', 'AcademicPeriods', 'Enrollments', 'Modules')
 def api_professor_student_detail(student_id):
     """API para professores visualizarem e editarem informações dos alunos"""
-    user_id = session.get('user_id')
-    conn = conectar_bd()
-    cursor = conn.cursor()
-    
     # Verificar se o professor tem acesso a este aluno
-    cursor.execute('''
-        SELECT s.* FROM Students s 
-        JOIN Enrollments e ON s.id = e.student_id
-        JOIN Modules m ON e.module_id = m.id
-        WHERE s.id = ? AND m.professor_id = ?
-    ''', (student_id, user_id))
-    if not cursor.fetchone():
-        conn.close()
+    if not tem_acesso('alunos', student_id):
         return jsonify({'error': 'Acesso negado.'}), 403
-    
+
     if request.method == 'GET':
         # Buscar dados completos do aluno
+        conn = conectar_bd(somente_leitura=True)
+        cursor = conn.cursor()
         cursor.execute('''
             SELECT s.*, ap.name as period_name
             FROM Students s 
@@ -1163,96 +4022,60 @@ def api_professor_student_detail(student_id):
         return jsonify(student)
     
     elif request.method == 'PUT':
-        data = request.get_json()
         try:
-            cursor.execute('''
-                UPDATE Students SET 
-                    student_number=?, full_name=?, email=?, enrollment_date=?, 
-                    medical_certificates=?, referral_info=?, observations=?
-                WHERE id=?
-            ''', (
-                data['student_number'],
-                data['full_name'],
-                data.get('email', ''),
-                data['enrollment_date'],
-                data.get('medical_certificates', 0),
-                data.get('referral_info', ''),
-                data.get('observations', ''),
-                student_id
-            ))
-            conn.commit()
-            conn.close()
-            return jsonify({'message': 'Informações do aluno atualizadas com sucesso!'})
+            executar_escrita(atualizar_aluno, student_id, request.get_json())
         except sqlite3.IntegrityError:
-            conn.close()
             return jsonify({'error': 'Número de matrícula já existe.'}), 400
+        registrar_escrita('Students')
+        return jsonify({'message': 'Informações do aluno atualizadas com sucesso!'})
 
 @app.route('/api/professor/periods')
 @role_required(['professor'])
 def api_professor_periods():
     """API para professores buscarem períodos disponíveis"""
-    user_id = session.get('user_id')
-    print(f"[DEBUG] Buscando períodos para professor ID: {user_id}")  # Debug log
-    conn = conectar_bd()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT DISTINCT ap.* FROM AcademicPeriods ap
-        JOIN Modules m ON ap.id = m.academic_period_id
-        WHERE m.professor_id = ? AND ap.is_active = 1
-        ORDER BY ap.name
-    ''', (user_id,))
-    periods = [dict(row) for row in cursor.fetchall()]
-    print(f"[DEBUG] Períodos encontrados: {periods}")  # Debug log
-    conn.close()
-    
-    return jsonify(periods)
-
-# API alternativa para períodos (mais permissiva)
-@app.route('/api/periods')
-@login_required
-def api_periods_alternative():
-    """API para buscar todos os períodos ativos (mais permissiva)"""
-    print(f"[DEBUG] API alternativa de períodos chamada por usuário: {session.get('user_id')}")  # Debug log
-    conn = conectar_bd()
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT * FROM AcademicPeriods WHERE is_active = 1 ORDER BY name')
-    periods = [dict(row) for row in cursor.fetchall()]
-    print(f"[DEBUG] Todos os períodos ativos encontrados: {periods}")  # Debug log
-    conn.close()
-    
-    return jsonify(periods)
+    log.debug("Buscando períodos para professor ID: %s", session.get('user_id'))
+    # Períodos ativos em que o professor tem módulos: dados de referência filtrados pelas permissões em cache
+    dados = dados_referencia.obter()
+    periodos = permissoes_usuario().get('periodos', frozenset())
+    periods = [p for p in dados['periods'] if p['id'] in periodos]
+    return responder_referencia(periods, f"{dados['versao']}-" + '.'.join(str(p['id']) for p in periods))
 
-# API alternativa para professores (mais permissiva)
+# API alternativa para professores (qualquer usuário logado)
 @app.route('/api/professors')
+@login_required
 def api_professors():
     """API para buscar professores (sem restrição de role)"""
-    print(f"API alternativa chamada por usuário: {session.get('user_id')}, role: {session.get('user_role')}")  # Debug log
-    try:
-        conn = conectar_bd()
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, full_name FROM Users WHERE role = "professor" ORDER BY full_name')
-        professors = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        print(f"Professores encontrados (API alternativa): {professors}")  # Debug log
-        return jsonify(professors)
-    except Exception as e:
-        print(f"Erro na API de professores: {e}")  # Debug log
-        return jsonify({'error': str(e)}), 500
+    log.debug("API alternativa chamada por usuário: %s, role: %s", session.get('user_id'), session.get('user_role'))
+    dados = dados_referencia.obter()
+    return responder_referencia(dados['professors'], f"{dados['versao']}-professors")
 
-# API temporária para teste (sem autenticação)
+# API temporária para teste
 @app.route('/api/test/professors')
+@login_required
 def api_test_professors():
     """API temporária para teste de professores"""
-    conn = conectar_bd()
-    cursor = conn.cursor()
-    cursor.execute('SELECT id, full_name FROM Users WHERE role = "professor" ORDER BY full_name')
-    professors = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    print(f"API de teste - Professores encontrados: {professors}")  # Debug log
-    return jsonify(professors)
+    dados = dados_referencia.obter()
+    return responder_referencia(dados['professors'], f"{dados['versao']}-professors")
+
+# Dados de referência em uma única resposta
+@app.route('/api/bootstrap')
+@login_required
+def api_bootstrap():
+    """Professores, períodos ativos e, para o admin, coordenadores.
+
+    Na URL versionada de url_bootstrap() (`?v=` igual à versão atual) a
+    resposta fica no cache do navegador por um ano: quando os dados mudam,
+    as páginas passam a apontar para outra URL.
+    """
+    versao, corpo = dados_referencia.obter()['bootstrap'][session.get('user_role') == 'admin']
+    resposta = Response(corpo, mimetype='application/json')
+    resposta.set_etag(versao, weak=True)
+    if request.args.get('v') == versao:
+        resposta.headers['Cache-Control'] = 'private, max-age=31536000, immutable'
+    else:
+        resposta.headers['Cache-Control'] = 'private, no-cache'
+    return resposta.make_conditional(request)
 
 if __name__ == '__main__':
     inicializar_bd()
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,1258 @@
+#!/usr/bin/env python3
+"""
+Benchmarks da aplicação
+
+Cada benchmark cria um banco temporário e popula com os dados de exemplo.
+As rotas são medidas pelo cliente de teste do Flask (sem servidor HTTP no meio).
+
+Uso:
+    python benchmark.py pool [--segundos 3] [--threads 1 8]
+    python benchmark.py matricula [--alunos 10000 100000]
+    python benchmark.py notas [--linhas 50 500 5000]
+    python benchmark.py importacao [--linhas 50000]
+    python benchmark.py exportacao [--alunos 10000] [--modulos 10]
+    python benchmark.py concorrencia [--clientes 8 32] [--processos 4] [--segundos 5]
+    python benchmark.py metricas [--requisicoes 2000]
+    python benchmark.py logs [--chamadas 20000]
+    python benchmark.py rotas [--banco escola.db | --periodos 10 --professores 100 ...] [--repeticoes 20]
+        [--saida resultados.json] [--comparar anterior.json]
+    python benchmark.py notas-finais [--periodos 10] [--professores 200] [--alunos-por-periodo 2000] [--densidade 0.5]
+    python benchmark.py analise [--periodos 10] [--professores 200] [--alunos-por-periodo 2000] [--repeticoes 20]
+    python benchmark.py risco [--periodos 2] [--professores 50] [--alunos-por-periodo 1000] [--limite 50] [--paginas 10]
+    python benchmark.py busca [--alunos 200000] [--periodos 10] [--limite 50]
+    python benchmark.py compressao [--alunos-por-periodo 5000] [--professores 100] [--mbits 10]
+    python benchmark.py estaticos
+    python benchmark.py sse [--streams 100 1000] [--assinaturas 10000]
+    python benchmark.py etag [--periodos 4] [--professores 20] [--alunos-por-periodo 2000] [--cargas 50]
+    python benchmark.py login [--threads 16] [--processos 4] [--fila 16] [--segundos 5]
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import re
+import resource
+import socket
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+import app as aplicacao
+from gerar_dados import gerar_dados
+
+
+def preparar_banco(diretorio):
+    """Apontar a aplicação para um banco novo dentro de `diretorio`"""
+    caminho = os.path.join(diretorio, 'alunos.db')
+    aplicacao.app.config['DATABASE'] = caminho
+    aplicacao.inicializar_bd()
+    return caminho
+
+
+def resetar_pool():
+    pool = aplicacao.app.extensions.pop('pool_bd', None)
+    if pool is not None:
+        pool.fechar()
+
+
+def cliente_logado(username, password):
+    cliente = aplicacao.app.test_client()
+    cliente.post('/login', data={'username': username, 'password': password})
+    return cliente
+
+
+def medir_rps(rota, segundos, threads, username='prof1', password='prof123'):
+    """Requisições por segundo em `rota` com `threads` clientes simultâneos"""
+    clientes = [cliente_logado(username, password) for _ in range(threads)]
+    contagens = [0] * threads
+    fim = time.perf_counter() + segundos
+
+    def trabalhar(indice):
+        cliente = clientes[indice]
+        while time.perf_counter() < fim:
+            resposta = cliente.get(rota)
+            assert resposta.status_code == 200, resposta.status_code
+            contagens[indice] += 1
+
+    inicio = time.perf_counter()
+    trabalhadores = [threading.Thread(target=trabalhar, args=(i,)) for i in range(threads)]
+    for t in trabalhadores:
+        t.start()
+    for t in trabalhadores:
+        t.join()
+    return sum(contagens) / (time.perf_counter() - inicio)
+
+
+def bench_pool(args):
+    """Conexão nova por requisição (antes) contra o pool de conexões (depois)"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        preparar_banco(diretorio)
+        rotas = ['/api/modulos', '/api/modules/1/students']
+        print(f"{'rota':<28}{'threads':>8}{'antes (req/s)':>16}{'depois (req/s)':>16}{'ganho':>8}")
+        for rota in rotas:
+            for threads in args.threads:
+                resultados = {}
+                for usar_pool in (False, True):
+                    resetar_pool()
+                    aplicacao.app.config['DB_POOL'] = usar_pool
+                    resultados[usar_pool] = medir_rps(rota, args.segundos, threads)
+                antes, depois = resultados[False], resultados[True]
+                print(f"{rota:<28}{threads:>8}{antes:>16.0f}{depois:>16.0f}{depois / antes:>7.2f}x")
+        resetar_pool()
+
+
+def inserir_alunos(cursor, periodo_id, quantidade, prefixo='B'):
+    cursor.executemany('''
+        INSERT INTO Students (student_number, full_name, email, academic_period_id, enrollment_date)
+        VALUES (?, ?, ?, ?, '2024-01-15')
+    ''', ((f'{prefixo}{i:07d}', f'Aluno {i:07d}', f'aluno{i}@email.com', periodo_id) for i in range(quantidade)))
+
+
+def matricular_em_loop(cursor, periodo_id, modulo_id):
+    """Implementação anterior: três comandos por aluno"""
+    cursor.execute('SELECT id FROM Students WHERE academic_period_id = ? AND is_active = 1', (periodo_id,))
+    for student in cursor.fetchall():
+        cursor.execute('INSERT OR IGNORE INTO Enrollments (student_id, module_id) VALUES (?, ?)',
+                       (student['id'], modulo_id))
+        cursor.execute('SELECT id FROM Enrollments WHERE student_id = ? AND module_id = ?',
+                       (student['id'], modulo_id))
+        enrollment = cursor.fetchone()
+        if enrollment:
+            cursor.execute('''
+                INSERT OR IGNORE INTO Grades (enrollment_id, tutor_grade, regular_exam_grade, makeup_exam_grade, final_grade, absences)
+                VALUES (?, 0.0, 0.0, 0.0, 0.0, 0)
+            ''', (enrollment['id'],))
+
+
+def bench_matricula(args):
+    """Criação de módulo com matrícula automática: loop por aluno contra INSERT ... SELECT"""
+    print(f"{'alunos':>10}{'loop (s)':>12}{'lote (s)':>12}{'ganho':>9}")
+    for quantidade in args.alunos:
+        with tempfile.TemporaryDirectory() as diretorio:
+            resetar_pool()
+            aplicacao.app.config['DB_POOL'] = True
+            preparar_banco(diretorio)
+            conn = aplicacao.conectar_bd()
+            cursor = conn.cursor()
+            inserir_alunos(cursor, 1, quantidade)
+            conn.commit()
+
+            tempos = {}
+            for nome in ('loop', 'lote'):
+                cursor.execute('''
+                    INSERT INTO Modules (name, code, professor_id, academic_period_id) VALUES ('Bench', 'BENCH', 3, 1)
+                ''')
+                modulo_id = cursor.lastrowid
+                inicio = time.perf_counter()
+                if nome == 'loop':
+                    matricular_em_loop(cursor, 1, modulo_id)
+                else:
+                    aplicacao.matricular_alunos(cursor, 1, modulo_id=modulo_id)
+                conn.commit()
+                tempos[nome] = time.perf_counter() - inicio
+                cursor.execute('DELETE FROM Grades WHERE enrollment_id IN (SELECT id FROM Enrollments WHERE module_id = ?)', (modulo_id,))
+                cursor.execute('DELETE FROM Enrollments WHERE module_id = ?', (modulo_id,))
+                cursor.execute('DELETE FROM Modules WHERE id = ?', (modulo_id,))
+                conn.commit()
+            conn.close()
+            resetar_pool()
+        print(f"{quantidade:>10}{tempos['loop']:>12.3f}{tempos['lote']:>12.3f}{tempos['loop'] / tempos['lote']:>8.1f}x")
+
+
+def criar_modulo_com_alunos(quantidade, professor_id=3):
+    """Período novo com `quantidade` alunos matriculados em um módulo do professor"""
+    conn = aplicacao.conectar_bd()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO AcademicPeriods (name, coordinator_id) VALUES (?, 2)", (f'Bench {quantidade}',))
+    periodo_id = cursor.lastrowid
+    inserir_alunos(cursor, periodo_id, quantidade, prefixo=f'N{quantidade}-')
+    cursor.execute("INSERT INTO Modules (name, code, professor_id, academic_period_id) VALUES ('Bench', 'BENCH', ?, ?)",
+                   (professor_id, periodo_id))
+    modulo_id = cursor.lastrowid
+    aplicacao.matricular_alunos(cursor, periodo_id, modulo_id=modulo_id)
+    cursor.execute('SELECT id FROM Enrollments WHERE module_id = ?', (modulo_id,))
+    matriculas = [row['id'] for row in cursor.fetchall()]
+    conn.commit()
+    conn.close()
+    return modulo_id, matriculas
+
+
+def bench_notas(args):
+    """Salvar as notas de um módulo: um PUT por matrícula contra um PUT em lote"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        resetar_pool()
+        aplicacao.app.config['DB_POOL'] = True
+        preparar_banco(diretorio)
+        cliente = cliente_logado('prof1', 'prof123')
+        print(f"{'linhas':>8}{'por linha (s)':>16}{'lote (s)':>12}{'ganho':>9}")
+        for quantidade in args.linhas:
+            modulo_id, matriculas = criar_modulo_com_alunos(quantidade)
+            notas = {'tutor_grade': 8.0, 'regular_exam_grade': 7.0, 'makeup_exam_grade': 0.0,
+                     'final_grade': 7.0, 'absences': 1}
+
+            inicio = time.perf_counter()
+            for enrollment_id in matriculas:
+                resposta = cliente.put(f'/api/grades/{enrollment_id}', json=notas)
+                assert resposta.status_code == 200
+            por_linha = time.perf_counter() - inicio
+
+            linhas = [dict(notas, enrollment_id=enrollment_id, final_grade=8.0) for enrollment_id in matriculas]
+            inicio = time.perf_counter()
+            resposta = cliente.put(f'/api/modules/{modulo_id}/grades', json=linhas)
+            assert resposta.get_json()['saved'] == quantidade
+            lote = time.perf_counter() - inicio
+            print(f"{quantidade:>8}{por_linha:>16.3f}{lote:>12.3f}{por_linha / lote:>8.1f}x")
+        resetar_pool()
+
+
+def escrever_csv_alunos(caminho, quantidade, prefixo):
+    with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+        arquivo.write('student_number,full_name,email,enrollment_date,medical_certificates,referral_info,observations\n')
+        for i in range(quantidade):
+            arquivo.write(f'{prefixo}{i:07d},Aluno Importado {i:07d},imp{i}@email.com,2024-02-01,0,,Importado em lote\n')
+
+
+def bench_importacao(args):
+    """Importação de CSV: tempo total e pico de memória alocada durante a requisição"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        resetar_pool()
+        aplicacao.app.config['DB_POOL'] = True
+        preparar_banco(diretorio)
+        cliente = cliente_logado('coord1', 'coord123')
+        print(f"{'linhas':>8}{'modo':>14}{'tempo (s)':>12}{'linhas/s':>12}{'pico (MB)':>12}")
+        for quantidade in args.linhas:
+            for modo in ('tempo', 'memoria'):
+                caminho = os.path.join(diretorio, f'{modo}-{quantidade}.csv')
+                escrever_csv_alunos(caminho, quantidade, prefixo=f'{modo[0].upper()}{quantidade}-')
+                if modo == 'memoria':
+                    tracemalloc.start()
+                inicio = time.perf_counter()
+                with open(caminho, 'rb') as arquivo:
+                    resposta = cliente.post('/api/periods/1/students/import',
+                                            data={'file': (arquivo, 'alunos.csv')},
+                                            content_type='multipart/form-data')
+                duracao = time.perf_counter() - inicio
+                pico = ''
+                if modo == 'memoria':
+                    pico = f'{tracemalloc.get_traced_memory()[1] / 2 ** 20:.1f}'
+                    tracemalloc.stop()
+                assert resposta.get_json().get('imported') == quantidade, resposta.get_data()[:500]
+                print(f"{quantidade:>8}{modo:>14}{duracao:>12.2f}{quantidade / duracao:>12.0f}{pico:>12}")
+        resetar_pool()
+
+
+def bench_exportacao(args):
+    """Boletim do período em CSV e XLSX: vazão e pico de memória do streaming"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        resetar_pool()
+        aplicacao.app.config['DB_POOL'] = True
+        preparar_banco(diretorio)
+        conn = aplicacao.conectar_bd()
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO AcademicPeriods (name, coordinator_id) VALUES ('Bench Exportação', 2)")
+        periodo_id = cursor.lastrowid
+        inserir_alunos(cursor, periodo_id, args.alunos, prefixo='E')
+        cursor.executemany("INSERT INTO Modules (name, code, professor_id, academic_period_id) VALUES (?, ?, 3, ?)",
+                           [(f'Módulo {i}', f'EXP{i:03d}', periodo_id) for i in range(args.modulos)])
+        matriculas = aplicacao.matricular_alunos(cursor, periodo_id)
+        conn.commit()
+        conn.close()
+
+        cliente = cliente_logado('coord1', 'coord123')
+        print(f"{matriculas} matrículas ({args.alunos} alunos x {args.modulos} módulos)")
+        print(f"{'formato':>8}{'tempo (s)':>12}{'matrículas/s':>15}{'MB gerados':>12}{'pico (MB)':>12}")
+        for formato in ('csv', 'xlsx'):
+            medidas = {}
+            for medir_memoria in (False, True):
+                if medir_memoria:
+                    tracemalloc.start()
+                inicio = time.perf_counter()
+                resposta = cliente.get(f'/api/periods/{periodo_id}/gradebook.{formato}', buffered=False)
+                tamanho = sum(len(parte) for parte in resposta.response)
+                resposta.close()
+                medidas['tempo' if not medir_memoria else 'memoria'] = time.perf_counter() - inicio
+                if medir_memoria:
+                    pico = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                    tracemalloc.stop()
+            duracao = medidas['tempo']
+            print(f"{formato:>8}{duracao:>12.2f}{matriculas / duracao:>15.0f}{tamanho / 2 ** 20:>12.1f}{pico:>12.1f}")
+        resetar_pool()
+
+
+def bench_metricas(args):
+    """Custo das métricas: tempo dos hooks e do cursor instrumentado contra a latência da rota.
+
+    Mede os componentes diretamente, em vez de comparar req/s com e sem
+    métricas, porque a diferença fica abaixo do ruído entre execuções.
+    """
+    with tempfile.TemporaryDirectory() as diretorio:
+        resetar_pool()
+        aplicacao.app.config['DB_POOL'] = True
+        aplicacao.app.config['METRICS'] = True
+        preparar_banco(diretorio)
+        cliente = cliente_logado('prof1', 'prof123')
+        n = args.requisicoes
+
+        # Consulta trivial com cursor comum e com o cursor instrumentado
+        conn = aplicacao.sqlite3.connect(':memory:', factory=aplicacao.ConexaoPool)
+        tempos = {}
+        for fabrica in (aplicacao.sqlite3.Cursor, aplicacao.CursorInstrumentado):
+            cursor = conn.cursor(fabrica)
+            inicio = time.perf_counter()
+            for _ in range(n):
+                cursor.execute('SELECT 1')
+            tempos[fabrica] = (time.perf_counter() - inicio) / n
+        conn.close()
+        custo_consulta = tempos[aplicacao.CursorInstrumentado] - tempos[aplicacao.sqlite3.Cursor]
+
+        # before_request + after_request com uma resposta vazia
+        resposta = aplicacao.Response()
+        with aplicacao.app.test_request_context('/api/modulos'):
+            inicio = time.perf_counter()
+            for _ in range(n):
+                aplicacao.iniciar_medicao()
+                aplicacao.registrar_medicao(resposta)
+            custo_hooks = (time.perf_counter() - inicio) / n
+        aplicacao.metricas.limpar()
+
+        print(f"cursor instrumentado: +{custo_consulta * 1e6:.2f} us/consulta; hooks: {custo_hooks * 1e6:.2f} us/requisição")
+        print(f"{'rota':<28}{'latência (us)':>15}{'consultas':>11}{'métricas (us)':>15}{'custo':>8}")
+        for rota in ['/api/modulos', '/api/modules/1/students', '/api/cache/stats']:
+            if rota == '/api/cache/stats':
+                cliente = cliente_logado('admin', 'admin123')
+            inicio = time.perf_counter()
+            for _ in range(n):
+                cliente.get(rota)
+            latencia = (time.perf_counter() - inicio) / n
+            endpoint = aplicacao.app.url_map.bind('').match(rota)[0]
+            consultas = aplicacao.metricas.sql.get(endpoint, [0])[0] / n
+            custo = custo_hooks + consultas * custo_consulta
+            print(f"{rota:<28}{latencia * 1e6:>15.0f}{consultas:>11.1f}{custo * 1e6:>15.1f}{custo / latencia:>8.1%}")
+        resetar_pool()
+
+
+def escrever_notas_em_processo(clientes, segundos, matriculas, resultados):
+    """Processo worker: `clientes` threads fazendo PUT de notas até o tempo acabar"""
+    contagem = {'ok': 0, 'erros': 0}
+    latencias = []
+    trava = threading.Lock()
+    logados = [cliente_logado('prof1', 'prof123') for _ in range(clientes)]
+    fim = time.perf_counter() + segundos
+
+    def trabalhar(cliente):
+        gerador = random.Random()
+        while time.perf_counter() < fim:
+            notas = {'tutor_grade': gerador.randint(0, 10), 'regular_exam_grade': 7.0,
+                     'makeup_exam_grade': 0.0, 'final_grade': 7.0, 'absences': 1}
+            inicio = time.perf_counter()
+            try:
+                ok = cliente.put(f'/api/grades/{gerador.choice(matriculas)}', json=notas).status_code == 200
+            except sqlite3.OperationalError:
+                ok = False
+            with trava:
+                contagem['ok' if ok else 'erros'] += 1
+                latencias.append(time.perf_counter() - inicio)
+
+    trabalhadores = [threading.Thread(target=trabalhar, args=(cliente,)) for cliente in logados]
+    for t in trabalhadores:
+        t.start()
+    for t in trabalhadores:
+        t.join()
+    resultados.put((contagem['ok'], contagem['erros'], latencias))
+
+
+def bench_concorrencia(args):
+    """Escritas concorrentes vindas de vários processos: conexão por requisição
+    em modo rollback journal (antes) contra pool + fila de escrita + WAL (depois)"""
+    contexto = multiprocessing.get_context('fork')
+    with tempfile.TemporaryDirectory() as diretorio:
+        resetar_pool()
+        caminho = preparar_banco(diretorio)
+        resetar_pool()
+        conn = sqlite3.connect(caminho)
+        matriculas = [row[0] for row in conn.execute('''
+            SELECT e.id FROM Enrollments e JOIN Modules m ON e.module_id = m.id WHERE m.professor_id = 3
+        ''')]
+        conn.close()
+
+        print(f"{'modo':<10}{'clientes':>9}{'escritas/s':>12}{'erros':>8}{'p95 (ms)':>10}")
+        for modo in ('antes', 'depois'):
+            depois = modo == 'depois'
+            conn = sqlite3.connect(caminho)
+            conn.execute(f"PRAGMA journal_mode={'WAL' if depois else 'DELETE'}")
+            conn.close()
+            aplicacao.app.config['DB_POOL'] = depois
+            aplicacao.app.config['WRITE_QUEUE'] = depois
+            for clientes in args.clientes:
+                processos = min(args.processos, clientes)
+                resultados = contexto.Queue()
+                filhos = [contexto.Process(target=escrever_notas_em_processo,
+                                           args=(clientes // processos + (i < clientes % processos),
+                                                 args.segundos, matriculas, resultados))
+                          for i in range(processos)]
+                for filho in filhos:
+                    filho.start()
+                coletados = [resultados.get() for _ in filhos]
+                for filho in filhos:
+                    filho.join()
+                ok = sum(c[0] for c in coletados)
+                erros = sum(c[1] for c in coletados)
+                latencias = sorted(l for c in coletados for l in c[2])
+                p95 = latencias[int(len(latencias) * 0.95)] * 1000 if latencias else 0.0
+                print(f"{modo:<10}{clientes:>9}{ok / args.segundos:>12.0f}{erros:>8}{p95:>10.1f}")
+        aplicacao.app.config['DB_POOL'] = True
+        aplicacao.app.config['WRITE_QUEUE'] = True
+        resetar_pool()
+
+
+def bench_logs(args):
+    """Custo na thread da requisição: print síncrono (antes) contra log.debug na fila, desligado e ligado"""
+    periodos = [{'id': i, 'name': f'Período {i}', 'start_date': '2024-02-01', 'end_date': '2024-12-15',
+                 'coordinator_id': 2, 'is_active': 1} for i in range(50)]
+    n = args.chamadas
+    resultados = {}
+    with open(os.devnull, 'w') as nulo, aplicacao.app.test_request_context('/api/periods'):
+        aplicacao.identificar_requisicao()
+        inicio = time.perf_counter()
+        for _ in range(n):
+            print(f"[DEBUG] Todos os períodos ativos encontrados: {periodos}", file=nulo)
+        resultados['print síncrono'] = time.perf_counter() - inicio
+
+        coletor = logging.NullHandler()
+        handlers = aplicacao.ouvinte_logs.handlers
+        aplicacao.ouvinte_logs.handlers = (coletor,)
+        try:
+            for nivel, nome in (('INFO', 'log.debug desligado'), ('DEBUG', 'log.debug ligado')):
+                aplicacao.log.setLevel(nivel)
+                inicio = time.perf_counter()
+                for _ in range(n):
+                    aplicacao.log.debug("Todos os períodos ativos encontrados: %s", periodos)
+                resultados[nome] = time.perf_counter() - inicio
+                aplicacao.esvaziar_logs()
+        finally:
+            aplicacao.log.setLevel(aplicacao.app.config['LOG_LEVEL'])
+            aplicacao.ouvinte_logs.handlers = handlers
+
+    print(f"{'chamada':<24}{'us/chamada':>12}")
+    for nome, segundos in resultados.items():
+        print(f"{nome:<24}{segundos / n * 1e6:>12.2f}")
+
+
+USUARIOS_POR_PAPEL = {'admin': ('admin', 'admin123'), 'coordinator': ('coord1', 'coord123'), 'professor': ('prof1', 'prof123')}
+
+
+def parametros_por_papel(caminho):
+    """Valores para as variáveis das rotas (<period_id>, <module_id>...) visíveis a cada papel"""
+    conn = sqlite3.connect(caminho)
+    um = lambda sql, *args: (conn.execute(sql, args).fetchone() or [None])[0]
+    coordenador = um("SELECT id FROM Users WHERE username = 'coord1'")
+    professor = um("SELECT id FROM Users WHERE username = 'prof1'")
+    periodo = um('SELECT id FROM AcademicPeriods WHERE coordinator_id = ? ORDER BY id', coordenador)
+    modulo = um('SELECT id FROM Modules WHERE professor_id = ? ORDER BY id', professor)
+    comum = {'user_id': um("SELECT id FROM Users WHERE role = 'professor' ORDER BY id"), 'formato': 'csv'}
+    parametros = {
+        'admin': dict(comum, period_id=um('SELECT MIN(id) FROM AcademicPeriods')),
+        'coordinator': dict(comum, period_id=periodo,
+                            module_id=um('SELECT id FROM Modules WHERE academic_period_id = ? ORDER BY id', periodo),
+                            student_id=um('SELECT id FROM Students WHERE academic_period_id = ? ORDER BY id', periodo)),
+        'professor': dict(comum, module_id=modulo,
+                          student_id=um('SELECT student_id FROM Enrollments WHERE module_id = ? ORDER BY id', modulo),
+                          enrollment_id=um('SELECT id FROM Enrollments WHERE module_id = ? ORDER BY id', modulo)),
+    }
+    conn.close()
+    return parametros
+
+
+def requisicoes_de_rota(regra, parametros, cliente):
+    """(método, url, json) das requisições a medir em uma regra /api; só escritas idempotentes"""
+    if any(parametros.get(nome) is None for nome in regra.arguments):
+        return []
+    url = regra.rule
+    for nome in regra.arguments:
+        url = url.replace(f'<int:{nome}>', str(parametros[nome])).replace(f'<{nome}>', str(parametros[nome]))
+    requisicoes = []
+    if 'GET' in regra.methods:
+        requisicoes.append(('GET', url, None))
+    if regra.endpoint in ('api_update_grades', 'api_update_module_grades') and 'module_id' in parametros:
+        # Regrava as notas atuais: exercita a escrita sem mudar os dados
+        alunos = cliente.get(f"/api/modules/{parametros['module_id']}/students").get_json() or []
+        linhas = [{campo: a[campo] or 0 for campo in aplicacao.CAMPOS_NOTAS} | {'enrollment_id': a['enrollment_id']}
+                  for a in alunos if a.get('enrollment_id')]
+        if regra.endpoint == 'api_update_grades' and linhas:
+            requisicoes.append(('PUT', url, linhas[0]))
+        elif regra.endpoint == 'api_update_module_grades':
+            requisicoes.append(('PUT', url, linhas))
+    return requisicoes
+
+
+def percentil(valores, fracao):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * fracao))]
+
+
+def pico_rss_mb():
+    # ru_maxrss é em KB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def medir_rotas(caminho, repeticoes):
+    """Medir todas as rotas /api como cada papel; devolve uma lista de resultados por (papel, método, url)"""
+    parametros = parametros_por_papel(caminho)
+    regras = sorted((r for r in aplicacao.app.url_map.iter_rules() if r.rule.startswith('/api/')), key=lambda r: r.rule)
+    resultados = []
+    for papel, (username, password) in USUARIOS_POR_PAPEL.items():
+        cliente = cliente_logado(username, password)
+        for regra in regras:
+            for metodo, url, corpo in requisicoes_de_rota(regra, parametros[papel], cliente):
+                resposta = cliente.open(url, method=metodo, json=corpo)
+                if not 200 <= resposta.status_code < 300:
+                    continue  # Rota de outro papel (redireciona ou nega acesso)
+                latencias, consultas = [], []
+                for _ in range(repeticoes):
+                    fora = aplicacao.metricas.sql.get('sem_requisicao', [0])[0]
+                    inicio = time.perf_counter()
+                    resposta = cliente.open(url, method=metodo, json=corpo)
+                    tamanho = len(resposta.get_data())
+                    latencias.append(time.perf_counter() - inicio)
+                    # Respostas em streaming executam SQL depois do after_request
+                    consultas.append(aplicacao.medicao_sql.consultas
+                                     + aplicacao.metricas.sql.get('sem_requisicao', [0])[0] - fora)
+                resultados.append({
+                    'role': papel, 'method': metodo, 'endpoint': regra.endpoint, 'rule': regra.rule, 'url': url,
+                    'status': resposta.status_code, 'bytes': tamanho, 'n': repeticoes,
+                    'p50_ms': round(percentil(latencias, 0.50) * 1000, 3),
+                    'p95_ms': round(percentil(latencias, 0.95) * 1000, 3),
+                    'p99_ms': round(percentil(latencias, 0.99) * 1000, 3),
+                    'mean_ms': round(statistics.fmean(latencias) * 1000, 3),
+                    'queries_per_request': round(statistics.fmean(consultas), 2),
+                    'peak_rss_mb': round(pico_rss_mb(), 1),
+                })
+    return resultados
+
+
+def bench_rotas(args):
+    """p50/p95/p99, consultas por requisição e pico de RSS em cada rota /api, por papel"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        resetar_pool()
+        aplicacao.app.config['DB_POOL'] = True
+        aplicacao.app.config['METRICS'] = True
+        aplicacao.app.config['SLOW_QUERY_LOG'] = os.path.join(diretorio, 'slow_queries.log')
+        if args.banco:
+            caminho = args.banco
+            dados = {'banco': os.path.abspath(caminho)}
+        else:
+            caminho = os.path.join(diretorio, 'escola.db')
+            dados = {'periodos': args.periodos, 'professores': args.professores,
+                     'modulos_por_professor': args.modulos_por_professor,
+                     'alunos_por_periodo': args.alunos_por_periodo, 'densidade': args.densidade, 'semente': args.semente}
+            inicio = time.perf_counter()
+            contagens = gerar_dados(caminho, args.periodos, args.professores, args.modulos_por_professor,
+                                    args.alunos_por_periodo, args.densidade, args.semente)
+            dados.update(linhas=contagens, segundos_geracao=round(time.perf_counter() - inicio, 2))
+        aplicacao.app.config['DATABASE'] = caminho
+
+        resultados = medir_rotas(caminho, args.repeticoes)
+        resetar_pool()
+
+    anteriores = {}
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            anteriores = {(r['role'], r['method'], r['endpoint']): r for r in json.load(arquivo)['results']}
+
+    print(f"{'papel':<12}{'método':<7}{'rota':<52}{'p50':>8}{'p95':>8}{'p99':>8}{'SQL':>6}{'RSS MB':>8}"
+          + (f"{'p95 antes':>11}" if anteriores else ''))
+    for r in resultados:
+        linha = (f"{r['role']:<12}{r['method']:<7}{r['rule']:<52}{r['p50_ms']:>8.2f}{r['p95_ms']:>8.2f}"
+                 f"{r['p99_ms']:>8.2f}{r['queries_per_request']:>6.1f}{r['peak_rss_mb']:>8.1f}")
+        anterior = anteriores.get((r['role'], r['method'], r['endpoint']))
+        if anterior:
+            linha += f"{anterior['p95_ms']:>11.2f}"
+        print(linha)
+    print(f'Pico de RSS: {pico_rss_mb():.1f} MB')
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump({
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+                'dados': dados, 'repeticoes': args.repeticoes,
+                'peak_rss_mb': round(pico_rss_mb(), 1), 'results': resultados,
+            }, arquivo, ensure_ascii=False, indent=2)
+        print(f'Resultados salvos em {args.saida}')
+
+
+def bench_notas_finais(args):
+    """Recálculo das notas finais de todo o banco com NumPy: regras alteradas em todos
+    os períodos (todas as notas mudam) e recálculo sem mudança (só leitura e cálculo)"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'escola.db')
+        contagens = gerar_dados(caminho, args.periodos, args.professores, args.modulos_por_professor,
+                                args.alunos_por_periodo, args.densidade)
+        print(f"{contagens['Grades']} notas em {contagens['AcademicPeriods']} períodos")
+        conn = sqlite3.connect(caminho)
+        periodos = [row[0] for row in conn.execute('SELECT id FROM AcademicPeriods')]
+        print(f"{'cenário':<28}{'tempo (s)':>10}{'alteradas':>12}{'notas/s':>12}")
+        for cenario, peso in (('regras alteradas', 0.5), ('sem mudança', 0.5), ('regras padrão de volta', 0.4)):
+            inicio = time.perf_counter()
+            cursor = conn.cursor()
+            cursor.execute('BEGIN')
+            regras = dict(aplicacao.REGRAS_NOTAS_PADRAO, tutor_weight=peso)
+            for periodo in periodos:
+                cursor.execute('''
+                    INSERT OR REPLACE INTO GradingRules (academic_period_id, tutor_weight, makeup_policy, absence_grade_cap, rounding_step)
+                    VALUES (:periodo, :tutor_weight, :makeup_policy, :absence_grade_cap, :rounding_step)
+                ''', dict(regras, periodo=periodo))
+            alteradas = aplicacao.recalcular_notas(cursor)
+            conn.commit()
+            duracao = time.perf_counter() - inicio
+            print(f"{cenario:<28}{duracao:>10.2f}{alteradas:>12}{contagens['Grades'] / duracao:>12.0f}")
+        conn.close()
+
+
+def varrer_notas_do_periodo(conn, periodo_id):
+    """Análise do período como seria sem GradeSummary: todas as notas lidas a cada visita"""
+    linhas = conn.execute('''
+        SELECT m.id, COALESCE(g.final_grade, 0) FROM Modules m
+        JOIN Enrollments e ON e.module_id = m.id
+        JOIN Grades g ON g.enrollment_id = e.id
+        WHERE m.academic_period_id = ?
+    ''', (periodo_id,)).fetchall()
+    dados = aplicacao.np.array(linhas, dtype=float).reshape(-1, 2)
+    return {modulo: aplicacao.np.percentile(dados[dados[:, 0] == modulo, 1], [25, 50, 75, 90])
+            for modulo in aplicacao.np.unique(dados[:, 0])}
+
+
+def bench_analise(args):
+    """Análise de notas de um período e dashboard do professor: varredura de Grades
+    (antes) contra leitura do histograma GradeSummary (depois), e o custo dos
+    triggers do histograma em cada nota gravada"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'escola.db')
+        contagens = gerar_dados(caminho, args.periodos, args.professores, alunos_por_periodo=args.alunos_por_periodo)
+        print(f"{contagens['Grades']} notas em {contagens['Modules']} módulos e {contagens['AcademicPeriods']} períodos")
+        conn = sqlite3.connect(caminho)
+        conn.row_factory = sqlite3.Row
+        periodo_id = conn.execute('SELECT MIN(id) FROM AcademicPeriods').fetchone()[0]
+        professor_id = conn.execute("SELECT MIN(id) FROM Users WHERE role = 'professor'").fetchone()[0]
+        modulos = [row[0] for row in conn.execute('SELECT id FROM Modules WHERE academic_period_id = ?', (periodo_id,))]
+        painel_antigo = '''
+            SELECT COUNT(e.id), COUNT(CASE WHEN g.final_grade >= 7.0 THEN 1 END) FROM Modules m
+            JOIN Enrollments e ON e.module_id = m.id LEFT JOIN Grades g ON g.enrollment_id = e.id
+            WHERE m.professor_id = :user_id
+        '''
+        painel_novo = aplicacao.CONSULTAS_DASHBOARD['professor'][1]
+
+        def analise_pelo_histograma():
+            histogramas = aplicacao.histogramas_notas(conn, modulos)
+            return [aplicacao.resumir_notas(h) for h in histogramas], aplicacao.resumir_notas(histogramas.sum(axis=0))
+
+        cenarios = (
+            ('análise do período', 'antes', lambda: varrer_notas_do_periodo(conn, periodo_id)),
+            ('análise do período', 'depois', analise_pelo_histograma),
+            ('dashboard do professor', 'antes', lambda: conn.execute(painel_antigo, {'user_id': professor_id}).fetchone()),
+            ('dashboard do professor', 'depois', lambda: conn.execute(painel_novo, {'user_id': professor_id}).fetchone()),
+        )
+        print(f"{'consulta':<26}{'modo':<8}{'ms':>10}")
+        for consulta, modo, funcao in cenarios:
+            funcao()
+            inicio = time.perf_counter()
+            for _ in range(args.repeticoes):
+                funcao()
+            print(f"{consulta:<26}{modo:<8}{(time.perf_counter() - inicio) * 1000 / args.repeticoes:>10.2f}")
+
+        # Escrita: a mesma sequência de notas alteradas uma a uma, com e sem os triggers do histograma
+        ids = [row[0] for row in conn.execute('SELECT id FROM Grades ORDER BY random() LIMIT ?', (args.escritas,))]
+        print(f"{'gravação de nota':<26}{'modo':<8}{'µs/nota':>10}")
+        for modo in ('sem', 'com'):
+            cursor = conn.cursor()
+            cursor.execute('BEGIN')
+            if modo == 'sem':
+                cursor.execute('DROP TRIGGER trg_grades_update_summary')
+            inicio = time.perf_counter()
+            for i, grade_id in enumerate(ids):
+                cursor.execute('UPDATE Grades SET final_grade = ? WHERE id = ?', (i % 101 / 10, grade_id))
+            duracao = time.perf_counter() - inicio
+            conn.rollback()
+            print(f"{'gravação de nota':<26}{modo + ' trg':<8}{duracao * 1e6 / len(ids):>10.1f}")
+        conn.close()
+
+
+def bench_risco(args):
+    """Lista de risco por faltas de um período: varredura de Grades com ordenação (antes)
+    contra o índice AbsenceRisk pela rota paginada (depois), e o custo dos triggers
+    em cada falta gravada"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        resetar_pool()
+        caminho = os.path.join(diretorio, 'escola.db')
+        contagens = gerar_dados(caminho, args.periodos, args.professores, modulos_por_professor=4,
+                                alunos_por_periodo=args.alunos_por_periodo, densidade=1.0)
+        aplicacao.app.config['DATABASE'] = caminho
+        conn = sqlite3.connect(caminho)
+        periodo_id = conn.execute("SELECT id FROM AcademicPeriods WHERE coordinator_id = "
+                                  "(SELECT id FROM Users WHERE username = 'coord1')").fetchone()[0]
+        matriculas = conn.execute('SELECT COUNT(*) FROM AbsenceRisk WHERE academic_period_id = ?', (periodo_id,)).fetchone()[0]
+        print(f"{contagens['Grades']} notas; {matriculas} matrículas no período medido")
+        razao = aplicacao.RAZAO_FALTAS_SQL.format(faltas='g.absences', limite='m.max_absences')
+        varredura = f'''
+            SELECT e.id, {razao} AS ratio, s.full_name, m.name FROM Grades g
+            JOIN Enrollments e ON g.enrollment_id = e.id
+            JOIN Modules m ON e.module_id = m.id
+            JOIN Students s ON e.student_id = s.id
+            WHERE m.academic_period_id = ? AND {razao} >= ?
+            ORDER BY ratio DESC, e.id DESC LIMIT ?
+        '''
+        cliente = cliente_logado('coord1', 'coord123')
+        url = f'/api/periods/{periodo_id}/at-risk?limit={args.limite}'
+
+        def paginas(quantidade):
+            proxima = url
+            for _ in range(quantidade):
+                resposta = cliente.get(proxima)
+                proxima = f"{url}&after={resposta.headers['X-Next-Cursor']}"
+
+        cenarios = (
+            ('antes', 'página 1', lambda: conn.execute(varredura, (periodo_id, 0.75, args.limite)).fetchall()),
+            ('depois', 'página 1', lambda: paginas(1)),
+            ('depois', f'páginas 1-{args.paginas}', lambda: paginas(args.paginas)),
+        )
+        print(f"{'modo':<8}{'leitura':<14}{'ms':>10}")
+        for modo, leitura, funcao in cenarios:
+            funcao()
+            inicio = time.perf_counter()
+            for _ in range(args.repeticoes):
+                funcao()
+            print(f"{modo:<8}{leitura:<14}{(time.perf_counter() - inicio) * 1000 / args.repeticoes:>10.2f}")
+
+        ids = [row[0] for row in conn.execute('SELECT id FROM Grades ORDER BY random() LIMIT ?', (args.escritas,))]
+        print(f"{'gravação de falta':<22}{'µs/linha':>10}")
+        for modo in ('sem trigger', 'com trigger'):
+            cursor = conn.cursor()
+            cursor.execute('BEGIN')
+            if modo == 'sem trigger':
+                cursor.execute('DROP TRIGGER trg_grades_update_risk')
+            inicio = time.perf_counter()
+            for i, grade_id in enumerate(ids):
+                cursor.execute('UPDATE Grades SET absences = ? WHERE id = ?', (i % 15, grade_id))
+            duracao = time.perf_counter() - inicio
+            conn.rollback()
+            print(f"{modo:<22}{duracao * 1e6 / len(ids):>10.1f}")
+        conn.close()
+        resetar_pool()
+
+
+def bench_busca(args):
+    """Busca de alunos: LIKE '%termo%' nas cinco colunas (antes) contra o índice FTS5
+    (depois), na consulta e pela rota /api/students/search"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        resetar_pool()
+        caminho = os.path.join(diretorio, 'escola.db')
+        contagens = gerar_dados(caminho, args.periodos, professores=20, modulos_por_professor=1,
+                                alunos_por_periodo=args.alunos // args.periodos, densidade=0.01)
+        aplicacao.app.config['DATABASE'] = caminho
+        conn = sqlite3.connect(caminho)
+        # Observações variadas em parte dos alunos, para buscas por palavras raras e comuns
+        conn.execute('DROP TRIGGER trg_students_update_search')
+        conn.execute('''
+            UPDATE Students SET observations = CASE id % 100
+                WHEN 0 THEN 'Acompanhamento psicopedagógico semanal'
+                WHEN 1 THEN 'Transferido de outra escola'
+                WHEN 2 THEN 'Laudo médico entregue' ELSE '' END,
+                referral_info = CASE WHEN id % 7 = 0 THEN 'Encaminhado ao atendimento especializado' ELSE '' END
+        ''')
+        aplicacao.garantir_busca_alunos(conn.cursor())
+        aplicacao.reconstruir_busca_alunos(conn.cursor())
+        conn.commit()
+        print(f"{contagens['Students']} alunos")
+
+        colunas_like = ' OR '.join(f'{coluna} LIKE :termo' for coluna in aplicacao.COLUNAS_BUSCA_ALUNOS)
+        consulta_like = f'SELECT * FROM Students WHERE {colunas_like} ORDER BY full_name, id LIMIT :limite'
+        contagem_like = f'SELECT COUNT(*) FROM Students WHERE {colunas_like}'
+        consulta_fts = '''
+            SELECT s.* FROM StudentSearch JOIN Students s ON s.id = StudentSearch.rowid
+            WHERE StudentSearch MATCH :expressao ORDER BY StudentSearch.rank, s.id LIMIT :limite
+        '''
+        cliente = cliente_logado('admin', 'admin123')
+        medir = lambda funcao: min(cronometrar(funcao) for _ in range(args.repeticoes)) * 1000
+
+        print(f"{'termo':<28}{'casam':>8}{'LIKE ms':>10}{'FTS5 ms':>10}{'rota ms':>10}")
+        for termo in ('psicopedag', 'laudo medico', 'encaminhado', '00010000123', 'Aluno 3.1999', 'aluno'):
+            expressao = aplicacao.expressao_busca(termo)
+            parametros = {'termo': f'%{termo}%', 'expressao': expressao, 'limite': args.limite}
+            casam = conn.execute('SELECT COUNT(*) FROM StudentSearch WHERE StudentSearch MATCH ?', (expressao,)).fetchone()[0]
+            like = medir(lambda: conn.execute(consulta_like, parametros).fetchall())
+            fts = medir(lambda: conn.execute(consulta_fts, parametros).fetchall())
+            rota = medir(lambda: cliente.get(f'/api/students/search?q={termo}&limit={args.limite}'))
+            # LIKE não ignora acentos nem casa palavras fora de ordem: mostra quantas linhas ele acha
+            casam_like = conn.execute(contagem_like, parametros).fetchone()[0]
+            print(f"{termo:<28}{casam:>8}{like:>10.2f}{fts:>10.2f}{rota:>10.2f}"
+                  + (f'   (LIKE acha {casam_like})' if casam_like != casam else ''))
+        conn.close()
+        resetar_pool()
+
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio
+
+
+def bench_compressao(args):
+    """Tamanho e CPU de cada nível de gzip e brotli nas respostas grandes da API, e a
+    latência das rotas sem e com compressão nos níveis padrão"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        resetar_pool()
+        caminho = os.path.join(diretorio, 'escola.db')
+        gerar_dados(caminho, args.periodos, args.professores, alunos_por_periodo=args.alunos_por_periodo)
+        aplicacao.app.config['DATABASE'] = caminho
+        parametros = parametros_por_papel(caminho)
+        rotas = (('prof1', 'prof123', f"/api/modules/{parametros['professor']['module_id']}/students"),
+                 ('prof1', 'prof123', '/api/professor/students'),
+                 ('admin', 'admin123', '/api/users'),
+                 ('coord1', 'coord123', f"/api/periods/{parametros['coordinator']['period_id']}/students?stream=1"),
+                 ('coord1', 'coord123', f"/api/periods/{parametros['coordinator']['period_id']}/gradebook.csv"))
+        niveis = [('gzip', nivel) for nivel in (1, 6, 9)] + [('br', nivel) for nivel in (1, 4, 6, 9)]
+
+        print(f'Tamanho (KB) e CPU (ms) por resposta; "rede" = tempo de transferência a {args.mbits:g} Mbit/s')
+        print(f"{'nível':<10}{'KB':>10}{'razão':>8}{'CPU ms':>9}{'rede ms':>9}")
+        for username, password, url in rotas:
+            cliente = cliente_logado(username, password)
+            corpo = cliente.get(url).get_data()
+            print(f'{url}  ({len(corpo) / 1024:.1f} KB sem compressão, rede {len(corpo) * 8 / args.mbits / 1000:.1f} ms)')
+            for codificacao, nivel in niveis:
+                tempos = []
+                for _ in range(args.repeticoes):
+                    inicio = time.perf_counter()
+                    comprimir, finalizar = aplicacao.compressor(codificacao, nivel)
+                    comprimido = comprimir(corpo) + finalizar()
+                    tempos.append(time.perf_counter() - inicio)
+                print(f'{codificacao + " " + str(nivel):<10}{len(comprimido) / 1024:>10.1f}{len(corpo) / len(comprimido):>8.1f}'
+                      f'{statistics.median(tempos) * 1000:>9.2f}{len(comprimido) * 8 / args.mbits / 1000:>9.1f}')
+
+        print(f"\nLatência pela aplicação (p50, níveis padrão: gzip {aplicacao.app.config['COMPRESS_LEVEL_GZIP']}, "
+              f"br {aplicacao.app.config['COMPRESS_LEVEL_BR']})")
+        print(f"{'rota':<44}{'sem ms':>9}{'gzip ms':>9}{'br ms':>9}{'KB br':>8}")
+        for username, password, url in rotas:
+            cliente = cliente_logado(username, password)
+            cliente.get(url).get_data()
+            colunas = []
+            for aceita in ('identity', 'gzip', 'br'):
+                tempos = []
+                for _ in range(args.repeticoes):
+                    inicio = time.perf_counter()
+                    resposta = cliente.get(url, headers={'Accept-Encoding': aceita})
+                    tamanho = len(resposta.get_data())
+                    tempos.append(time.perf_counter() - inicio)
+                colunas.append(statistics.median(tempos) * 1000)
+            print(f'{url:<44}' + ''.join(f'{coluna:>9.2f}' for coluna in colunas) + f'{tamanho / 1024:>8.1f}')
+        resetar_pool()
+
+
+def bench_estaticos(args):
+    """Bytes e requisições por visita às páginas com os scripts inline e os estáticos
+    originais (antes) contra os arquivos do build, versionados e pré-comprimidos (depois)"""
+    from gerar_estaticos import gerar_estaticos
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        resetar_pool()
+        preparar_banco(diretorio)
+        inicio = time.perf_counter()
+        tamanhos = gerar_estaticos(aplicacao.app.static_folder, os.path.join(diretorio, 'dist'))
+        duracao = time.perf_counter() - inicio
+        aplicacao.app.config['STATIC_DIST'] = os.path.join(diretorio, 'dist')
+        totais = [sum(valores) for valores in zip(*tamanhos.values())]
+        print(f'Build: {len(tamanhos)} arquivos em {duracao:.2f} s; {totais[0] / 1024:.1f} KB originais, '
+              f'{totais[1] / 1024:.1f} KB minificados, {totais[2] / 1024:.1f} KB gzip, {totais[3] / 1024:.1f} KB brotli')
+        originais = {versionado: original for original, versionado in aplicacao.manifesto_estaticos().items()}
+
+        print(f"{'página':<32}{'1ª visita KB':>22}{'visitas seguintes KB':>24}{'requisições':>14}")
+        print(f"{'':<32}{'antes':>11}{'depois':>11}{'antes':>12}{'depois':>12}{'antes':>7}{'depois':>7}")
+        for username, password, url in (('prof1', 'prof123', '/professor/modules'),
+                                        ('prof1', 'prof123', '/professor/students'),
+                                        ('coord1', 'coord123', '/coordinator/periods'),
+                                        ('coord1', 'coord123', '/coordinator/period/1/modules'),
+                                        ('admin', 'admin123', '/admin/users'),
+                                        ('admin', 'admin123', '/admin/periods')):
+            cliente = cliente_logado(username, password)
+            html = cliente.get(url).get_data(as_text=True)
+            antes_html, antes_ativos, depois_ativos, ativos = html, 0, 0, 0
+            for endereco in re.findall(r'(?:src|href)="(/static/dist/[^"]+)"', html):
+                original = originais[endereco[len('/static/dist/'):]]
+                with open(os.path.join(aplicacao.app.static_folder, original), encoding='utf-8') as arquivo:
+                    conteudo = arquivo.read()
+                if original.startswith('js/paginas/'):
+                    # Antes: o script da página vinha inline no HTML
+                    antes_html = antes_html.replace(f'<script src="{endereco}"></script>', f'<script>\n{conteudo}</script>')
+                else:
+                    antes_ativos += len(conteudo.encode('utf-8'))
+                    ativos += 1
+                depois_ativos += len(cliente.get(endereco, headers={'Accept-Encoding': 'br, gzip'}).get_data())
+            # Antes, as visitas seguintes revalidavam main.js e style.css (304); depois, o cache é imutável
+            antes, depois = len(antes_html.encode('utf-8')), len(html.encode('utf-8'))
+            print(f'{url:<32}{(antes + antes_ativos) / 1024:>11.1f}{(depois + depois_ativos) / 1024:>11.1f}'
+                  f'{antes / 1024:>12.1f}{depois / 1024:>12.1f}{1 + ativos:>7}{1:>7}')
+        resetar_pool()
+
+
+def abrir_streams(porta, cookie, quantidade):
+    """Sockets com GET /api/stream/periods/1 já respondido (linha retry recebida)"""
+    sockets = []
+    for _ in range(quantidade):
+        conexao = socket.create_connection(('127.0.0.1', porta))
+        conexao.sendall(f'GET /api/stream/periods/1 HTTP/1.1\r\nHost: localhost\r\nCookie: {cookie}\r\n\r\n'.encode())
+        recebido = b''
+        while b'retry:' not in recebido:
+            recebido += conexao.recv(4096)
+        sockets.append(conexao)
+    return sockets
+
+
+def bench_sse(args):
+    """Streams SSE parados em um processo: memória por stream, latência de entrega de um
+    evento a todos e latência das outras rotas com os streams abertos; e o custo do
+    Difusor sozinho para distribuir um evento a muitas assinaturas"""
+    from werkzeug.serving import make_server
+    import http.client
+    import selectors
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        resetar_pool()
+        preparar_banco(diretorio)
+        aplicacao.app.config['STREAM_MAX_CLIENTS'] = max(args.streams) + args.assinaturas
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        servidor = make_server('127.0.0.1', 0, aplicacao.app, threaded=True)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        porta = servidor.server_port
+
+        conexao = http.client.HTTPConnection('127.0.0.1', porta)
+        conexao.request('POST', '/login', body='username=coord1&password=coord123',
+                        headers={'Content-Type': 'application/x-www-form-urlencoded'})
+        resposta = conexao.getresponse()
+        resposta.read()
+        cookie = resposta.getheader('Set-Cookie').split(';')[0]
+
+        def latencia_rota():
+            tempos = []
+            for _ in range(20):
+                inicio = time.perf_counter()
+                conexao.request('GET', '/api/coordinator/periods', headers={'Cookie': cookie})
+                conexao.getresponse().read()
+                tempos.append(time.perf_counter() - inicio)
+            return statistics.median(tempos) * 1000
+
+        print(f"{'streams':>8}{'MB/1000':>10}{'entrega p50':>13}{'p99':>8}{'máx ms':>8}{'rota ms':>9}")
+        for quantidade in args.streams:
+            rss_antes = rss_atual_mb()
+            sockets = abrir_streams(porta, cookie, quantidade)
+            rss_depois = rss_atual_mb()
+
+            seletor = selectors.DefaultSelector()
+            for conexao_stream in sockets:
+                seletor.register(conexao_stream, selectors.EVENT_READ, [b''])
+            inicio = time.perf_counter()
+            aplicacao.executar_escrita(lambda cursor: aplicacao.publicar_evento(cursor, 1, 'grades', module_id=1))
+            aplicacao.registrar_escrita('Grades')
+            entregas = []
+            while len(entregas) < quantidade:
+                for chave, _ in seletor.select(timeout=5):
+                    chave.data[0] += chave.fileobj.recv(4096)
+                    if b'event: grades' in chave.data[0]:
+                        entregas.append(time.perf_counter() - inicio)
+                        seletor.unregister(chave.fileobj)
+            rota = latencia_rota()
+            entregas.sort()
+            print(f"{quantidade:>8}{(rss_depois - rss_antes) * 1000 / quantidade:>10.1f}"
+                  f"{entregas[len(entregas) // 2] * 1000:>13.1f}{percentil(entregas, 0.99) * 1000:>8.1f}"
+                  f"{entregas[-1] * 1000:>8.1f}{rota:>9.2f}")
+            for conexao_stream in sockets:
+                conexao_stream.close()
+            # Sem esperar o heartbeat: expulsar as assinaturas encerra os geradores
+            for assinatura in list(aplicacao.difusor._assinaturas.get(1, ())):
+                assinatura.expulsa = True
+                assinatura.sinal.set()
+            while aplicacao.difusor.estatisticas()['clientes']:
+                time.sleep(0.05)
+        servidor.shutdown()
+
+        # Só o Difusor: memória por assinatura e tempo para distribuir um evento
+        tracemalloc.start()
+        antes = tracemalloc.get_traced_memory()[0]
+        assinaturas = [aplicacao.difusor.assinar(1) for _ in range(args.assinaturas)]
+        por_assinatura = (tracemalloc.get_traced_memory()[0] - antes) / args.assinaturas
+        tracemalloc.stop()
+        inicio = time.perf_counter()
+        aplicacao.difusor.distribuir([(1, 1, 'grades', '{}')])
+        duracao = time.perf_counter() - inicio
+        print(f'Difusor: {por_assinatura:.0f} bytes por assinatura; '
+              f'1 evento para {args.assinaturas} assinaturas em {duracao * 1000:.1f} ms')
+        for assinatura in assinaturas:
+            aplicacao.difusor.cancelar(assinatura)
+        resetar_pool()
+
+
+def rss_atual_mb():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize() / 2 ** 20
+
+
+def paginas_recarregadas(parametros):
+    """(usuário, senha, URLs buscadas ao abrir a página), como os templates fazem"""
+    coordenacao, professor = parametros['coordinator'], parametros['professor']
+    return {
+        'coordenador/módulos': ('coord1', 'coord123', [
+            '/api/professors', '/api/professors', f"/api/coordinator/periods/{coordenacao['period_id']}/modules"]),
+        'coordenador/períodos': ('coord1', 'coord123', [
+            '/api/coordinator/periods', f"/api/periods/{coordenacao['period_id']}/students",
+            f"/api/coordinator/periods/{coordenacao['period_id']}/modules"]),
+        'professor/notas': ('prof1', 'prof123', [f"/api/modules/{professor['module_id']}/students"]),
+        'professor/módulos': ('prof1', 'prof123', ['/api/modulos', '/api/professor/modules', '/api/professor/periods']),
+    }
+
+
+def tempo_sql_total():
+    return sum(segundos for _, segundos in aplicacao.metricas.sql.values())
+
+
+def bench_etag(args):
+    """Páginas recarregadas sem cache (antes) contra um cliente que reenvia o ETag (depois):
+    bytes transferidos, tempo no SQLite e latência"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        resetar_pool()
+        aplicacao.app.config['METRICS'] = True
+        aplicacao.app.config['SLOW_QUERY_LOG'] = os.path.join(diretorio, 'slow_queries.log')
+        caminho = os.path.join(diretorio, 'escola.db')
+        gerar_dados(caminho, args.periodos, args.professores, alunos_por_periodo=args.alunos_por_periodo)
+        aplicacao.app.config['DATABASE'] = caminho
+
+        print(f"{'página':<22}{'modo':<8}{'KB/carga':>10}{'SQL ms/carga':>14}{'ms/carga':>10}{'304':>6}")
+        for pagina, (username, password, urls) in paginas_recarregadas(parametros_por_papel(caminho)).items():
+            cliente = cliente_logado(username, password)
+            for modo in ('antes', 'depois'):
+                etags = {}
+                for url in urls:
+                    etags[url] = cliente.get(url).headers.get('ETag')
+                bytes_total, respostas_304 = 0, 0
+                sql_inicio = tempo_sql_total()
+                inicio = time.perf_counter()
+                for _ in range(args.cargas):
+                    for url in urls:
+                        cabecalhos = {'If-None-Match': etags[url]} if modo == 'depois' and etags[url] else {}
+                        resposta = cliente.get(url, headers=cabecalhos)
+                        bytes_total += len(resposta.get_data())
+                        respostas_304 += resposta.status_code == 304
+                duracao = time.perf_counter() - inicio
+                sql = tempo_sql_total() - sql_inicio
+                print(f"{pagina:<22}{modo:<8}{bytes_total / args.cargas / 1024:>10.1f}"
+                      f"{sql / args.cargas * 1000:>14.2f}{duracao / args.cargas * 1000:>10.2f}{respostas_304:>6}")
+        resetar_pool()
+
+
+def tempestade_de_login(segundos, threads, senha_errada, rota='/api/modulos'):
+    """`threads` clientes fazendo login sem parar enquanto outro cliente mede `rota`"""
+    contagem = {'ok': 0, 'recusados': 0, 'invalidos': 0}
+    latencias_login, latencias_rota = [], []
+    trava = threading.Lock()
+    leitor = cliente_logado('prof2', 'prof123')
+    fim = time.perf_counter() + segundos
+
+    def logar(indice):
+        cliente = aplicacao.app.test_client()
+        # Pico: usuários diferentes com a senha certa; ataque: sempre a senha errada
+        dados = {'username': f'prof{indice % 2 + 1}' if senha_errada else ('prof1', 'coord1', 'admin')[indice % 3],
+                 'password': 'errada' if senha_errada else ('prof123', 'coord123', 'admin123')[indice % 3]}
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            status = cliente.post('/login', data=dados).status_code
+            with trava:
+                latencias_login.append(time.perf_counter() - inicio)
+                contagem['ok' if status == 302 else 'recusados' if status in (429, 503) else 'invalidos'] += 1
+
+    def ler():
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            assert leitor.get(rota).status_code == 200
+            latencias_rota.append(time.perf_counter() - inicio)
+
+    trabalhadores = [threading.Thread(target=logar, args=(i,)) for i in range(threads)] + [threading.Thread(target=ler)]
+    for t in trabalhadores:
+        t.start()
+    for t in trabalhadores:
+        t.join()
+    return contagem, latencias_login, latencias_rota
+
+
+def bench_login(args):
+    """Logins simultâneos com o PBKDF2 na thread da requisição (antes) contra o
+    pool de processos limitado com bloqueio por tentativas (depois), e a
+    latência de outra rota durante a tempestade"""
+    configuracao = {chave: aplicacao.app.config[chave] for chave in
+                    ('LOGIN_WORKERS', 'LOGIN_MAX_PENDING', 'LOGIN_MAX_FAILURES', 'LOGIN_MAX_FAILURES_IP')}
+    modos = {
+        # Sem pool e sem bloqueio: o comportamento original
+        'antes': {'LOGIN_WORKERS': 0, 'LOGIN_MAX_FAILURES': 10 ** 9, 'LOGIN_MAX_FAILURES_IP': 10 ** 9},
+        'depois': {'LOGIN_WORKERS': args.processos, 'LOGIN_MAX_PENDING': args.fila},
+    }
+    nivel = aplicacao.log.level
+    aplicacao.log.setLevel(logging.ERROR)  # avisos de bloqueio
+    with tempfile.TemporaryDirectory() as diretorio:
+        resetar_pool()
+        preparar_banco(diretorio)
+        leitor = cliente_logado('prof2', 'prof123')
+        base = []
+        for _ in range(200):
+            inicio = time.perf_counter()
+            leitor.get('/api/modulos')
+            base.append(time.perf_counter() - inicio)
+        print(f"/api/modulos sem logins: p50 {percentil(base, 0.5) * 1000:.1f} ms, p95 {percentil(base, 0.95) * 1000:.1f} ms")
+        print(f"{'cenário':<9}{'modo':<8}{'logins/s':>10}{'inválidos/s':>13}{'recusados/s':>13}"
+              f"{'login p95 (ms)':>16}{'rota p50 (ms)':>15}{'rota p95 (ms)':>15}")
+        for cenario in ('pico', 'ataque'):
+            for modo, valores in modos.items():
+                aplicacao.app.config.update(configuracao, **valores)
+                aplicacao.verificador_senhas.fechar()
+                aplicacao.tentativas_login.limpar()
+                # Sobe os processos do pool antes de medir
+                aplicacao.verificador_senhas.verificar(aplicacao.generate_password_hash('x'), 'x')
+                contagem, logins, rota = tempestade_de_login(args.segundos, args.threads, cenario == 'ataque')
+                s = args.segundos
+                print(f"{cenario:<9}{modo:<8}{contagem['ok'] / s:>10.1f}{contagem['invalidos'] / s:>13.1f}"
+                      f"{contagem['recusados'] / s:>13.1f}{percentil(logins, 0.95) * 1000:>16.0f}"
+                      f"{percentil(rota, 0.5) * 1000:>15.1f}{percentil(rota, 0.95) * 1000:>15.1f}")
+        aplicacao.app.config.update(configuracao)
+        aplicacao.verificador_senhas.fechar()
+        aplicacao.tentativas_login.limpar()
+        resetar_pool()
+    aplicacao.log.setLevel(nivel)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks da Aplicação Professor')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p = sub.add_parser('pool', help='requisições/s com e sem o pool de conexões')
+    p.add_argument('--segundos', type=float, default=3.0)
+    p.add_argument('--threads', type=int, nargs='+', default=[1, 8])
+    p.set_defaults(func=bench_pool)
+
+    p = sub.add_parser('matricula', help='matrícula automática em lote contra loop por aluno')
+    p.add_argument('--alunos', type=int, nargs='+', default=[10000, 100000])
+    p.set_defaults(func=bench_matricula)
+
+    p = sub.add_parser('notas', help='PUT de notas por matrícula contra PUT em lote do módulo')
+    p.add_argument('--linhas', type=int, nargs='+', default=[50, 500, 5000])
+    p.set_defaults(func=bench_notas)
+
+    p = sub.add_parser('importacao', help='importação de alunos por CSV')
+    p.add_argument('--linhas', type=int, nargs='+', default=[50000])
+    p.set_defaults(func=bench_importacao)
+
+    p = sub.add_parser('exportacao', help='exportação do boletim do período em streaming')
+    p.add_argument('--alunos', type=int, default=10000)
+    p.add_argument('--modulos', type=int, default=10)
+    p.set_defaults(func=bench_exportacao)
+
+    p = sub.add_parser('concorrencia', help='escritas concorrentes de vários processos, antes e depois da fila de escrita')
+    p.add_argument('--clientes', type=int, nargs='+', default=[8, 32])
+    p.add_argument('--processos', type=int, default=4)
+    p.add_argument('--segundos', type=float, default=5.0)
+    p.set_defaults(func=bench_concorrencia)
+
+    p = sub.add_parser('metricas', help='custo das métricas do /metrics por requisição')
+    p.add_argument('--requisicoes', type=int, default=2000)
+    p.set_defaults(func=bench_metricas)
+
+    p = sub.add_parser('logs', help='custo do log de depuração na thread da requisição')
+    p.add_argument('--chamadas', type=int, default=20000)
+    p.set_defaults(func=bench_logs)
+
+    p = sub.add_parser('rotas', help='latência, SQL e memória de todas as rotas /api por papel')
+    p.add_argument('--banco', help='banco existente (as escritas medidas regravam os mesmos valores)')
+    p.add_argument('--periodos', type=int, default=10)
+    p.add_argument('--professores', type=int, default=100)
+    p.add_argument('--modulos-por-professor', type=int, default=5)
+    p.add_argument('--alunos-por-periodo', type=int, default=2000)
+    p.add_argument('--densidade', type=float, default=0.5)
+    p.add_argument('--semente', type=int, default=42)
+    p.add_argument('--repeticoes', type=int, default=20)
+    p.add_argument('--saida', help='arquivo JSON com os resultados')
+    p.add_argument('--comparar', help='JSON de uma execução anterior')
+    p.set_defaults(func=bench_rotas)
+
+    p = sub.add_parser('notas-finais', help='recálculo das notas finais de todo o banco com NumPy')
+    p.add_argument('--periodos', type=int, default=10)
+    p.add_argument('--professores', type=int, default=200)
+    p.add_argument('--modulos-por-professor', type=int, default=5)
+    p.add_argument('--alunos-por-periodo', type=int, default=2000)
+    p.add_argument('--densidade', type=float, default=0.5)
+    p.set_defaults(func=bench_notas_finais)
+
+    p = sub.add_parser('analise', help='análise de notas e dashboard: varredura de Grades contra o histograma GradeSummary')
+    p.add_argument('--periodos', type=int, default=10)
+    p.add_argument('--professores', type=int, default=200)
+    p.add_argument('--alunos-por-periodo', type=int, default=2000)
+    p.add_argument('--repeticoes', type=int, default=20)
+    p.add_argument('--escritas', type=int, default=20000)
+    p.set_defaults(func=bench_analise)
+
+    p = sub.add_parser('risco', help='lista de risco por faltas: varredura ordenada contra o índice AbsenceRisk')
+    p.add_argument('--periodos', type=int, default=2)
+    p.add_argument('--professores', type=int, default=50)
+    p.add_argument('--alunos-por-periodo', type=int, default=1000)
+    p.add_argument('--limite', type=int, default=50)
+    p.add_argument('--paginas', type=int, default=10)
+    p.add_argument('--repeticoes', type=int, default=20)
+    p.add_argument('--escritas', type=int, default=20000)
+    p.set_defaults(func=bench_risco)
+
+    p = sub.add_parser('busca', help="busca de alunos: LIKE '%%termo%%' contra o índice FTS5")
+    p.add_argument('--alunos', type=int, default=200000)
+    p.add_argument('--periodos', type=int, default=10)
+    p.add_argument('--limite', type=int, default=50)
+    p.add_argument('--repeticoes', type=int, default=5)
+    p.set_defaults(func=bench_busca)
+
+    p = sub.add_parser('compressao', help='tamanho e CPU por nível de gzip/brotli nas respostas grandes da API')
+    p.add_argument('--periodos', type=int, default=2)
+    p.add_argument('--professores', type=int, default=100)
+    p.add_argument('--alunos-por-periodo', type=int, default=5000)
+    p.add_argument('--mbits', type=float, default=10, help='banda usada para estimar o tempo de transferência')
+    p.add_argument('--repeticoes', type=int, default=5)
+    p.set_defaults(func=bench_compressao)
+
+    p = sub.add_parser('estaticos', help='bytes por visita com scripts inline contra o build versionado e comprimido')
+    p.set_defaults(func=bench_estaticos)
+
+    p = sub.add_parser('sse', help='streams SSE parados: memória, latência de entrega e das outras rotas')
+    p.add_argument('--streams', type=int, nargs='+', default=[100, 1000])
+    p.add_argument('--assinaturas', type=int, default=10000)
+    p.set_defaults(func=bench_sse)
+
+    p = sub.add_parser('etag', help='páginas recarregadas com e sem If-None-Match: bytes, tempo de SQL e latência')
+    p.add_argument('--periodos', type=int, default=4)
+    p.add_argument('--professores', type=int, default=20)
+    p.add_argument('--alunos-por-periodo', type=int, default=2000)
+    p.add_argument('--cargas', type=int, default=50)
+    p.set_defaults(func=bench_etag)
+
+    p = sub.add_parser('login', help='logins simultâneos e latência das outras rotas durante a tempestade')
+    p.add_argument('--threads', type=int, default=16, help='clientes fazendo login ao mesmo tempo')
+    p.add_argument('--processos', type=int, default=aplicacao.app.config['LOGIN_WORKERS'] or 1)
+    p.add_argument('--fila', type=int, default=aplicacao.app.config['LOGIN_MAX_PENDING'])
+    p.add_argument('--segundos', type=float, default=5)
+    p.set_defaults(func=bench_login)
+
+    args = parser.parse_args()
+    # Logs de migração e de depuração não se misturam com as tabelas
+    aplicacao.log.setLevel(logging.WARNING)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
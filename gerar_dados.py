@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Gerador de dados sintéticos em escala de escola
+
+Cria um banco novo com o esquema da aplicação (migrações) e o popula com
+períodos, coordenadores, professores, módulos, alunos, matrículas e notas.
+Alunos, matrículas e notas são gerados em SQL (INSERT ... SELECT), então
+milhões de linhas de notas levam segundos.
+
+As credenciais seguem as dos dados de exemplo: admin/admin123,
+coord1..coordN/coord123 (um coordenador por período) e
+prof1..profN/prof123. A mesma semente gera o mesmo banco.
+
+Uso:
+    python gerar_dados.py escola.db [--periodos 10] [--professores 100]
+        [--modulos-por-professor 5] [--alunos-por-periodo 2000] [--densidade 0.5] [--semente 42]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import time
+
+from werkzeug.security import generate_password_hash
+
+import app as aplicacao
+
+
+def sorteador(semente):
+    """Função SQL sorteio(a, b, ...) -> inteiro em [0, 2**62): hash dos argumentos com a semente.
+
+    Depende só dos argumentos, então o resultado não muda com a ordem em que
+    o SQLite avalia as linhas. O hash de tuplas de inteiros do Python não é
+    afetado por PYTHONHASHSEED.
+    """
+    def sorteio(*valores):
+        return hash((semente,) + valores) & (2 ** 62 - 1)
+    return sorteio
+
+
+def gerar_dados(caminho, periodos=10, professores=100, modulos_por_professor=5,
+                alunos_por_periodo=2000, densidade=0.5, semente=42):
+    """Criar o banco em `caminho` e devolver a contagem de linhas por tabela"""
+    if os.path.exists(caminho):
+        raise FileExistsError(f'{caminho} já existe')
+    gerador = random.Random(semente)
+
+    conn = sqlite3.connect(caminho)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = OFF')
+    aplicacao.aplicar_migracoes(conn)
+    conn.create_function('sorteio', -1, sorteador(semente), deterministic=True)
+    cursor = conn.cursor()
+    cursor.execute('BEGIN')
+    # Banco novo: os contadores de TableVersions não precisam subir a cada linha
+    for tabela in aplicacao.TABELAS_VERSIONADAS:
+        for operacao in ('insert', 'update', 'delete'):
+            cursor.execute(f'DROP TRIGGER trg_{tabela.lower()}_{operacao}_version')
+
+    # Um hash por papel: as senhas são as mesmas para todos os usuários do papel
+    senhas = {papel: generate_password_hash(senha) for papel, senha in
+              (('admin', 'admin123'), ('coordinator', 'coord123'), ('professor', 'prof123'))}
+    usuarios = [('admin', senhas['admin'], 'admin', 'Administrador do Sistema', 'admin@escola.com')]
+    usuarios += [(f'coord{i}', senhas['coordinator'], 'coordinator', f'Coordenador {i}', f'coord{i}@escola.com')
+                 for i in range(1, periodos + 1)]
+    usuarios += [(f'prof{i}', senhas['professor'], 'professor', f'Professor {i}', f'prof{i}@escola.com')
+                 for i in range(1, professores + 1)]
+    cursor.executemany('INSERT INTO Users (username, password_hash, role, full_name, email) VALUES (?, ?, ?, ?, ?)', usuarios)
+    coordenadores = [row['id'] for row in cursor.execute("SELECT id FROM Users WHERE role = 'coordinator' ORDER BY id")]
+    ids_professores = [row['id'] for row in cursor.execute("SELECT id FROM Users WHERE role = 'professor' ORDER BY id")]
+
+    cursor.executemany('''
+        INSERT INTO AcademicPeriods (name, start_date, end_date, coordinator_id, is_active) VALUES (?, ?, ?, ?, 1)
+    ''', [(f'Período {i + 1}', '2024-02-01', '2024-12-15', coordenador) for i, coordenador in enumerate(coordenadores)])
+    ids_periodos = [row['id'] for row in cursor.execute('SELECT id FROM AcademicPeriods ORDER BY id')]
+
+    # Módulos distribuídos entre os períodos em rodízio
+    modulos = []
+    for i, professor_id in enumerate(ids_professores):
+        for j in range(modulos_por_professor):
+            periodo_id = ids_periodos[(i * modulos_por_professor + j) % len(ids_periodos)]
+            modulos.append((f'Módulo {i + 1}.{j + 1}', f'M{i + 1:04d}{j + 1:02d}', professor_id, periodo_id,
+                            gerador.choice((2, 4, 6)), 10))
+    cursor.executemany('''
+        INSERT INTO Modules (name, code, professor_id, academic_period_id, credits, max_absences) VALUES (?, ?, ?, ?, ?, ?)
+    ''', modulos)
+
+    # O índice de busca (FTS5) é montado no fim, de uma vez
+    cursor.execute('DROP TRIGGER trg_students_insert_search')
+    for periodo_id in ids_periodos:
+        cursor.execute('''
+            WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < :alunos)
+            INSERT INTO Students (student_number, full_name, email, academic_period_id, enrollment_date,
+                                  medical_certificates, referral_info, observations)
+            SELECT printf('%04d%07d', :periodo, i), printf('Aluno %d.%d', :periodo, i),
+                   printf('aluno%d.%d@email.com', :periodo, i), :periodo, '2024-02-01',
+                   sorteio(:periodo, i) % 10 = 0, '', ''
+            FROM seq
+        ''', {'alunos': alunos_por_periodo, 'periodo': periodo_id})
+
+    # O contador de alunos por módulo é recalculado de uma vez no fim,
+    # em vez de um UPDATE por matrícula no trigger
+    cursor.execute('DROP TRIGGER trg_enrollments_insert_count')
+    cursor.execute('''
+        INSERT INTO Enrollments (student_id, module_id)
+        SELECT s.id, m.id FROM Modules m
+        JOIN Students s ON s.academic_period_id = m.academic_period_id
+        WHERE sorteio(s.id, m.id) < ?
+        ORDER BY m.id, s.id
+    ''', (int(densidade * 2 ** 62),))
+    cursor.execute('UPDATE Modules SET student_count = (SELECT COUNT(*) FROM Enrollments e WHERE e.module_id = Modules.id)')
+    aplicacao.garantir_contador_matriculas(cursor)
+
+    # O histograma GradeSummary e o índice AbsenceRisk também são montados no fim, de uma vez
+    cursor.execute('DROP TRIGGER trg_grades_insert_summary')
+    cursor.execute('DROP TRIGGER trg_grades_insert_risk')
+    cursor.execute('''
+        WITH sorteados AS MATERIALIZED (SELECT id, sorteio(id) AS h FROM Enrollments),
+        valores AS (
+            -- Um sorteio por matrícula, fatiado em notas de 0 a 10 (uma casa decimal) e faltas de 0 a 14
+            SELECT id, h % 101 / 10.0 AS tutor, h / 101 % 101 / 10.0 AS regular,
+                   h / 10201 % 101 / 10.0 AS recuperacao, h / 1030301 % 15 AS faltas
+            FROM sorteados
+        )
+        INSERT INTO Grades (enrollment_id, tutor_grade, regular_exam_grade, makeup_exam_grade, final_grade, absences)
+        SELECT id, tutor, regular, CASE WHEN regular < 6 THEN recuperacao ELSE 0 END,
+               max(regular, CASE WHEN regular < 6 THEN recuperacao ELSE 0 END), faltas
+        FROM valores
+    ''')
+    aplicacao.garantir_resumo_notas(cursor)
+    aplicacao.reconstruir_resumo_notas(cursor)
+    aplicacao.garantir_risco_faltas(cursor)
+    aplicacao.reconstruir_risco_faltas(cursor)
+    aplicacao.garantir_busca_alunos(cursor)
+    aplicacao.reconstruir_busca_alunos(cursor)
+    aplicacao.migracao_versoes_tabelas(cursor)
+    conn.commit()
+    conn.execute('ANALYZE')
+
+    contagens = {tabela: conn.execute(f'SELECT COUNT(*) FROM {tabela}').fetchone()[0]
+                 for tabela in ('Users', 'AcademicPeriods', 'Modules', 'Students', 'Enrollments', 'Grades')}
+    conn.close()
+    return contagens
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera um banco com dados sintéticos')
+    parser.add_argument('caminho')
+    parser.add_argument('--periodos', type=int, default=10)
+    parser.add_argument('--professores', type=int, default=100)
+    parser.add_argument('--modulos-por-professor', type=int, default=5)
+    parser.add_argument('--alunos-por-periodo', type=int, default=2000)
+    parser.add_argument('--densidade', type=float, default=0.5, help='fração dos alunos do período matriculada em cada módulo')
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+    aplicacao.log.setLevel(logging.WARNING)
+
+    inicio = time.perf_counter()
+    contagens = gerar_dados(args.caminho, args.periodos, args.professores, args.modulos_por_professor,
+                            args.alunos_por_periodo, args.densidade, args.semente)
+    for tabela, total in contagens.items():
+        print(f'{tabela:<16}{total:>12}')
+    print(f'Gerado em {time.perf_counter() - inicio:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Build dos arquivos estáticos
+
+Minifica os .js e .css de static/, grava cada um com o hash do conteúdo no
+nome (js/main.3f2a1b4c5d6e.js) e suas versões comprimidas .gz e .br, e
+escreve o manifest.json que liga o nome original ao versionado. A aplicação
+usa o manifesto em url_estatico() e serve esses arquivos com cache imutável;
+sem o build ela serve os originais.
+
+A minificação é conservadora: tira comentários, indentação e espaços em
+volta da pontuação, mas mantém as quebras de linha, então a inserção
+automática de ponto e vírgula do JavaScript não muda. Strings, template
+literals e expressões regulares passam intactos.
+
+Uso:
+    python gerar_estaticos.py [--origem static] [--destino static/dist]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+
+import brotli
+
+# Espaço em volta destes caracteres nunca separa dois tokens (+, - e / ficam de fora: a + +b)
+PONTUACAO_JS = frozenset('{}()[],;:=<>?!&|*%^~')
+# Depois destes caracteres e palavras, uma / abre expressão regular, não divisão
+ANTES_DE_REGEX = frozenset('(,=:[!&|?{};+-*%<>~^')
+PALAVRAS_ANTES_DE_REGEX = frozenset(('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new',
+                                     'delete', 'void', 'throw', 'instanceof', 'yield', 'await'))
+PALAVRA_FINAL = re.compile(r'[A-Za-z_$][\w$]*$')
+
+CSS_STRING_OU_COMENTARIO = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/''', re.S)
+
+
+def _fim_string(texto, inicio):
+    """Índice logo depois da aspa que fecha a string aberta em `inicio`"""
+    aspa = texto[inicio]
+    i = inicio + 1
+    while i < len(texto) and texto[i] != aspa:
+        i += 2 if texto[i] == '\\' else 1
+    return i + 1
+
+
+def _fim_regex(texto, inicio):
+    """Índice logo depois das flags da expressão regular aberta em `inicio`"""
+    i, classe = inicio + 1, False
+    while i < len(texto) and texto[i] != '\n':
+        c = texto[i]
+        if c == '\\':
+            i += 1
+        elif c == '[':
+            classe = True
+        elif c == ']':
+            classe = False
+        elif c == '/' and not classe:
+            break
+        i += 1
+    i += 1
+    while i < len(texto) and (texto[i].isalnum() or texto[i] == '_'):
+        i += 1
+    return i
+
+
+def _abre_regex(saida):
+    codigo = ''.join(saida[-16:]).rstrip()
+    if not codigo or codigo[-1] in ANTES_DE_REGEX:
+        return True
+    palavra = PALAVRA_FINAL.search(codigo)
+    return palavra is not None and palavra.group() in PALAVRAS_ANTES_DE_REGEX
+
+
+def minificar_js(texto):
+    saida = []
+    chaves = []  # chaves abertas em cada ${...} de template literal, do mais interno no fim
+    i, n = 0, len(texto)
+    em_template = False
+    while i < n:
+        if em_template:
+            inicio = i
+            while i < n and texto[i] != '`' and not texto.startswith('${', i):
+                i += 2 if texto[i] == '\\' else 1
+            if texto.startswith('${', i):
+                saida.append(texto[inicio:i + 2])
+                chaves.append(0)
+                em_template = False
+                i += 2
+            else:
+                saida.append(texto[inicio:i + 1])
+                em_template = False
+                i += 1
+            continue
+
+        c = texto[i]
+        if c in '\'"':
+            fim = _fim_string(texto, i)
+            saida.append(texto[i:fim])
+            i = fim
+        elif c == '`':
+            saida.append(c)
+            em_template = True
+            i += 1
+        elif c == '{' and chaves:
+            chaves[-1] += 1
+            saida.append(c)
+            i += 1
+        elif c == '}' and chaves:
+            if chaves[-1] == 0:
+                # Fecha o ${...}: volta para o texto do template
+                chaves.pop()
+                em_template = True
+            else:
+                chaves[-1] -= 1
+            saida.append(c)
+            i += 1
+        elif c.isspace() or texto.startswith(('//', '/*'), i):
+            # Espaços e comentários viram uma quebra de linha (se havia uma) ou um espaço
+            quebra = False
+            while i < n:
+                if texto[i].isspace():
+                    quebra = quebra or texto[i] == '\n'
+                    i += 1
+                elif texto.startswith('//', i):
+                    fim = texto.find('\n', i)
+                    i = n if fim == -1 else fim
+                elif texto.startswith('/*', i):
+                    fim = texto.find('*/', i + 2)
+                    fim = n if fim == -1 else fim + 2
+                    quebra = quebra or '\n' in texto[i:fim]
+                    i = fim
+                else:
+                    break
+            while saida and saida[-1] == ' ':
+                saida.pop()
+            if not saida or saida[-1] == '\n' or i >= n:
+                continue
+            if quebra:
+                saida.append('\n')
+            elif saida[-1][-1] not in PONTUACAO_JS and texto[i] not in PONTUACAO_JS:
+                saida.append(' ')
+        elif c == '/' and _abre_regex(saida):
+            fim = _fim_regex(texto, i)
+            saida.append(texto[i:fim])
+            i = fim
+        else:
+            saida.append(c)
+            i += 1
+    return ''.join(saida).strip() + '\n'
+
+
+def minificar_css(texto):
+    def trecho(correspondencia):
+        # Strings ficam como estão; comentários somem
+        return correspondencia.group(1) or ''
+
+    partes = []
+    posicao = 0
+    for correspondencia in CSS_STRING_OU_COMENTARIO.finditer(texto):
+        partes.append(_compactar_css(texto[posicao:correspondencia.start()]))
+        partes.append(trecho(correspondencia))
+        posicao = correspondencia.end()
+    partes.append(_compactar_css(texto[posicao:]))
+    return ''.join(partes).strip() + '\n'
+
+
+def _compactar_css(texto):
+    texto = re.sub(r'\s+', ' ', texto)
+    texto = re.sub(r' ?([{};,>]) ?', r'\1', texto)
+    texto = re.sub(r': ', ':', texto)
+    return texto.replace(';}', '}')
+
+
+MINIFICADORES = {'.js': minificar_js, '.css': minificar_css}
+
+
+def gerar_estaticos(origem, destino):
+    """Gravar os arquivos versionados em `destino`; devolve {nome: (original, minificado, gzip, brotli)} em bytes"""
+    if os.path.exists(destino):
+        if not os.path.exists(os.path.join(destino, 'manifest.json')):
+            raise FileExistsError(f'{destino} existe e não é de um build anterior')
+        shutil.rmtree(destino)
+    destino_absoluto = os.path.abspath(destino)
+
+    manifesto, tamanhos = {}, {}
+    for raiz, diretorios, arquivos in os.walk(origem):
+        diretorios[:] = sorted(d for d in diretorios if os.path.abspath(os.path.join(raiz, d)) != destino_absoluto)
+        for arquivo in sorted(arquivos):
+            base, extensao = os.path.splitext(arquivo)
+            if extensao not in MINIFICADORES:
+                continue
+            caminho = os.path.join(raiz, arquivo)
+            with open(caminho, encoding='utf-8') as entrada:
+                original = entrada.read()
+            conteudo = MINIFICADORES[extensao](original).encode('utf-8')
+            relativo = os.path.relpath(caminho, origem).replace(os.sep, '/')
+            versionado = f'{relativo[:-len(extensao)]}.{hashlib.sha256(conteudo).hexdigest()[:12]}{extensao}'
+
+            saida = os.path.join(destino, versionado)
+            os.makedirs(os.path.dirname(saida), exist_ok=True)
+            comprimidos = (gzip.compress(conteudo, 9, mtime=0), brotli.compress(conteudo, quality=11))
+            for sufixo, dados in zip(('', '.gz', '.br'), (conteudo,) + comprimidos):
+                with open(saida + sufixo, 'wb') as arquivo_saida:
+                    arquivo_saida.write(dados)
+            manifesto[relativo] = versionado
+            tamanhos[relativo] = (len(original.encode('utf-8')), len(conteudo)) + tuple(len(d) for d in comprimidos)
+
+    with open(os.path.join(destino, 'manifest.json'), 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, indent=2, sort_keys=True)
+    return tamanhos
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Minifica, versiona e comprime os arquivos estáticos')
+    parser.add_argument('--origem', default='static')
+    parser.add_argument('--destino', default=os.path.join('static', 'dist'))
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    tamanhos = gerar_estaticos(args.origem, args.destino)
+    print(f"{'arquivo':<40}{'original':>10}{'min':>10}{'gzip':>10}{'brotli':>10}")
+    for nome, (original, minificado, comprimido_gzip, comprimido_brotli) in tamanhos.items():
+        print(f'{nome:<40}{original:>10}{minificado:>10}{comprimido_gzip:>10}{comprimido_brotli:>10}')
+    print(f'Gerado em {time.perf_counter() - inicio:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+# Configuração do gunicorn para produção: `gunicorn -c gunicorn.conf.py app:app`
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '4'))
+# gthread atende cada requisição em uma thread. WEB_WORKER_CLASS=gevent (instalado à parte:
+# requirements-gevent.txt) deixa cada stream SSE parado custar uma greenlet, mas o sqlite3 e
+# o flock da trava de escrita bloqueiam sem ceder ao hub: um lote de escrita longo congela o worker
+worker_class = os.getenv('WEB_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('WEB_THREADS', '8'))
+timeout = int(os.getenv('WEB_TIMEOUT', '60'))
+accesslog = '-'
+
+if worker_class == 'gthread':
+    # Limite conhecido: cada stream SSE prende uma thread, então um worker gthread aguenta
+    # no máximo metade de WEB_THREADS streams (4 com o padrão 8). Para muitos clientes
+    # parados, aumente WEB_THREADS ou use gevent
+    os.environ.setdefault('STREAM_MAX_CLIENTS', str(max(1, threads // 2)))
+else:
+    worker_connections = int(os.getenv('WEB_CONNECTIONS', '5000'))
+
+def on_starting(server):
+    # Migrações e dados iniciais rodam uma vez, no processo mestre, antes do fork
+    import app as aplicacao
+    aplicacao.inicializar_bd()
+    aplicacao.fechar_pool()
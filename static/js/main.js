@@ -177,6 +177,53 @@ async function makeRequest(url, options = {}) {
     }
 }
 
+// Dados de referência (professores e períodos ativos): uma requisição por página,
+// em uma URL versionada que o navegador guarda em cache
+let referencias = null;
+
+function carregarReferencias() {
+    if (!referencias) {
+        referencias = fetch(window.URL_BOOTSTRAP || '/api/bootstrap')
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                }
+                return response.json();
+            })
+            .catch(error => {
+                referencias = null;
+                throw error;
+            });
+    }
+    return referencias;
+}
+
+// Busca de alunos no servidor (índice FTS5). Chama `aoBuscar` com os alunos
+// encontrados, ou com null quando o campo fica vazio (a página volta à lista completa).
+// As buscas esperam uma pausa na digitação e respostas atrasadas são descartadas.
+function configurarBuscaAlunos(campo, parametros, aoBuscar) {
+    let espera = null;
+    let ultima = 0;
+    campo.addEventListener('input', () => {
+        clearTimeout(espera);
+        espera = setTimeout(() => {
+            const termo = campo.value.trim();
+            const numero = ++ultima;
+            if (!termo) {
+                aoBuscar(null);
+                return;
+            }
+            const consulta = new URLSearchParams(Object.assign({ q: termo, limit: 50 }, parametros()));
+            fetch(`/api/students/search?${consulta}`)
+                .then(response => response.ok ? response.json() : [])
+                .then(alunos => {
+                    if (numero === ultima) aoBuscar(alunos);
+                })
+                .catch(error => console.error('Erro na busca de alunos:', error));
+        }, 250);
+    });
+}
+
 // Funções para modais
 function openAddStudentModal() {
     const modal = new bootstrap.Modal(document.getElementById('addStudentModal'));
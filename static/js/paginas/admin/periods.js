@@ -0,0 +1,231 @@
+let periods = [];
+let coordinators = [];
+let editingPeriodId = null;
+let deletingPeriodId = null;
+
+document.addEventListener('DOMContentLoaded', function() {
+    loadPeriods();
+    loadCoordinators();
+});
+
+async function loadPeriods() {
+    try {
+        const response = await fetch('/api/periods');
+        periods = await response.json();
+        renderPeriodsTable();
+    } catch (error) {
+        console.error('Erro ao carregar períodos:', error);
+        showMessage('Erro ao carregar períodos', 'danger');
+    }
+}
+
+async function loadCoordinators() {
+    try {
+        const response = await fetch('/api/users');
+        const users = await response.json();
+        coordinators = users.filter(user => user.role === 'coordinator');
+        populateCoordinatorSelect();
+    } catch (error) {
+        console.error('Erro ao carregar coordenadores:', error);
+    }
+}
+
+function populateCoordinatorSelect() {
+    const select = document.getElementById('coordinatorId');
+    select.innerHTML = '<option value="">Selecione um coordenador</option>';
+    
+    coordinators.forEach(coordinator => {
+        select.innerHTML += `<option value="${coordinator.id}">${coordinator.full_name}</option>`;
+    });
+}
+
+function renderPeriodsTable() {
+    const tbody = document.getElementById('periodsTableBody');
+    
+    if (periods.length === 0) {
+        tbody.innerHTML = `
+            <tr>
+                <td colspan="6" class="text-center py-4">
+                    <i class="bi bi-calendar-range" style="font-size: 2rem; color: var(--color-gray-400);"></i>
+                    <div class="mt-2">Nenhum período encontrado</div>
+                </td>
+            </tr>
+        `;
+        return;
+    }
+    
+    tbody.innerHTML = periods.map(period => `
+        <tr>
+            <td><strong>${period.name}</strong></td>
+            <td>${period.coordinator_name}</td>
+            <td>${formatDate(period.start_date)}</td>
+            <td>${formatDate(period.end_date)}</td>
+            <td>
+                <span class="badge badge-${period.is_active ? 'primary' : 'secondary'}">
+                    ${period.is_active ? 'Ativo' : 'Inativo'}
+                </span>
+            </td>
+            <td>
+                <div class="d-flex gap-1">
+                    <button class="btn btn-sm btn-ghost" onclick="editPeriod(${period.id})" title="Editar">
+                        <i class="bi bi-pencil"></i>
+                    </button>
+                    <button class="btn btn-sm btn-ghost" onclick="deletePeriod(${period.id})" title="Excluir">
+                        <i class="bi bi-trash"></i>
+                    </button>
+                </div>
+            </td>
+        </tr>
+    `).join('');
+}
+
+function showCreatePeriodModal() {
+    editingPeriodId = null;
+    document.getElementById('periodModalTitle').textContent = 'Novo Período';
+    document.getElementById('periodForm').reset();
+    document.getElementById('periodId').value = '';
+    document.getElementById('isActive').checked = true;
+    document.getElementById('savePeriodText').textContent = 'Criar Período';
+    clearMessage('periodModalMessage');
+    
+    const modal = new bootstrap.Modal(document.getElementById('periodModal'));
+    modal.show();
+}
+
+function editPeriod(periodId) {
+    const period = periods.find(p => p.id === periodId);
+    if (!period) return;
+    
+    editingPeriodId = periodId;
+    document.getElementById('periodModalTitle').textContent = 'Editar Período';
+    document.getElementById('periodId').value = period.id;
+    document.getElementById('periodName').value = period.name;
+    document.getElementById('coordinatorId').value = period.coordinator_id;
+    document.getElementById('startDate').value = period.start_date;
+    document.getElementById('endDate').value = period.end_date;
+    document.getElementById('isActive').checked = period.is_active;
+    document.getElementById('savePeriodText').textContent = 'Atualizar Período';
+    clearMessage('periodModalMessage');
+    
+    const modal = new bootstrap.Modal(document.getElementById('periodModal'));
+    modal.show();
+}
+
+async function savePeriod() {
+    const form = document.getElementById('periodForm');
+    if (!form.checkValidity()) {
+        form.reportValidity();
+        return;
+    }
+    
+    const periodData = {
+        name: document.getElementById('periodName').value,
+        coordinator_id: parseInt(document.getElementById('coordinatorId').value),
+        start_date: document.getElementById('startDate').value,
+        end_date: document.getElementById('endDate').value,
+        is_active: document.getElementById('isActive').checked ? 1 : 0
+    };
+    
+    const saveBtn = document.querySelector('[onclick="savePeriod()"]');
+    const originalText = saveBtn.innerHTML;
+    saveBtn.innerHTML = '<div class="spinner spinner-sm me-2"></div>Salvando...';
+    saveBtn.disabled = true;
+    
+    try {
+        const url = editingPeriodId ? `/api/periods/${editingPeriodId}` : '/api/periods';
+        const method = editingPeriodId ? 'PUT' : 'POST';
+        
+        const response = await fetch(url, {
+            method: method,
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(periodData)
+        });
+        
+        const result = await response.json();
+        
+        if (response.ok) {
+            showMessage(result.message, 'success', 'periodModalMessage');
+            setTimeout(() => {
+                const modal = bootstrap.Modal.getInstance(document.getElementById('periodModal'));
+                modal.hide();
+                loadPeriods();
+            }, 1500);
+        } else {
+            showMessage(result.error, 'danger', 'periodModalMessage');
+        }
+    } catch (error) {
+        console.error('Erro ao salvar período:', error);
+        showMessage('Erro ao salvar período', 'danger', 'periodModalMessage');
+    }
+    
+    saveBtn.innerHTML = originalText;
+    saveBtn.disabled = false;
+}
+
+function deletePeriod(periodId) {
+    deletingPeriodId = periodId;
+    const modal = new bootstrap.Modal(document.getElementById('deletePeriodModal'));
+    modal.show();
+}
+
+async function confirmDeletePeriod() {
+    if (!deletingPeriodId) return;
+    
+    try {
+        const response = await fetch(`/api/periods/${deletingPeriodId}`, {
+            method: 'DELETE'
+        });
+        
+        const result = await response.json();
+        
+        if (response.ok) {
+            showMessage(result.message, 'success');
+            const modal = bootstrap.Modal.getInstance(document.getElementById('deletePeriodModal'));
+            modal.hide();
+            loadPeriods();
+        } else {
+            showMessage(result.error, 'danger');
+        }
+    } catch (error) {
+        console.error('Erro ao excluir período:', error);
+        showMessage('Erro ao excluir período', 'danger');
+    }
+    
+    deletingPeriodId = null;
+}
+
+function showMessage(message, type, elementId = 'main') {
+    const alertClass = type === 'danger' ? 'alert-danger' : 'alert-success';
+    const icon = type === 'danger' ? 'bi-exclamation-triangle' : 'bi-check-circle';
+    
+    const html = `
+        <div class="alert ${alertClass}">
+            <i class="bi ${icon} me-2"></i>${message}
+        </div>
+    `;
+    
+    if (elementId === 'main') {
+        const contentArea = document.querySelector('.content-area');
+        const existingAlert = contentArea.querySelector('.alert');
+        if (existingAlert) existingAlert.remove();
+        contentArea.insertAdjacentHTML('afterbegin', html);
+        
+        setTimeout(() => {
+            const alert = contentArea.querySelector('.alert');
+            if (alert) alert.remove();
+        }, 5000);
+    } else {
+        document.getElementById(elementId).innerHTML = html;
+    }
+}
+
+function clearMessage(elementId) {
+    document.getElementById(elementId).innerHTML = '';
+}
+
+function formatDate(dateString) {
+    if (!dateString) return '-';
+    return new Date(dateString).toLocaleDateString('pt-BR');
+}
@@ -0,0 +1,152 @@
+let periodId = window.PERIOD_ID;
+
+// Carregar módulos ao iniciar a página
+document.addEventListener('DOMContentLoaded', function() {
+    console.log('Página carregada, periodId:', periodId);
+    loadModules();
+    loadProfessors();
+});
+
+// Carregar lista de módulos
+function loadModules() {
+    fetch(`/api/coordinator/periods/${periodId}/modules`)
+        .then(response => response.json())
+        .then(data => {
+            const tbody = document.querySelector('#modulesTable tbody');
+            tbody.innerHTML = '';
+            
+            data.forEach(module => {
+                const row = document.createElement('tr');
+                row.innerHTML = `
+                    <td>${module.code}</td>
+                    <td>${module.name}</td>
+                    <td>${module.professor_name}</td>
+                    <td>${module.credits}</td>
+                    <td>${module.max_absences}</td>
+                    <td>
+                        <span class="badge ${module.is_active ? 'bg-success' : 'bg-secondary'}">
+                            ${module.is_active ? 'Ativo' : 'Inativo'}
+                        </span>
+                    </td>
+                `;
+                tbody.appendChild(row);
+            });
+        })
+        .catch(error => {
+            console.error('Erro ao carregar módulos:', error);
+            showAlert('Erro ao carregar módulos', 'danger');
+        });
+}
+
+// Carregar lista de professores
+function loadProfessors() {
+    console.log('Carregando professores...');
+    
+    carregarReferencias()
+        .then(data => {
+            console.log('Dados dos professores:', data.professors);
+            populateProfessorsDropdown(data.professors);
+        })
+        .catch(error => {
+            console.error('Erro ao carregar professores:', error);
+            showAlert(`Erro ao carregar professores: ${error.message}`, 'danger');
+        });
+}
+
+function populateProfessorsDropdown(data) {
+    const select = document.getElementById('professorId');
+    select.innerHTML = '<option value="">Selecione um professor</option>';
+    
+    if (data && data.length > 0) {
+        data.forEach(professor => {
+            const option = document.createElement('option');
+            option.value = professor.id;
+            option.textContent = professor.full_name;
+            select.appendChild(option);
+        });
+        console.log('Professores carregados no dropdown:', data.length);
+    } else {
+        console.log('Nenhum professor encontrado');
+        showAlert('Nenhum professor encontrado no sistema', 'warning');
+    }
+}
+
+// Função para testar a API de professores
+function testProfessorsAPI() {
+    console.log('Testando API de professores...');
+    
+    fetch('/api/professors')
+        .then(response => {
+            console.log('Response status:', response.status);
+            return response.json();
+        })
+        .then(data => {
+            console.log('Dados da API:', data);
+            showAlert(`API funcionando! Encontrados ${data.length} professores`, 'success');
+        })
+        .catch(error => {
+            console.error('Erro na API:', error);
+            showAlert(`Erro na API: ${error.message}`, 'danger');
+        });
+}
+
+// Adicionar novo módulo
+function addModule() {
+    const formData = {
+        code: document.getElementById('moduleCode').value,
+        name: document.getElementById('moduleName').value,
+        professor_id: parseInt(document.getElementById('professorId').value),
+        credits: parseInt(document.getElementById('credits').value),
+        max_absences: parseInt(document.getElementById('maxAbsences').value)
+    };
+
+    // Validação
+    if (!formData.code || !formData.name || !formData.professor_id) {
+        showAlert('Por favor, preencha todos os campos obrigatórios', 'warning');
+        return;
+    }
+
+    fetch(`/api/coordinator/periods/${periodId}/modules`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(formData)
+    })
+    .then(response => {
+        return response.json().then(data => {
+            if (response.ok) {
+                showAlert(data.message, 'success');
+                document.getElementById('addModuleForm').reset();
+                bootstrap.Modal.getInstance(document.getElementById('addModuleModal')).hide();
+                loadModules();
+            } else {
+                showAlert(data.error, 'danger');
+            }
+        });
+    })
+    .catch(error => {
+        console.error('Erro ao adicionar módulo:', error);
+        showAlert('Erro ao adicionar módulo', 'danger');
+    });
+}
+
+// Função para mostrar alertas
+function showAlert(message, type) {
+    const alertDiv = document.createElement('div');
+    alertDiv.className = `alert alert-${type} alert-dismissible fade show`;
+    alertDiv.innerHTML = `
+        ${message}
+        <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+    `;
+    
+    const container = document.querySelector('.container');
+    container.insertBefore(alertDiv, container.firstChild);
+    
+    // Auto-remover após 5 segundos
+    setTimeout(() => {
+        if (alertDiv.parentNode) {
+            alertDiv.remove();
+        }
+    }, 5000);
+}
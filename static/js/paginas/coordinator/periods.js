@@ -0,0 +1,426 @@
+let currentPeriodId = null;
+let periods = [];
+let students = [];
+let modules = [];
+let studentToDelete = null;
+
+document.addEventListener('DOMContentLoaded', function() {
+    loadPeriods();
+    
+    // Set default enrollment date to today
+    document.getElementById('enrollmentDate').value = new Date().toISOString().split('T')[0];
+
+    configurarBuscaAlunos(document.getElementById('studentSearch'), () => ({ period_id: currentPeriodId }), alunos => {
+        if (alunos === null) {
+            loadStudents();
+        } else {
+            students = alunos;
+            renderStudentsTable();
+        }
+    });
+});
+
+async function loadPeriods() {
+    try {
+        const response = await fetch('/api/coordinator/periods');
+        periods = await response.json();
+        renderPeriodsGrid();
+    } catch (error) {
+        console.error('Erro ao carregar períodos:', error);
+        showMessage('Erro ao carregar períodos', 'danger');
+    }
+}
+
+function renderPeriodsGrid() {
+    const container = document.getElementById('periodsContainer');
+    
+    if (periods.length === 0) {
+        container.innerHTML = `
+            <div class="text-center py-5">
+                <i class="bi bi-calendar-range" style="font-size: 3rem; color: var(--color-gray-400);"></i>
+                <h3 class="mt-3">Nenhum período encontrado</h3>
+                <p class="text-muted">Você ainda não tem períodos acadêmicos atribuídos.</p>
+            </div>
+        `;
+        return;
+    }
+    
+    container.innerHTML = `
+        <div class="quick-actions">
+            ${periods.map(period => `
+                <div class="quick-action" onclick="selectPeriod(${period.id}, '${period.name}')">
+                    <div class="quick-action-icon">
+                        <i class="bi bi-calendar-${period.is_active ? 'check' : 'x'}"></i>
+                    </div>
+                    <div class="quick-action-title">${period.name}</div>
+                    <div class="quick-action-desc">
+                        ${formatDate(period.start_date)} - ${formatDate(period.end_date)}
+                        <br>
+                        <span class="badge badge-${period.is_active ? 'primary' : 'secondary'} mt-1">
+                            ${period.is_active ? 'Ativo' : 'Inativo'}
+                        </span>
+                    </div>
+                </div>
+            `).join('')}
+        </div>
+    `;
+}
+
+function selectPeriod(periodId, periodName) {
+    currentPeriodId = periodId;
+    document.getElementById('selectedPeriodName').textContent = periodName;
+    document.getElementById('studentSearch').value = '';
+    document.getElementById('periodsContainer').style.display = 'none';
+    document.getElementById('periodManagement').style.display = 'block';
+    
+    loadStudents();
+    loadModules();
+    abrirStreamPeriodo(periodId);
+}
+
+// Eventos do período enviados pelo servidor (SSE): as listas são recarregadas
+// quando outro usuário altera alunos ou módulos, sem recarregar a página
+let streamPeriodo = null;
+let recargasPendentes = {};
+// Stream recusado (ex.: 503 com o limite de streams do servidor atingido): o navegador
+// não reconecta sozinho, então as listas são recarregadas a cada INTERVALO_POLLING
+// e uma nova conexão é tentada com espera crescente
+const INTERVALO_POLLING = 30000;
+let pollingPeriodo = null;
+let retomadaStream = null;
+let tentativasStream = 0;
+
+function abrirStreamPeriodo(periodId) {
+    fecharStreamPeriodo();
+    conectarStreamPeriodo(periodId);
+}
+
+function conectarStreamPeriodo(periodId) {
+    const stream = new EventSource(`/api/stream/periods/${periodId}`);
+    streamPeriodo = stream;
+    stream.addEventListener('open', () => {
+        tentativasStream = 0;
+        pararPollingPeriodo();
+    });
+    stream.addEventListener('error', () => {
+        // Ainda CONNECTING: o próprio navegador tenta de novo
+        if (stream.readyState !== EventSource.CLOSED || stream !== streamPeriodo) return;
+        streamPeriodo = null;
+        iniciarPollingPeriodo();
+        const espera = Math.min(60000, 5000 * 2 ** tentativasStream++);
+        retomadaStream = setTimeout(() => {
+            if (currentPeriodId === periodId) conectarStreamPeriodo(periodId);
+        }, espera);
+    });
+    stream.addEventListener('students', () => agendarRecarga('students', () => {
+        if (!document.getElementById('studentSearch').value.trim()) loadStudents();
+    }));
+    stream.addEventListener('modules', () => agendarRecarga('modules', loadModules));
+    stream.addEventListener('grades', event => {
+        const dados = JSON.parse(event.data);
+        const modulo = modules.find(m => m.id === dados.module_id);
+        agendarRecarga('grades', () => showMessage(modulo ? `Notas atualizadas em ${modulo.name}` : 'Notas atualizadas', 'info'));
+    });
+    // O histórico do servidor não cobre o tempo desconectado: recarregar tudo
+    stream.addEventListener('reset', () => {
+        loadStudents();
+        loadModules();
+    });
+}
+
+function fecharStreamPeriodo() {
+    if (streamPeriodo) {
+        streamPeriodo.close();
+        streamPeriodo = null;
+    }
+    clearTimeout(retomadaStream);
+    pararPollingPeriodo();
+    tentativasStream = 0;
+}
+
+function iniciarPollingPeriodo() {
+    if (pollingPeriodo) return;
+    pollingPeriodo = setInterval(() => {
+        if (!document.getElementById('studentSearch').value.trim()) loadStudents();
+        loadModules();
+    }, INTERVALO_POLLING);
+}
+
+function pararPollingPeriodo() {
+    clearInterval(pollingPeriodo);
+    pollingPeriodo = null;
+}
+
+// Vários eventos seguidos (ex.: notas salvas em lote) geram uma única recarga
+function agendarRecarga(chave, recarregar) {
+    clearTimeout(recargasPendentes[chave]);
+    recargasPendentes[chave] = setTimeout(recarregar, 300);
+}
+
+function backToPeriods() {
+    fecharStreamPeriodo();
+    currentPeriodId = null;
+    document.getElementById('periodsContainer').style.display = 'block';
+    document.getElementById('periodManagement').style.display = 'none';
+}
+
+async function loadStudents() {
+    if (!currentPeriodId) return;
+    
+    try {
+        const response = await fetch(`/api/periods/${currentPeriodId}/students`);
+        students = await response.json();
+        renderStudentsTable();
+    } catch (error) {
+        console.error('Erro ao carregar estudantes:', error);
+        showMessage('Erro ao carregar estudantes', 'danger');
+    }
+}
+
+function renderStudentsTable() {
+    const tbody = document.getElementById('studentsTableBody');
+    
+    if (students.length === 0) {
+        tbody.innerHTML = `
+            <tr>
+                <td colspan="6" class="text-center py-3">
+                    <i class="bi bi-mortarboard" style="font-size: 1.5rem; color: var(--color-gray-400);"></i>
+                    <div class="mt-1">Nenhum estudante cadastrado</div>
+                </td>
+            </tr>
+        `;
+        return;
+    }
+    
+    tbody.innerHTML = students.map(student => `
+        <tr>
+            <td><strong>${student.student_number}</strong></td>
+            <td>${student.full_name}</td>
+            <td>${student.email || '-'}</td>
+            <td>${formatDate(student.enrollment_date)}</td>
+            <td>
+                <span class="badge badge-${student.medical_certificates > 3 ? 'outline' : 'secondary'}">
+                    ${student.medical_certificates}
+                </span>
+            </td>
+            <td>
+                <div class="d-flex gap-1">
+                    <button class="btn btn-sm btn-ghost" onclick="editStudent(${student.id})" title="Editar">
+                        <i class="bi bi-pencil"></i>
+                    </button>
+                    <button class="btn btn-sm btn-ghost" onclick="deleteStudent(${student.id})" title="Excluir">
+                        <i class="bi bi-trash"></i>
+                    </button>
+                </div>
+            </td>
+        </tr>
+    `).join('');
+}
+
+function showCreateStudentModal() {
+    if (!currentPeriodId) {
+        showMessage('Selecione um período primeiro', 'warning');
+        return;
+    }
+    
+    document.getElementById('studentModalTitle').textContent = 'Novo Estudante';
+    document.getElementById('studentForm').reset();
+    document.getElementById('studentId').value = '';
+    document.getElementById('enrollmentDate').value = new Date().toISOString().split('T')[0];
+    clearMessage('studentModalMessage');
+    
+    const modal = new bootstrap.Modal(document.getElementById('studentModal'));
+    modal.show();
+}
+
+async function saveStudent() {
+    const form = document.getElementById('studentForm');
+    if (!form.checkValidity()) {
+        form.reportValidity();
+        return;
+    }
+    
+    const studentId = document.getElementById('studentId').value;
+    const studentData = {
+        student_number: document.getElementById('studentNumber').value,
+        full_name: document.getElementById('studentName').value,
+        email: document.getElementById('studentEmail').value,
+        enrollment_date: document.getElementById('enrollmentDate').value,
+        medical_certificates: parseInt(document.getElementById('medicalCertificates').value) || 0,
+        referral_info: document.getElementById('referralInfo').value,
+        observations: document.getElementById('observations').value
+    };
+    
+    try {
+        const url = studentId ? 
+            `/api/coordinator/students/${studentId}` : 
+            `/api/periods/${currentPeriodId}/students`;
+        
+        const method = studentId ? 'PUT' : 'POST';
+        
+        const response = await fetch(url, {
+            method: method,
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(studentData)
+        });
+        
+        const result = await response.json();
+        
+        if (response.ok) {
+            showMessage(result.message, 'success', 'studentModalMessage');
+            setTimeout(() => {
+                const modal = bootstrap.Modal.getInstance(document.getElementById('studentModal'));
+                modal.hide();
+                loadStudents();
+            }, 1500);
+        } else {
+            showMessage(result.error, 'danger', 'studentModalMessage');
+        }
+    } catch (error) {
+        console.error('Erro ao salvar estudante:', error);
+        showMessage('Erro ao salvar estudante', 'danger', 'studentModalMessage');
+    }
+}
+
+function showMessage(message, type, elementId = 'main') {
+    const alertClass = type === 'danger' ? 'alert-danger' : type === 'warning' ? 'alert-warning' : 'alert-success';
+    const icon = type === 'danger' ? 'bi-exclamation-triangle' : type === 'warning' ? 'bi-exclamation-triangle' : 'bi-check-circle';
+    
+    const html = `
+        <div class="alert ${alertClass}">
+            <i class="bi ${icon} me-2"></i>${message}
+        </div>
+    `;
+    
+    if (elementId === 'main') {
+        const contentArea = document.querySelector('.content-area');
+        const existingAlert = contentArea.querySelector('.alert');
+        if (existingAlert) existingAlert.remove();
+        contentArea.insertAdjacentHTML('afterbegin', html);
+        
+        setTimeout(() => {
+            const alert = contentArea.querySelector('.alert');
+            if (alert) alert.remove();
+        }, 5000);
+    } else {
+        document.getElementById(elementId).innerHTML = html;
+    }
+}
+
+function clearMessage(elementId) {
+    document.getElementById(elementId).innerHTML = '';
+}
+
+function formatDate(dateString) {
+    if (!dateString) return '-';
+    return new Date(dateString).toLocaleDateString('pt-BR');
+}
+
+// Carregar módulos do período
+async function loadModules() {
+    if (!currentPeriodId) return;
+    
+    try {
+        const response = await fetch(`/api/coordinator/periods/${currentPeriodId}/modules`);
+        modules = await response.json();
+        renderModulesTable();
+    } catch (error) {
+        console.error('Erro ao carregar módulos:', error);
+        showMessage('Erro ao carregar módulos', 'danger');
+    }
+}
+
+function renderModulesTable() {
+    const tbody = document.getElementById('modulesTableBody');
+    
+    if (modules.length === 0) {
+        tbody.innerHTML = `
+            <tr>
+                <td colspan="6" class="text-center py-3">
+                    <i class="bi bi-book" style="font-size: 1.5rem; color: var(--color-gray-400);"></i>
+                    <div class="mt-1">Nenhum módulo cadastrado</div>
+                </td>
+            </tr>
+        `;
+        return;
+    }
+    
+    tbody.innerHTML = modules.map(module => `
+        <tr>
+            <td><strong>${module.code}</strong></td>
+            <td>${module.name}</td>
+            <td>${module.professor_name}</td>
+            <td>${module.credits}</td>
+            <td>${module.max_absences}</td>
+            <td>
+                <span class="badge ${module.is_active ? 'bg-success' : 'bg-secondary'}">
+                    ${module.is_active ? 'Ativo' : 'Inativo'}
+                </span>
+            </td>
+        </tr>
+    `).join('');
+}
+
+// Editar estudante
+async function editStudent(studentId) {
+    const student = students.find(s => s.id === studentId);
+    if (!student) {
+        showMessage('Estudante não encontrado', 'danger');
+        return;
+    }
+    
+    document.getElementById('studentModalTitle').textContent = 'Editar Estudante';
+    document.getElementById('studentId').value = student.id;
+    document.getElementById('studentNumber').value = student.student_number;
+    document.getElementById('studentName').value = student.full_name;
+    document.getElementById('studentEmail').value = student.email || '';
+    document.getElementById('enrollmentDate').value = student.enrollment_date;
+    document.getElementById('medicalCertificates').value = student.medical_certificates || 0;
+    document.getElementById('referralInfo').value = student.referral_info || '';
+    document.getElementById('observations').value = student.observations || '';
+    
+    clearMessage('studentModalMessage');
+    
+    const modal = new bootstrap.Modal(document.getElementById('studentModal'));
+    modal.show();
+}
+
+// Excluir estudante
+function deleteStudent(studentId) {
+    studentToDelete = studentId;
+    const modal = new bootstrap.Modal(document.getElementById('deleteModal'));
+    modal.show();
+}
+
+async function confirmDeleteStudent() {
+    if (!studentToDelete) return;
+    
+    try {
+        const response = await fetch(`/api/coordinator/students/${studentToDelete}`, {
+            method: 'DELETE'
+        });
+        
+        if (response.ok) {
+            showMessage('Estudante excluído com sucesso!', 'success');
+            bootstrap.Modal.getInstance(document.getElementById('deleteModal')).hide();
+            loadStudents();
+        } else {
+            const result = await response.json();
+            showMessage(result.error || 'Erro ao excluir estudante', 'danger');
+        }
+    } catch (error) {
+        console.error('Erro ao excluir estudante:', error);
+        showMessage('Erro ao excluir estudante', 'danger');
+    }
+    
+    studentToDelete = null;
+}
+
+// Navegar para a página de gerenciamento de módulos
+function goToModules() {
+    if (currentPeriodId) {
+        window.location.href = `/coordinator/period/${currentPeriodId}/modules`;
+    }
+}
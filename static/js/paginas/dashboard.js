@@ -0,0 +1,50 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Simulate loading recent activity
+    setTimeout(() => {
+        const activityElement = document.getElementById('recentActivity');
+        if (activityElement) {
+            const activities = [
+                { icon: 'bi-box-arrow-in-right', text: 'Login realizado com sucesso', time: 'Agora' },
+                { icon: 'bi-eye', text: 'Dashboard acessado', time: 'Há 1 minuto' },
+                { icon: 'bi-shield-check', text: 'Sistema inicializado', time: 'Há 5 minutos' }
+            ];
+            
+            let html = '<div class="activity-list">';
+            activities.forEach(activity => {
+                html += `
+                    <div class="activity-item" style="display: flex; align-items: center; gap: 0.75rem; padding: 0.75rem 0; border-bottom: 1px solid var(--color-gray-100);">
+                        <i class="bi ${activity.icon}" style="color: var(--color-gray-500);"></i>
+                        <div style="flex: 1;">
+                            <div style="font-size: 0.875rem; color: var(--color-gray-900);">${activity.text}</div>
+                            <div style="font-size: 0.75rem; color: var(--color-gray-500);">${activity.time}</div>
+                        </div>
+                    </div>
+                `;
+            });
+            html += '</div>';
+            
+            activityElement.innerHTML = html;
+        }
+    }, 1000);
+});
+
+// Quick action functions
+function showSystemInfo() {
+    alert('Funcionalidade de informações do sistema será implementada em breve!');
+}
+
+function showAddStudentModal() {
+    alert('Funcionalidade de adição de estudante será implementada em breve!');
+}
+
+function showReports() {
+    alert('Funcionalidade de relatórios será implementada em breve!');
+}
+
+function showGradeEntry() {
+    alert('Acesse "Meus Módulos" para lançar notas!');
+}
+
+function showAttendance() {
+    alert('Acesse "Meus Módulos" para registrar faltas!');
+}
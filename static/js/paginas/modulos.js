@@ -0,0 +1,386 @@
+let deleteMode = false;
+let currentModuleId = null;
+let alunoIdAtual = null;
+let moduleIdAtual = null;
+
+document.addEventListener('DOMContentLoaded', function() {
+    carregarModulosPage();
+});
+
+// Carregar módulos na página
+async function carregarModulosPage() {
+    try {
+        document.getElementById('loadingModules').style.display = 'block';
+        document.getElementById('modulesList').innerHTML = '';
+        
+        const response = await fetch('/api/modulos');
+        const modules = await response.json();
+        
+        document.getElementById('loadingModules').style.display = 'none';
+        
+        const modulesList = document.getElementById('modulesList');
+        
+        if (modules.length === 0) {
+            modulesList.innerHTML = `
+                <div class="col-12">
+                    <div class="text-center py-5">
+                        <i class="bi bi-folder display-1 text-muted mb-3"></i>
+                        <h4 class="text-muted">Nenhum módulo criado</h4>
+                        <p class="text-muted">Comece criando seu primeiro módulo de ensino.</p>
+                    </div>
+                </div>
+            `;
+            return;
+        }
+        
+        let html = '';
+        modules.forEach((module, index) => {
+            html += `
+                <div class="col-lg-4 col-md-6 mb-3">
+                    <div class="card h-100 module-card" data-module-id="${module.id}">
+                        <div class="card-body">
+                            <div class="d-flex justify-content-between align-items-start mb-2">
+                                <h6 class="card-title mb-0">
+                                    <i class="bi bi-folder-fill text-primary me-2"></i>
+                                    ${module.name}
+                                </h6>
+                                <div class="module-actions">
+                                    ${deleteMode ? `
+                                        <button class="btn btn-outline-danger btn-sm" onclick="confirmarExclusaoModulo('${module.name}')">
+                                            <i class="bi bi-trash"></i>
+                                        </button>
+                                    ` : ''}
+                                </div>
+                            </div>
+                            <p class="card-text text-muted">ID: ${module.id}</p>
+                            <div class="d-grid">
+                                <button onclick="verAlunosDoModuloPage(${module.id}, '${module.name}')" 
+                                        class="btn btn-primary btn-sm">
+                                    <i class="bi bi-people me-1"></i>Ver Alunos
+                                </button>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            `;
+        });
+        
+        modulesList.innerHTML = html;
+        
+        // Adicionar animação aos cards
+        setTimeout(() => {
+            const cards = modulesList.querySelectorAll('.module-card');
+            cards.forEach((card, index) => {
+                setTimeout(() => {
+                    card.classList.add('fade-in');
+                }, index * 100);
+            });
+        }, 100);
+        
+    } catch (error) {
+        console.error('Erro ao carregar módulos:', error);
+        document.getElementById('loadingModules').style.display = 'none';
+        showMessage('mensagemModulos', 'Erro ao carregar módulos', 'danger');
+    }
+}
+
+// Criar módulo na página
+async function criarModuloPage() {
+    const nome = document.getElementById('nomeModuloPage').value.trim();
+    
+    if (!nome) {
+        showMessage('mensagemCriarModulo', 'Por favor, informe o nome do módulo.', 'warning');
+        return;
+    }
+    
+    try {
+        const response = await fetch('/criar_modulo', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ nome })
+        });
+        
+        const result = await response.json();
+        
+        if (result.error) {
+            showMessage('mensagemCriarModulo', result.error, 'danger');
+        } else {
+            showMessage('mensagemCriarModulo', result.message, 'success');
+            document.getElementById('nomeModuloPage').value = '';
+            carregarModulosPage(); // Recarregar lista
+        }
+    } catch (error) {
+        console.error('Erro ao criar módulo:', error);
+        showMessage('mensagemCriarModulo', 'Erro ao criar módulo', 'danger');
+    }
+}
+
+// Ver alunos do módulo
+async function verAlunosDoModuloPage(moduleId, moduleName) {
+    currentModuleId = moduleId;
+    moduleIdAtual = moduleId;
+    
+    try {
+        const response = await fetch(`/ver_alunos_modulo/${moduleId}`);
+        const result = await response.json();
+        
+        document.getElementById('moduleNameTitle').textContent = `Alunos do Módulo: ${moduleName}`;
+        
+        const studentsContainer = document.getElementById('studentsInModuleList');
+        
+        if (result.error) {
+            studentsContainer.innerHTML = `
+                <div class="alert alert-info">
+                    <i class="bi bi-info-circle me-2"></i>
+                    ${result.error}
+                </div>
+            `;
+        } else {
+            let html = `
+                <div class="table-responsive">
+                    <table class="table table-hover">
+                        <thead>
+                            <tr>
+                                <th><i class="bi bi-person me-1"></i>Nome</th>
+                                <th><i class="bi bi-card-text me-1"></i>Matrícula</th>
+                                <th><i class="bi bi-calendar-x me-1"></i>Faltas</th>
+                                <th><i class="bi bi-trophy me-1"></i>Nota Final</th>
+                                <th>Status</th>
+                                <th class="text-center">Ações</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+            `;
+            
+            result.forEach(aluno => {
+                const statusClass = aluno.nota_final >= 7 ? 'success' : aluno.nota_final >= 5 ? 'warning' : 'danger';
+                const statusText = aluno.nota_final >= 7 ? 'Aprovado' : aluno.nota_final >= 5 ? 'Recuperação' : 'Reprovado';
+                const statusIcon = aluno.nota_final >= 7 ? 'check-circle' : aluno.nota_final >= 5 ? 'exclamation-triangle' : 'x-circle';
+                
+                html += `
+                    <tr>
+                        <td><strong>${aluno.nome}</strong></td>
+                        <td><span class="badge bg-primary">${aluno.numero_matricula}</span></td>
+                        <td><span class="badge bg-secondary">${aluno.faltas}</span></td>
+                        <td><span class="badge bg-${statusClass}">${aluno.nota_final.toFixed(1)}</span></td>
+                        <td>
+                            <span class="badge bg-${statusClass}">
+                                <i class="bi bi-${statusIcon} me-1"></i>${statusText}
+                            </span>
+                        </td>
+                        <td class="text-center">
+                            <button onclick="carregarDetalhesAlunoPage(${aluno.id}, ${moduleId})" 
+                                    class="btn btn-outline-primary btn-sm"
+                                    data-bs-toggle="tooltip" 
+                                    title="Ver/Editar detalhes">
+                                <i class="bi bi-eye"></i>
+                            </button>
+                        </td>
+                    </tr>
+                `;
+            });
+            
+            html += '</tbody></table></div>';
+            studentsContainer.innerHTML = html;
+            
+            // Inicializar tooltips
+            var tooltipTriggerList = [].slice.call(document.querySelectorAll('[data-bs-toggle="tooltip"]'));
+            var tooltipList = tooltipTriggerList.map(function (tooltipTriggerEl) {
+                return new bootstrap.Tooltip(tooltipTriggerEl);
+            });
+        }
+        
+        document.getElementById('studentsInModuleSection').style.display = 'block';
+        document.getElementById('studentsInModuleSection').scrollIntoView({ behavior: 'smooth' });
+        
+    } catch (error) {
+        console.error('Erro ao carregar alunos do módulo:', error);
+        showMessage('mensagemModulos', 'Erro ao carregar alunos do módulo', 'danger');
+    }
+}
+
+// Carregar detalhes do aluno
+async function carregarDetalhesAlunoPage(alunoId, moduleId) {
+    alunoIdAtual = alunoId;
+    moduleIdAtual = moduleId;
+    
+    try {
+        const response = await fetch(`/obter_dados_modulo_aluno/${alunoId}/${moduleId}`);
+        const data = await response.json();
+        
+        if (data.error) {
+            alert(data.error);
+            return;
+        }
+        
+        // Atualizar informações na interface
+        document.getElementById('detalhesNome').textContent = data.nome;
+        document.getElementById('detalhesMatricula').textContent = data.numero_matricula;
+        document.getElementById('detalhesFaltas').textContent = data.faltas;
+        document.getElementById('detalhesNotaTutor').textContent = data.nota_tutor.toFixed(1);
+        document.getElementById('detalhesNotaAvaliacaoRegular').textContent = data.nota_avaliacao_regular.toFixed(1);
+        document.getElementById('detalhesNotaRecuperacao').textContent = data.nota_recuperacao.toFixed(1);
+        document.getElementById('detalhesNotaFinal').textContent = data.nota_final.toFixed(1);
+        
+        // Atualizar cores dos badges baseado nas notas
+        updateBadgeColors();
+        
+        // Mostrar seção de detalhes
+        document.getElementById('studentDetailsSection').style.display = 'block';
+        document.getElementById('studentDetailsSection').scrollIntoView({ behavior: 'smooth' });
+        showStudentTab('view-info');
+        
+    } catch (error) {
+        console.error('Erro ao carregar detalhes do aluno:', error);
+        showMessage('mensagemModulos', 'Erro ao carregar detalhes do aluno', 'danger');
+    }
+}
+
+// Atualizar cores dos badges
+function updateBadgeColors() {
+    const badges = ['detalhesNotaTutor', 'detalhesNotaAvaliacaoRegular', 'detalhesNotaRecuperacao', 'detalhesNotaFinal'];
+    
+    badges.forEach(badgeId => {
+        const badge = document.getElementById(badgeId);
+        const nota = parseFloat(badge.textContent);
+        
+        badge.className = 'badge';
+        if (nota >= 7) {
+            badge.classList.add('bg-success');
+        } else if (nota >= 5) {
+            badge.classList.add('bg-warning');
+        } else {
+            badge.classList.add('bg-danger');
+        }
+    });
+}
+
+// Alternar abas do aluno
+function showStudentTab(tabId) {
+    const tabs = document.querySelectorAll('.student-tab-content');
+    const navLinks = document.querySelectorAll('.nav-tabs .nav-link');
+    
+    tabs.forEach(tab => tab.style.display = 'none');
+    navLinks.forEach(link => link.classList.remove('active'));
+    
+    document.getElementById(tabId).style.display = 'block';
+    event.target.classList.add('active');
+}
+
+// Salvar edição de notas
+async function salvarEdicaoNotas() {
+    const dados = {};
+    
+    // Obter valores dos campos
+    const campos = [
+        { id: 'editFaltas', key: 'faltas', type: 'int' },
+        { id: 'editNotaTutor', key: 'nota_tutor', type: 'float' },
+        { id: 'editNotaAvaliacaoRegular', key: 'nota_avaliacao_regular', type: 'float' },
+        { id: 'editNotaRecuperacao', key: 'nota_recuperacao', type: 'float' },
+        { id: 'editNotaFinal', key: 'nota_final', type: 'float' }
+    ];
+    
+    campos.forEach(campo => {
+        const element = document.getElementById(campo.id);
+        if (element && element.value.trim() !== '') {
+            if (campo.type === 'int') {
+                dados[campo.key] = parseInt(element.value) || 0;
+            } else {
+                dados[campo.key] = parseFloat(element.value) || 0;
+            }
+        }
+    });
+    
+    if (Object.keys(dados).length === 0) {
+        showMessage('mensagemEditarNotas', 'Por favor, preencha pelo menos um campo para atualizar.', 'warning');
+        return;
+    }
+    
+    try {
+        const response = await fetch(`/editar_informacoes_modulo/${alunoIdAtual}/${moduleIdAtual}`, {
+            method: 'PUT',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(dados)
+        });
+        
+        const result = await response.json();
+        
+        if (result.error) {
+            showMessage('mensagemEditarNotas', result.error, 'danger');
+        } else {
+            showMessage('mensagemEditarNotas', result.message, 'success');
+            // Recarregar detalhes
+            await carregarDetalhesAlunoPage(alunoIdAtual, moduleIdAtual);
+            showStudentTab('view-info');
+            // Limpar campos de edição
+            campos.forEach(campo => {
+                const element = document.getElementById(campo.id);
+                if (element) element.value = '';
+            });
+            // Recarregar lista de alunos do módulo
+            verAlunosDoModuloPage(currentModuleId, document.getElementById('moduleNameTitle').textContent.split(': ')[1]);
+        }
+    } catch (error) {
+        console.error('Erro ao salvar edição:', error);
+        showMessage('mensagemEditarNotas', 'Erro ao salvar alterações', 'danger');
+    }
+}
+
+// Toggle modo de exclusão
+function toggleDeleteMode() {
+    deleteMode = !deleteMode;
+    const btn = document.getElementById('deleteToggleBtn');
+    
+    if (deleteMode) {
+        btn.innerHTML = '<i class="bi bi-x-circle me-1"></i>Cancelar';
+        btn.className = 'btn btn-secondary btn-sm';
+    } else {
+        btn.innerHTML = '<i class="bi bi-trash me-1"></i>Modo Exclusão';
+        btn.className = 'btn btn-outline-danger btn-sm';
+    }
+    
+    carregarModulosPage(); // Recarregar para mostrar/ocultar botões de exclusão
+}
+
+// Confirmar exclusão de módulo
+function confirmarExclusaoModulo(nomeModulo) {
+    if (confirm(`Tem certeza que deseja excluir o módulo "${nomeModulo}"?\n\nEsta ação não pode ser desfeita e todos os dados associados serão perdidos.`)) {
+        excluirModuloPage(nomeModulo);
+    }
+}
+
+// Excluir módulo
+async function excluirModuloPage(nomeModulo) {
+    try {
+        const response = await fetch('/excluir_modulo', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ nome: nomeModulo })
+        });
+        
+        const result = await response.json();
+        
+        if (result.error) {
+            showMessage('mensagemModulos', result.error, 'danger');
+        } else {
+            showMessage('mensagemModulos', result.message, 'success');
+            carregarModulosPage(); // Recarregar lista
+            hideStudentsSection(); // Esconder seção de alunos se estiver visível
+        }
+    } catch (error) {
+        console.error('Erro ao excluir módulo:', error);
+        showMessage('mensagemModulos', 'Erro ao excluir módulo', 'danger');
+    }
+}
+
+// Esconder seção de alunos
+function hideStudentsSection() {
+    document.getElementById('studentsInModuleSection').style.display = 'none';
+    document.getElementById('studentDetailsSection').style.display = 'none';
+}
@@ -0,0 +1,293 @@
+let editingStudentId = null;
+
+// Carregar dados ao iniciar a página
+document.addEventListener('DOMContentLoaded', function() {
+    loadStudents();
+    loadPeriods();
+    configurarBuscaAlunos(document.getElementById('studentSearch'), () => ({}), alunos => {
+        if (alunos === null) {
+            loadStudents();
+        } else {
+            renderStudents(alunos);
+        }
+    });
+});
+
+// Carregar lista de alunos
+function loadStudents() {
+    console.log('Carregando lista de alunos...');
+    fetch('/api/professor/students')
+        .then(response => response.json())
+        .then(data => {
+            console.log('Dados dos alunos recebidos:', data);
+            renderStudents(data);
+        })
+        .catch(error => {
+            console.error('Erro ao carregar alunos:', error);
+            showAlert('Erro ao carregar alunos', 'danger');
+        });
+}
+
+function renderStudents(data) {
+    const tbody = document.querySelector('#studentsTable tbody');
+    tbody.innerHTML = '';
+    
+    data.forEach(student => {
+        const row = document.createElement('tr');
+        row.innerHTML = `
+            <td>${student.student_number}</td>
+            <td>${student.full_name}</td>
+            <td>${student.email || '-'}</td>
+            <td>${student.period_name}</td>
+            <td>${formatDate(student.enrollment_date)}</td>
+            <td>${student.medical_certificates}</td>
+            <td>
+                <span class="badge bg-warning" id="absences-${student.id}">0</span>
+                <button class="btn btn-sm btn-outline-secondary ms-1" onclick="updateAbsences(${student.id})">
+                    <i class="fas fa-calendar-minus"></i>
+                </button>
+            </td>
+            <td>${student.observations || '-'}</td>
+            <td>
+                <button class="btn btn-sm btn-outline-primary" onclick="editStudent(${student.id})" title="Editar aluno">
+                    <i class="fas fa-edit"></i> Editar
+                </button>
+                <button class="btn btn-sm btn-outline-info ms-1" onclick="viewStudentDetails(${student.id})" title="Ver detalhes">
+                    <i class="fas fa-eye"></i>
+                </button>
+            </td>
+        `;
+        tbody.appendChild(row);
+        
+        // Carregar faltas do aluno
+        loadStudentAbsences(student.id);
+    });
+}
+
+// Carregar faltas de um aluno específico
+function loadStudentAbsences(studentId) {
+    fetch(`/api/professor/students/${studentId}/absences`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.absences !== undefined) {
+                document.getElementById(`absences-${studentId}`).textContent = data.absences;
+            }
+        })
+        .catch(error => {
+            console.error('Erro ao carregar faltas:', error);
+        });
+}
+
+// Carregar períodos disponíveis
+function loadPeriods() {
+    console.log('Carregando períodos disponíveis...');
+    fetch('/api/professor/periods')
+        .then(response => response.json())
+        .then(data => {
+            console.log('Períodos recebidos:', data);
+            const select = document.getElementById('academicPeriodId');
+            select.innerHTML = '<option value="">Selecione um período</option>';
+            
+            data.forEach(period => {
+                const option = document.createElement('option');
+                option.value = period.id;
+                option.textContent = period.name;
+                select.appendChild(option);
+            });
+        })
+        .catch(error => {
+            console.error('Erro ao carregar períodos:', error);
+        });
+}
+
+// Mostrar modal para adicionar aluno
+function showAddStudentModal() {
+    editingStudentId = null;
+    document.getElementById('studentModalTitle').textContent = 'Adicionar Novo Aluno';
+    document.getElementById('studentForm').reset();
+    document.getElementById('studentId').value = '';
+}
+
+// Editar aluno
+function editStudent(studentId) {
+    console.log('Função editStudent chamada para aluno ID:', studentId);
+    editingStudentId = studentId;
+    document.getElementById('studentModalTitle').textContent = 'Editar Aluno';
+    
+    // Buscar dados do aluno
+    fetch(`/api/professor/students/${studentId}`)
+        .then(response => response.json())
+        .then(student => {
+            document.getElementById('studentId').value = student.id;
+            document.getElementById('studentNumber').value = student.student_number;
+            document.getElementById('fullName').value = student.full_name;
+            document.getElementById('email').value = student.email || '';
+            document.getElementById('academicPeriodId').value = student.academic_period_id;
+            document.getElementById('enrollmentDate').value = student.enrollment_date;
+            document.getElementById('medicalCertificates').value = student.medical_certificates;
+            document.getElementById('referralInfo').value = student.referral_info || '';
+            document.getElementById('observations').value = student.observations || '';
+            
+            // Abrir modal
+            const modal = new bootstrap.Modal(document.getElementById('addStudentModal'));
+            modal.show();
+        })
+        .catch(error => {
+            console.error('Erro ao carregar dados do aluno:', error);
+            showAlert('Erro ao carregar dados do aluno', 'danger');
+        });
+}
+
+// Salvar aluno (adicionar ou editar)
+function saveStudent() {
+    console.log('Iniciando salvamento de aluno...');
+    const formData = {
+        student_number: document.getElementById('studentNumber').value,
+        full_name: document.getElementById('fullName').value,
+        email: document.getElementById('email').value,
+        academic_period_id: parseInt(document.getElementById('academicPeriodId').value),
+        enrollment_date: document.getElementById('enrollmentDate').value,
+        medical_certificates: parseInt(document.getElementById('medicalCertificates').value),
+        referral_info: document.getElementById('referralInfo').value,
+        observations: document.getElementById('observations').value
+    };
+
+    console.log('Dados do formulário:', formData);
+
+    // Validação
+    if (!formData.student_number || !formData.full_name || !formData.academic_period_id || !formData.enrollment_date) {
+        console.log('Validação falhou - campos obrigatórios faltando');
+        showAlert('Por favor, preencha todos os campos obrigatórios', 'warning');
+        return;
+    }
+
+    const url = editingStudentId ? 
+        `/api/professor/students/${editingStudentId}` : 
+        '/api/professor/students';
+    
+    const method = editingStudentId ? 'PUT' : 'POST';
+
+    console.log('Enviando requisição:', method, url);
+    console.log('Payload:', JSON.stringify(formData));
+
+    fetch(url, {
+        method: method,
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(formData)
+    })
+    .then(response => {
+        console.log('Resposta recebida:', response.status, response.statusText);
+        return response.json().then(data => {
+            console.log('Dados da resposta:', data);
+            if (response.ok) {
+                console.log('Sucesso no salvamento!');
+                showAlert(data.message, 'success');
+                document.getElementById('studentForm').reset();
+                bootstrap.Modal.getInstance(document.getElementById('addStudentModal')).hide();
+                loadStudents();
+            } else {
+                console.log('Erro no salvamento:', data.error);
+                showAlert(data.error, 'danger');
+            }
+        });
+    })
+    .catch(error => {
+        console.error('Erro ao salvar aluno:', error);
+        showAlert('Erro ao salvar aluno', 'danger');
+    });
+}
+
+// Função para formatar data
+function formatDate(dateString) {
+    if (!dateString) return '-';
+    const date = new Date(dateString);
+    return date.toLocaleDateString('pt-BR');
+}
+
+// Função para mostrar alertas
+function showAlert(message, type) {
+    const alertDiv = document.createElement('div');
+    alertDiv.className = `alert alert-${type} alert-dismissible fade show`;
+    alertDiv.innerHTML = `
+        ${message}
+        <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+    `;
+    
+    const container = document.querySelector('.container');
+    container.insertBefore(alertDiv, container.firstChild);
+    
+    // Auto-remover após 5 segundos
+    setTimeout(() => {
+        if (alertDiv.parentNode) {
+            alertDiv.remove();
+        }
+    }, 5000);
+}
+
+// Função para atualizar faltas
+function updateAbsences(studentId) {
+    const currentAbsences = parseInt(document.getElementById(`absences-${studentId}`).textContent);
+    const newAbsences = prompt(`Atualizar faltas para o aluno (atual: ${currentAbsences}):`, currentAbsences);
+    
+    if (newAbsences !== null && !isNaN(newAbsences)) {
+        const absences = parseInt(newAbsences);
+        
+        fetch(`/api/professor/students/${studentId}/absences`, {
+            method: 'PUT',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ absences: absences })
+        })
+        .then(response => {
+            return response.json().then(data => {
+                if (response.ok) {
+                    showAlert(data.message, 'success');
+                    document.getElementById(`absences-${studentId}`).textContent = absences;
+                } else {
+                    showAlert(data.error, 'danger');
+                }
+            });
+        })
+        .catch(error => {
+            console.error('Erro ao atualizar faltas:', error);
+            showAlert('Erro ao atualizar faltas', 'danger');
+        });
+    }
+}
+
+// Função para visualizar detalhes do aluno
+function viewStudentDetails(studentId) {
+    console.log('Visualizando detalhes do aluno ID:', studentId);
+    
+    fetch(`/api/professor/students/${studentId}`)
+        .then(response => response.json())
+        .then(student => {
+            const details = `
+                <strong>Detalhes do Aluno:</strong><br>
+                <strong>Matrícula:</strong> ${student.student_number}<br>
+                <strong>Nome:</strong> ${student.full_name}<br>
+                <strong>Email:</strong> ${student.email || 'Não informado'}<br>
+                <strong>Período:</strong> ${student.period_name}<br>
+                <strong>Data de Matrícula:</strong> ${formatDate(student.enrollment_date)}<br>
+                <strong>Certificados Médicos:</strong> ${student.medical_certificates}<br>
+                <strong>Informações de Encaminhamento:</strong> ${student.referral_info || 'Não informado'}<br>
+                <strong>Observações:</strong> ${student.observations || 'Não informado'}
+            `;
+            
+            showAlert(details, 'info');
+        })
+        .catch(error => {
+            console.error('Erro ao carregar detalhes do aluno:', error);
+            showAlert('Erro ao carregar detalhes do aluno', 'danger');
+        });
+}
+
+// Event listener para o modal
+document.getElementById('addStudentModal').addEventListener('show.bs.modal', function (event) {
+    if (!editingStudentId) {
+        showAddStudentModal();
+    }
+});
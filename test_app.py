@@ -0,0 +1,949 @@
+#!/usr/bin/env python3
+"""
+Testes da aplicação usando o cliente de teste do Flask em um banco temporário
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import re
+import shutil
+import zipfile
+from xml.etree import ElementTree
+
+import brotli
+import pytest
+
+import app as aplicacao
+from gerar_estaticos import gerar_estaticos, minificar_js
+
+
+@pytest.fixture(scope='module')
+def cliente(tmp_path_factory):
+    caminho = tmp_path_factory.mktemp('bd') / 'alunos.db'
+    aplicacao.app.config['DATABASE'] = str(caminho)
+    aplicacao.app.config['SLOW_QUERY_LOG'] = str(caminho.parent / 'slow_queries.log')
+    aplicacao.app.config['TESTING'] = True
+    aplicacao.inicializar_bd()
+    yield aplicacao.app.test_client()
+    aplicacao.verificador_senhas.fechar()
+    aplicacao.obter_pool().fechar()
+    aplicacao.app.extensions.pop('pool_bd', None)
+
+
+def login(cliente, username, password):
+    cliente.get('/logout')
+    return cliente.post('/login', data={'username': username, 'password': password})
+
+
+def test_pool_separa_leitura_e_escrita(cliente):
+    with aplicacao.app.test_request_context('/api/modulos', method='GET'):
+        leitura = aplicacao.conectar_bd()
+        assert leitura.somente_leitura
+        assert leitura.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        with pytest.raises(aplicacao.sqlite3.OperationalError):
+            leitura.execute("UPDATE Users SET full_name = full_name")
+    # O teardown devolveu a conexão ao pool sem que a rota chamasse close()
+    assert leitura.emprestimos == 0
+
+    with aplicacao.app.test_request_context('/criar_modulo', method='POST'):
+        escrita = aplicacao.conectar_bd()
+        assert not escrita.somente_leitura
+        escrita.close()
+        assert aplicacao.conectar_bd() is escrita
+
+
+def test_leitura_nao_abre_conexao_de_escrita(tmp_path):
+    pool = aplicacao.PoolConexoes(str(tmp_path / 'novo.db'), 2)
+    try:
+        conn = pool.leitura()
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        pool.devolver(conn)
+        assert pool._escrita is None and pool._escritor._fd is None
+
+        pool.escrita().close()
+        assert pool._escrita is not None and pool._escritor._fd is not None
+    finally:
+        pool.fechar()
+
+
+def test_rotas_de_leitura_usam_pool(cliente):
+    login(cliente, 'prof1', 'prof123')
+    resposta = cliente.get('/api/modulos')
+    assert resposta.status_code == 200
+    modulos = resposta.get_json()
+    assert modulos and all('student_count' in m for m in modulos)
+
+    resposta = cliente.get(f"/api/modules/{modulos[0]['id']}/students")
+    assert resposta.status_code == 200
+    assert len(resposta.get_json()) == 5
+
+
+def test_pool_esgotado_responde_503(cliente, monkeypatch):
+    pool = aplicacao.PoolConexoes(aplicacao.app.config['DATABASE'], 1, espera_leitura=0.05)
+    conn = pool.leitura()
+    with pytest.raises(aplicacao.PoolEsgotado):
+        pool.leitura()
+    pool.devolver(conn)
+    pool.fechar()
+
+    login(cliente, 'prof1', 'prof123')
+    pool = aplicacao.obter_pool()
+    monkeypatch.setattr(pool, 'espera_leitura', 0.05)
+    emprestadas = [pool.leitura() for _ in range(pool.tamanho_leitura)]
+    try:
+        resposta = cliente.get('/api/modulos')
+        assert resposta.status_code == 503 and resposta.headers['Retry-After'] == '1'
+    finally:
+        for conn in emprestadas:
+            pool.devolver(conn)
+
+
+def test_criar_modulo_matricula_alunos_do_periodo(cliente):
+    login(cliente, 'prof1', 'prof123')
+    resposta = cliente.post('/criar_modulo', json={'nome': 'Geografia'})
+    assert resposta.status_code == 200
+    dados = resposta.get_json()
+    assert dados['enrollments_created'] == 5
+
+    conn = aplicacao.conectar_bd()
+    notas = conn.execute('''
+        SELECT COUNT(*) FROM Grades g JOIN Enrollments e ON g.enrollment_id = e.id
+        WHERE e.module_id = ?
+    ''', (dados['module_id'],)).fetchone()[0]
+    conn.close()
+    assert notas == 5
+
+
+def test_professor_cria_aluno_matriculado_nos_seus_modulos(cliente):
+    login(cliente, 'prof2', 'prof123')
+    resposta = cliente.post('/api/professor/students', json={
+        'student_number': '20249001', 'full_name': 'Aluno Novo',
+        'academic_period_id': 1, 'enrollment_date': '2024-02-01',
+    })
+    assert resposta.status_code == 201
+    assert resposta.get_json()['enrollments_created'] == 2
+
+
+def test_student_count_mantido_pelos_triggers(cliente):
+    login(cliente, 'admin', 'admin123')
+    modulos = cliente.get('/api/modulos').get_json()
+    conn = aplicacao.conectar_bd()
+    for modulo in modulos:
+        total = conn.execute('SELECT COUNT(*) FROM Enrollments WHERE module_id = ?', (modulo['id'],)).fetchone()[0]
+        assert modulo['student_count'] == total
+    conn.close()
+    assert {m['code']: m['student_count'] for m in modulos}['POR101'] == 6
+
+
+def test_migracoes_em_banco_anterior(tmp_path):
+    # alunos.db do repositório é anterior às migrações e tem notas duplicadas
+    caminho = tmp_path / 'legado.db'
+    shutil.copy(os.path.join(os.path.dirname(__file__), 'alunos.db'), caminho)
+    conn = aplicacao.sqlite3.connect(caminho)
+    conn.row_factory = aplicacao.sqlite3.Row
+
+    versao = aplicacao.aplicar_migracoes(conn)
+    assert versao == len(aplicacao.MIGRACOES)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == versao
+    assert aplicacao.aplicar_migracoes(conn) == versao
+
+    indices = {linha['name'] for linha in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {'idx_modules_professor', 'idx_enrollments_module', 'ux_grades_enrollment'} <= indices
+    duplicadas = conn.execute('SELECT COUNT(*) - COUNT(DISTINCT enrollment_id) FROM Grades').fetchone()[0]
+    assert duplicadas == 0
+    conn.close()
+
+
+def test_dashboard_cacheado_e_invalidado_por_escrita(cliente):
+    login(cliente, 'prof1', 'prof123')
+    estatisticas = aplicacao.cache_dashboard.estatisticas
+    cliente.get('/')
+    antes = estatisticas()
+    assert cliente.get('/').status_code == 200
+    depois = estatisticas()
+    assert depois['hits'] == antes['hits'] + 1
+    assert depois['misses'] == antes['misses']
+
+    matricula = cliente.get('/api/modules/1/students').get_json()[0]['enrollment_id']
+
+    def lancar(final):
+        return cliente.put(f'/api/grades/{matricula}', json={
+            'tutor_grade': final, 'regular_exam_grade': final, 'makeup_exam_grade': 0,
+            'final_grade': final, 'absences': 0,
+        })
+
+    assert lancar(0).status_code == 200
+    aprovados = aplicacao.calcular_estatisticas('professor', 3)['approved_students']
+    misses = estatisticas()['misses']
+    assert lancar(9).status_code == 200
+    assert aplicacao.calcular_estatisticas('professor', 3)['approved_students'] == aprovados + 1
+    assert estatisticas()['misses'] == misses + 1
+
+    # Escrita de outro worker (sem registrar_escrita neste processo): TableVersions invalida a entrada
+    alunos = aplicacao.calcular_estatisticas('professor', 3)['my_students']
+    conn = aplicacao.sqlite3.connect(aplicacao.app.config['DATABASE'])
+    for delta in (1, -1):
+        conn.execute('UPDATE Modules SET student_count = student_count + ? WHERE id = (SELECT MIN(id) FROM Modules WHERE professor_id = 3)', (delta,))
+        conn.commit()
+        assert aplicacao.calcular_estatisticas('professor', 3)['my_students'] == alunos + max(delta, 0)
+    conn.close()
+    assert estatisticas()['misses'] == misses + 3
+
+
+def test_paginacao_keyset_e_streaming(cliente):
+    login(cliente, 'prof1', 'prof123')
+    completa = cliente.get('/api/modules/1/students').get_json()
+    assert [a['full_name'] for a in completa] == sorted(a['full_name'] for a in completa)
+
+    paginas, after = [], None
+    while True:
+        url = '/api/modules/1/students?limit=2' + (f'&after={after}' if after else '')
+        resposta = cliente.get(url)
+        paginas.extend(resposta.get_json())
+        after = resposta.headers.get('X-Next-Cursor')
+        if not after:
+            break
+    assert [a['id'] for a in paginas] == [a['id'] for a in completa]
+
+    resposta = cliente.get('/api/modules/1/students?stream=1')
+    assert aplicacao.json.loads(resposta.get_data()) == completa
+
+    # Em streaming com limit o cursor da próxima página também vem no header
+    paginas, after = [], None
+    while True:
+        url = '/api/modules/1/students?stream=1&limit=2' + (f'&after={after}' if after else '')
+        resposta = cliente.get(url)
+        pagina = aplicacao.json.loads(resposta.get_data())
+        assert len(pagina) <= 2
+        paginas.extend(pagina)
+        after = resposta.headers.get('X-Next-Cursor')
+        if not after:
+            break
+    assert [a['id'] for a in paginas] == [a['id'] for a in completa]
+    assert cliente.get('/api/modules/1/students?after=xyz').status_code == 400
+    for limite in ('abc', '0', '-1', '2.5', ''):
+        assert cliente.get(f'/api/modules/1/students?limit={limite}').status_code == 400
+    # Cursor vem do cliente: só listas de escalares do tamanho da chave
+    for valores in ([{'a': 1}, 1], [[1], 1], ['Ana'], ['Ana', 1, 2]):
+        after = aplicacao.codificar_cursor(valores)
+        assert cliente.get(f'/api/modules/1/students?after={after}').status_code == 400
+
+    modulos = cliente.get('/api/modulos?limit=1')
+    seguinte = cliente.get(f"/api/modulos?limit=1&after={modulos.headers['X-Next-Cursor']}").get_json()
+    assert seguinte[0]['id'] != modulos.get_json()[0]['id']
+
+
+def test_salvar_notas_do_modulo_em_lote(cliente):
+    login(cliente, 'prof1', 'prof123')
+    alunos = cliente.get('/api/modules/1/students').get_json()
+    linhas = [{'enrollment_id': a['enrollment_id'], 'tutor_grade': 8, 'regular_exam_grade': 7.5,
+               'makeup_exam_grade': 0, 'final_grade': 7.5, 'absences': 2} for a in alunos]
+    linhas.append({'enrollment_id': 999999, 'tutor_grade': 1, 'regular_exam_grade': 1,
+                   'makeup_exam_grade': 1, 'final_grade': 1, 'absences': 0})
+    linhas.append({'enrollment_id': alunos[0]['enrollment_id'], 'tutor_grade': 'x'})
+
+    resposta = cliente.put('/api/modules/1/grades', json=linhas)
+    assert resposta.status_code == 200
+    dados = resposta.get_json()
+    assert dados['saved'] == len(alunos)
+    assert [r['status'] for r in dados['results']] == ['ok'] * len(alunos) + ['error', 'error']
+    assert {r['final_grade'] for r in dados['results'] if r['status'] == 'ok'} == {7.5}
+    assert {a['final_grade'] for a in cliente.get('/api/modules/1/students').get_json()} == {7.5}
+
+    assert cliente.put('/api/modules/2/grades', json=linhas).status_code == 403
+
+    for invalido in ([1], {'id': 1}, '1', None):
+        resposta = cliente.put('/api/modules/1/grades', json=[dict(linhas[0], enrollment_id=invalido)])
+        assert resposta.status_code == 400
+    assert cliente.put('/api/modules/1/grades', json=[linhas[0], 'texto']).status_code == 400
+
+
+def test_fila_de_escrita_agrupa_commits(cliente):
+    aplicacao.app.config['WRITE_QUEUE'] = True
+    lotes, tarefas = aplicacao.fila_escrita.lotes, aplicacao.fila_escrita.tarefas
+
+    def gravar(cursor, indice):
+        if indice == 3:
+            raise ValueError('falha isolada')
+        cursor.execute('UPDATE Grades SET absences = ? WHERE enrollment_id = 1', (indice,))
+        return indice
+
+    resultados = {}
+
+    def enviar(indice):
+        try:
+            resultados[indice] = aplicacao.executar_escrita(gravar, indice)
+        except ValueError as e:
+            resultados[indice] = str(e)
+
+    threads = [aplicacao.threading.Thread(target=enviar, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert resultados[3] == 'falha isolada'
+    assert all(resultados[i] == i for i in range(20) if i != 3)
+    assert aplicacao.fila_escrita.tarefas - tarefas == 20
+    assert aplicacao.fila_escrita.lotes - lotes <= 20
+
+    login(cliente, 'prof1', 'prof123')
+    notas = {'tutor_grade': 6, 'regular_exam_grade': 6, 'makeup_exam_grade': 0, 'final_grade': 6, 'absences': 4}
+    assert cliente.put('/api/grades/1', json=notas).status_code == 200
+    aluno = cliente.get('/api/modules/1/students').get_json()[0]
+    assert (aluno['enrollment_id'], aluno['absences']) == (1, 4)
+
+
+def test_metricas_prometheus(cliente):
+    aplicacao.metricas.limpar()
+    login(cliente, 'prof1', 'prof123')
+    assert cliente.get('/api/modules/1/students').status_code == 200
+    cliente.get('/rota-inexistente')
+
+    texto = cliente.get('/metrics').get_data(as_text=True)
+    assert 'app_http_request_duration_seconds_count{endpoint="api_module_students",method="GET"} 1' in texto
+    assert 'app_http_requests_total{endpoint="nao_encontrado",method="GET",status="404"} 1' in texto
+    consultas = [linha for linha in texto.splitlines() if linha.startswith('app_sql_queries_total{endpoint="api_module_students"}')]
+    assert consultas and int(consultas[0].split()[-1]) >= 1
+
+    # Sem token, só o localhost ou um admin
+    externo = {'REMOTE_ADDR': '203.0.113.7'}
+    assert cliente.get('/metrics', environ_base=externo).status_code == 403
+
+    aplicacao.app.config['METRICS_TOKEN'] = 'segredo'
+    try:
+        assert cliente.get('/metrics').status_code == 403
+        assert cliente.get('/metrics', headers={'Authorization': 'Bearer segredo'}, environ_base=externo).status_code == 200
+        login(cliente, 'admin', 'admin123')
+        assert cliente.get('/metrics', environ_base=externo).status_code == 200
+    finally:
+        aplicacao.app.config['METRICS_TOKEN'] = None
+
+
+def test_log_de_consultas_lentas(cliente):
+    login(cliente, 'prof1', 'prof123')
+    aplicacao.app.config['SLOW_QUERY_MS'] = 0
+    try:
+        assert cliente.get('/api/professor/students').status_code == 200
+        cliente.get('/api/professor/students')
+    finally:
+        aplicacao.app.config['SLOW_QUERY_MS'] = 100
+
+    consultas = aplicacao.ler_consultas_lentas()
+    alunos = [c for c in consultas if 'api_professor_students' in c['endpoints'] and 'FROM Students' in c['sql']]
+    assert alunos and alunos[0]['count'] >= 2
+    assert alunos[0]['plan'] and alunos[0]['params'] == ['int']
+
+    login(cliente, 'admin', 'admin123')
+    resposta = cliente.get('/admin/slow-queries')
+    assert resposta.status_code == 200
+    assert 'FROM Students' in resposta.get_data(as_text=True)
+
+
+def test_gerador_de_dados_sinteticos(tmp_path):
+    from gerar_dados import gerar_dados
+
+    contagens = gerar_dados(str(tmp_path / 'a.db'), periodos=2, professores=3, modulos_por_professor=2,
+                            alunos_por_periodo=40, densidade=0.5, semente=7)
+    assert (contagens['AcademicPeriods'], contagens['Modules'], contagens['Students']) == (2, 6, 80)
+    assert 0 < contagens['Enrollments'] == contagens['Grades'] < 6 * 40
+    assert gerar_dados(str(tmp_path / 'b.db'), periodos=2, professores=3, modulos_por_professor=2,
+                       alunos_por_periodo=40, densidade=0.5, semente=7) == contagens
+
+    conn = aplicacao.sqlite3.connect(tmp_path / 'a.db')
+    assert conn.execute('''
+        SELECT COUNT(*) FROM Modules m
+        WHERE student_count != (SELECT COUNT(*) FROM Enrollments e WHERE e.module_id = m.id)
+    ''').fetchone()[0] == 0
+    conn.close()
+
+
+def test_logs_estruturados_com_amostragem(cliente):
+    registros = []
+    coletor = aplicacao.logging.Handler()
+    coletor.emit = registros.append
+    handlers = aplicacao.ouvinte_logs.handlers
+    aplicacao.ouvinte_logs.handlers = handlers + (coletor,)
+    aplicacao.log.setLevel('DEBUG')
+    try:
+        login(cliente, 'prof1', 'prof123')
+        resposta = cliente.get('/api/professor/periods', headers={'X-Request-ID': 'req-1'})
+        assert resposta.headers['X-Request-ID'] == 'req-1'
+        aplicacao.app.config['LOG_SAMPLE_RATES'] = {'api_professor_periods': 0}
+        resposta = cliente.get('/api/professor/periods', headers={'X-Request-ID': 'req-2'})
+        assert resposta.status_code == 200
+        aplicacao.esvaziar_logs()
+    finally:
+        aplicacao.app.config['LOG_SAMPLE_RATES'] = {}
+        aplicacao.log.setLevel(aplicacao.app.config['LOG_LEVEL'])
+        aplicacao.ouvinte_logs.handlers = handlers
+
+    rota = [r for r in registros if getattr(r, 'endpoint', None) == 'api_professor_periods']
+    assert rota and {r.request_id for r in rota} == {'req-1'}
+    linha = aplicacao.json.loads(aplicacao.FormatadorJSON().format(rota[0]))
+    assert linha['level'] == 'DEBUG' and linha['request_id'] == 'req-1' and linha['user_id'] == 3
+
+
+def test_permissoes_em_cache(cliente):
+    login(cliente, 'prof1', 'prof123')
+    aplicacao.cache_acl.limpar()
+    with aplicacao.app.test_request_context('/'):
+        aplicacao.session.update(user_id=3, user_role='professor')
+        permissoes = aplicacao.permissoes_usuario()
+        assert {1, 3} <= permissoes['modulos'] and 2 not in permissoes['modulos']
+        assert aplicacao.permissoes_usuario() is permissoes
+
+        # Escrita registrada neste processo invalida a entrada
+        aplicacao.registrar_escrita('Modules')
+        assert aplicacao.permissoes_usuario() is not permissoes
+
+        # Módulo criado por fora (outro worker): a negação recarrega a entrada
+        conn = aplicacao.sqlite3.connect(aplicacao.app.config['DATABASE'])
+        novo = conn.execute("""
+            INSERT INTO Modules (name, code, professor_id, academic_period_id) VALUES ('ACL', 'ACL1', 3, 1)
+        """).lastrowid
+        conn.commit()
+        conn.close()
+        assert aplicacao.tem_acesso('modulos', novo)
+
+        # Negações sem escrita nova não recarregam as permissões
+        falhas = aplicacao.cache_acl.falhas
+        for _ in range(5):
+            assert not aplicacao.tem_acesso('modulos', 999999)
+        assert aplicacao.cache_acl.falhas == falhas
+
+        conn = aplicacao.sqlite3.connect(aplicacao.app.config['DATABASE'])
+        conn.execute('DELETE FROM Modules WHERE id = ?', (novo,))
+        conn.commit()
+        conn.close()
+        aplicacao.registrar_escrita('Modules')
+
+    assert cliente.get('/api/modules/1/students').status_code == 200
+    assert cliente.get('/api/modules/999999/students').status_code == 403
+    assert cliente.put('/api/grades/999999', json={}).status_code == 403
+
+    # Permissões de coordenador não dependem de Enrollments nem carregam matrículas
+    with aplicacao.app.test_request_context('/'):
+        aplicacao.session.update(user_id=2, user_role='coordinator')
+        permissoes = aplicacao.permissoes_usuario()
+        assert 'matriculas' not in permissoes
+        aplicacao.registrar_escrita('Enrollments')
+        assert aplicacao.permissoes_usuario() is permissoes
+
+
+def test_bloqueio_de_login_e_fila_de_verificacao(cliente):
+    aplicacao.tentativas_login.limpar()
+    limite = aplicacao.app.config['LOGIN_MAX_FAILURES']
+    for _ in range(limite):
+        assert login(cliente, 'prof1', 'errada').status_code == 200
+    # Bloqueado: nem a senha correta é verificada
+    recusadas = aplicacao.verificador_senhas.recusadas
+    resposta = login(cliente, 'PROF1', 'prof123')
+    assert resposta.status_code == 429
+    assert int(resposta.headers['Retry-After']) > 0
+    assert cliente.get('/api/modulos').status_code == 302
+    # Outro usuário do mesmo IP continua entrando
+    assert login(cliente, 'prof2', 'prof123').status_code == 302
+
+    # Fila cheia: recusa imediata sem verificar a senha
+    aplicacao.app.config['LOGIN_MAX_PENDING'], maximo = 0, aplicacao.app.config['LOGIN_MAX_PENDING']
+    try:
+        resposta = login(cliente, 'prof2', 'prof123')
+        assert resposta.status_code == 503
+        assert aplicacao.verificador_senhas.recusadas == recusadas + 1
+    finally:
+        aplicacao.app.config['LOGIN_MAX_PENDING'] = maximo
+
+    aplicacao.tentativas_login.limpar()
+    assert login(cliente, 'prof1', 'prof123').status_code == 302
+
+    # Bloqueio por IP: desligado por padrão, já que todos os clientes podem chegar pelo mesmo endereço
+    for nome in ('x1', 'x2', 'x3'):
+        login(cliente, nome, 'errada')
+    assert login(cliente, 'prof2', 'prof123').status_code == 302
+    aplicacao.app.config['LOGIN_MAX_FAILURES_IP'] = 3
+    try:
+        for nome in ('x1', 'x2', 'x3'):
+            login(cliente, nome, 'errada')
+        assert login(cliente, 'prof2', 'prof123').status_code == 429
+    finally:
+        aplicacao.app.config['LOGIN_MAX_FAILURES_IP'] = 0
+        aplicacao.tentativas_login.limpar()
+
+
+def test_login_e_versoes_nao_usam_a_conexao_de_escrita(cliente, monkeypatch):
+    def escrita():
+        raise AssertionError('conexão de escrita usada em uma leitura')
+
+    monkeypatch.setattr(aplicacao.obter_pool(), 'escrita', escrita)
+    aplicacao.tentativas_login.limpar()
+    assert login(cliente, 'prof1', 'prof123').status_code == 302
+    with aplicacao.app.test_request_context('/api/grades/1', method='PUT'):
+        assert aplicacao.versoes_bd(aplicacao.TABELAS_ACL['professor'])
+
+
+def test_verificacao_esgotada_mantem_vaga_ate_terminar(monkeypatch):
+    verificador = aplicacao.VerificadorSenhas()
+    futuro = aplicacao.Future()
+    futuro.set_running_or_notify_cancel()
+
+    class Executor:
+        def submit(self, *args):
+            return futuro
+
+    monkeypatch.setitem(aplicacao.app.config, 'LOGIN_WORKERS', 1)
+    monkeypatch.setitem(aplicacao.app.config, 'LOGIN_TIMEOUT', 0.01)
+    monkeypatch.setattr(verificador, '_garantir_pool', lambda: Executor())
+    assert verificador.verificar('hash', 'senha') is None
+    # A verificação ainda roda no pool: a vaga só volta quando ela termina
+    assert verificador.pendentes == 1
+    futuro.set_result(False)
+    assert verificador.pendentes == 0
+
+
+def test_etag_e_304_pelas_versoes_das_tabelas(cliente):
+    login(cliente, 'prof1', 'prof123')
+    resposta = cliente.get('/api/modulos')
+    etag = resposta.headers['ETag']
+    assert resposta.status_code == 200 and etag.startswith('W/')
+    assert resposta.headers['Cache-Control'] == 'private, no-cache'
+
+    # 304 sem corpo e só com a consulta das versões
+    consultas = aplicacao.metricas.sql['api_modulos'][0]
+    resposta = cliente.get('/api/modulos', headers={'If-None-Match': etag})
+    assert resposta.status_code == 304 and resposta.data == b''
+    assert resposta.headers['ETag'] == etag
+    assert aplicacao.metricas.sql['api_modulos'][0] == consultas + 1
+
+    # A query string e o usuário fazem parte do ETag
+    assert cliente.get('/api/modulos?limit=1', headers={'If-None-Match': etag}).status_code == 200
+    login(cliente, 'prof2', 'prof123')
+    assert cliente.get('/api/modulos', headers={'If-None-Match': etag}).status_code == 200
+
+    # Escrita feita por outra conexão (outro processo) muda o ETag via triggers
+    login(cliente, 'prof1', 'prof123')
+    conn = aplicacao.sqlite3.connect(aplicacao.app.config['DATABASE'])
+    conn.execute("UPDATE Users SET full_name = full_name WHERE username = 'prof1'")
+    conn.commit()
+    conn.close()
+    resposta = cliente.get('/api/modulos', headers={'If-None-Match': etag})
+    assert resposta.status_code == 200 and resposta.headers['ETag'] != etag
+
+
+def test_dados_de_referencia_e_bootstrap(cliente):
+    cliente.get('/logout')
+    assert cliente.get('/api/professors').status_code == 302
+
+    login(cliente, 'coord1', 'coord123')
+    pagina = cliente.get('/coordinator/periods').get_data(as_text=True)
+    url = pagina.split('window.URL_BOOTSTRAP = "')[1].split('"')[0]
+    resposta = cliente.get(url)
+    assert resposta.headers['Cache-Control'] == 'private, max-age=31536000, immutable'
+    dados = resposta.get_json()
+    assert {'professors', 'periods'} == set(dados)
+    assert cliente.get('/api/bootstrap').headers['Cache-Control'] == 'private, no-cache'
+
+    # Sem escritas, nenhuma consulta; a lista antiga vem dos mesmos dados
+    consultas = aplicacao.metricas.sql.get('api_professors', [0])[0]
+    assert cliente.get('/api/professors').get_json() == dados['professors']
+    assert aplicacao.metricas.sql.get('api_professors', [0])[0] == consultas
+
+    # /api/periods tem uma única rota: a lista completa do admin
+    assert [r.endpoint for r in aplicacao.app.url_map.iter_rules() if r.rule == '/api/periods'] == ['api_periods']
+    assert cliente.get('/api/periods').status_code == 302
+
+    login(cliente, 'admin', 'admin123')
+    assert 'coordinators' in cliente.get('/api/bootstrap').get_json()
+    assert {p['coordinator_name'] for p in cliente.get('/api/periods').get_json()}
+    cliente.post('/api/users', json={'username': 'ref1', 'password': 'x', 'role': 'professor',
+                                     'full_name': 'Referência Nova', 'email': 'ref1@escola.com'})
+    professores = {p['full_name']: p['id'] for p in cliente.get('/api/bootstrap').get_json()['professors']}
+    assert 'Referência Nova' in professores
+    cliente.delete(f"/api/users/{professores['Referência Nova']}")
+
+    # Escrita de outro processo: vista na próxima verificação de TableVersions
+    conn = aplicacao.sqlite3.connect(aplicacao.app.config['DATABASE'])
+    conn.execute("UPDATE AcademicPeriods SET name = name || ' (editado)' WHERE id = 1")
+    conn.commit()
+    verificacao = aplicacao.app.config['REFERENCE_CHECK_SECONDS']
+    aplicacao.app.config['REFERENCE_CHECK_SECONDS'] = 0
+    try:
+        assert any(p['name'].endswith('(editado)') for p in cliente.get('/api/bootstrap').get_json()['periods'])
+    finally:
+        aplicacao.app.config['REFERENCE_CHECK_SECONDS'] = verificacao
+        conn.execute("UPDATE AcademicPeriods SET name = replace(name, ' (editado)', '') WHERE id = 1")
+        conn.commit()
+        conn.close()
+
+
+def test_regras_e_recalculo_das_notas_finais(cliente):
+    login(cliente, 'prof1', 'prof123')
+    alunos = cliente.get('/api/modules/1/students').get_json()
+    e1, e2 = alunos[0]['enrollment_id'], alunos[1]['enrollment_id']
+    resposta = cliente.put(f'/api/grades/{e1}', json={'tutor_grade': 8, 'regular_exam_grade': 5, 'makeup_exam_grade': 7,
+                                                     'final_grade': 10, 'absences': 0})
+    # A final enviada é ignorada: pelas regras padrão vale a maior entre regular e recuperação
+    assert resposta.get_json()['final_grade'] == 7.0
+    resposta = cliente.put(f'/api/grades/{e2}', json={'tutor_grade': 9, 'regular_exam_grade': 9, 'makeup_exam_grade': 0,
+                                                     'final_grade': 10, 'absences': 11})
+    assert resposta.get_json()['final_grade'] == 9.0
+
+    # Valores inválidos ou fora da escala: 400, nada é gravado
+    validas = {'tutor_grade': 1, 'regular_exam_grade': 1, 'makeup_exam_grade': 0, 'absences': 0}
+    for invalida in ({'tutor_grade': 'abc'}, {'regular_exam_grade': 11}, {'makeup_exam_grade': -1},
+                     {'absences': -2}, {'absences': [1]}, {'absences': 2.7}, {'absences': True}, {'tutor_grade': None}):
+        assert cliente.put(f'/api/grades/{e1}', json=dict(validas, **invalida)).status_code == 400
+    assert cliente.put(f'/api/grades/{e1}', json={'tutor_grade': 1}).status_code == 400
+    assert cliente.put(f'/api/grades/{e1}', data='x', content_type='application/json').status_code == 400
+    assert finais_do_modulo(1)[e1] == 7.0
+
+    login(cliente, 'coord1', 'coord123')
+    assert cliente.get('/api/periods/1/grading-rules').get_json() == aplicacao.REGRAS_NOTAS_PADRAO
+    assert cliente.put('/api/periods/1/grading-rules', json={'makeup_policy': 'x'}).status_code == 400
+    for invalida in ({'rounding_step': float('nan')}, {'absence_grade_cap': float('inf')}, {'makeup_policy': ['max']},
+                     {'tutor_weight': True}, {'rounding_step': 'abc'}):
+        resposta = cliente.put('/api/periods/1/grading-rules', data=aplicacao.json.dumps(invalida),
+                               content_type='application/json')
+        assert resposta.status_code == 400
+    assert cliente.put('/api/periods/999/grading-rules', json={}).status_code == 403
+
+    regras = {'tutor_weight': 0.5, 'makeup_policy': 'replace', 'absence_grade_cap': 3, 'rounding_step': 0.5}
+    resposta = cliente.put('/api/periods/1/grading-rules', json=regras)
+    assert resposta.status_code == 200 and resposta.get_json()['recalculated'] > 0
+    finais = finais_do_modulo(1)
+    # 0.5 * 8 + 0.5 * 7 = 7.5; e2 passou de max_absences (10) e fica limitada a 3
+    assert finais[e1] == 7.5 and finais[e2] == 3.0
+    assert all(round(f * 2) == f * 2 for f in finais.values())
+
+    login(cliente, 'prof1', 'prof123')
+    # Faltas lançadas pela rota de faltas também passam pelo teto
+    url = f"/api/professor/students/{alunos[0]['id']}/absences"
+    resposta = cliente.put(url, json={'absences': 50, 'module_id': 1})
+    assert resposta.get_json()['results'] == [{'enrollment_id': e1, 'final_grade': 3.0}]
+    assert finais_do_modulo(1)[e1] == 3.0
+    assert cliente.put(url, json={'absences': 0, 'module_id': 1}).get_json()['results'][0]['final_grade'] == 7.5
+    # Faltas precisam ser inteiras e >= 0, nas três rotas
+    for invalida in ('abc', [1], -5, 2.7, True, None):
+        assert cliente.put(url, json={'absences': invalida, 'module_id': 1}).status_code == 400
+    assert cliente.put(url, json={'absences': 1, 'module_id': [1]}).status_code == 400
+    assert cliente.put(url, json={'absences': 2.0, 'module_id': 1}).status_code == 200
+    assert cliente.put(url, json={'absences': 0, 'module_id': 1}).status_code == 200
+    assert cliente.post('/api/modules/1/grades/recalculate').get_json()['recalculated'] == 0
+    assert cliente.post('/api/modules/2/grades/recalculate').status_code == 403
+
+    login(cliente, 'coord1', 'coord123')
+    cliente.put('/api/periods/1/grading-rules', json={})
+    assert finais_do_modulo(1)[e1] == 7.0
+
+
+def finais_do_modulo(module_id):
+    conn = aplicacao.sqlite3.connect(aplicacao.app.config['DATABASE'])
+    finais = dict(conn.execute('''
+        SELECT e.id, g.final_grade FROM Enrollments e JOIN Grades g ON g.enrollment_id = e.id WHERE e.module_id = ?
+    ''', (module_id,)))
+    conn.close()
+    return finais
+
+
+def test_recalculo_grande_pausa_triggers_sem_ddl(cliente, monkeypatch):
+    monkeypatch.setattr(aplicacao, 'LOTE_RECALCULO', 10)
+    conn = aplicacao.sqlite3.connect(aplicacao.app.config['DATABASE'])
+    triggers = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' ORDER BY name").fetchall()
+    login(cliente, 'coord1', 'coord123')
+    try:
+        resposta = cliente.put('/api/periods/1/grading-rules', json={'tutor_weight': 0.5})
+        assert resposta.get_json()['recalculated'] > 10
+        # Os triggers não foram recriados e a pausa não sobrou
+        assert conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' ORDER BY name").fetchall() == triggers
+        assert conn.execute('SELECT COUNT(*) FROM TriggerPauses').fetchone()[0] == 0
+        # O histograma refeito no fim bate com as notas
+        faixa = aplicacao.FAIXA_NOTA_SQL.format('g.final_grade')
+        esperado = conn.execute(f'''
+            SELECT e.module_id, {faixa}, COUNT(*) FROM Grades g JOIN Enrollments e ON g.enrollment_id = e.id
+            GROUP BY 1, 2 ORDER BY 1, 2
+        ''').fetchall()
+        assert conn.execute('SELECT module_id, bucket, students FROM GradeSummary WHERE students > 0 ORDER BY 1, 2').fetchall() == esperado
+    finally:
+        cliente.put('/api/periods/1/grading-rules', json={})
+        conn.close()
+
+
+def test_analise_de_notas_pelo_histograma(cliente):
+    login(cliente, 'prof1', 'prof123')
+    alunos = cliente.get('/api/modules/1/students').get_json()
+    cliente.put(f"/api/grades/{alunos[0]['enrollment_id']}", json={'tutor_grade': 10, 'regular_exam_grade': 10,
+                                                                   'makeup_exam_grade': 0, 'absences': 0})
+    finais = [f if f is not None else 0 for f in finais_do_modulo(1).values()]
+    analise = cliente.get('/api/analytics/modules/1').get_json()
+    assert analise['students'] == len(finais)
+    assert analise['passed'] == sum(f >= 7.0 for f in finais)
+    assert analise['mean'] == round(sum(int(f * 10 + 1e-9) / 10 for f in finais) / len(finais), 2)
+    assert sum(analise['distribution']) == len(finais) and analise['distribution'][-1] >= 1
+    assert cliente.get('/api/analytics/modules/2').status_code == 403
+    assert cliente.get('/api/analytics/periods/1').status_code == 302
+
+    # O que os triggers mantiveram é igual ao histograma refeito do zero
+    conn = aplicacao.sqlite3.connect(aplicacao.app.config['DATABASE'])
+    conn.execute('DELETE FROM Enrollments WHERE id = ?', (alunos[1]['enrollment_id'],))
+    conn.commit()
+    mantido = conn.execute('SELECT * FROM GradeSummary WHERE students > 0 ORDER BY 1, 2').fetchall()
+    login(cliente, 'admin', 'admin123')
+    assert cliente.post('/api/analytics/rebuild').status_code == 200
+    assert conn.execute('SELECT * FROM GradeSummary ORDER BY 1, 2').fetchall() == mantido
+    conn.close()
+
+    periodo = cliente.get('/api/analytics/periods/1').get_json()
+    assert periodo['summary']['students'] == sum(m['students'] for m in periodo['modules'])
+    assert next(m for m in periodo['modules'] if m['module_id'] == 1)['students'] == len(finais) - 1
+    assert cliente.get('/api/analytics/periods/999').status_code == 404
+
+
+def test_indice_de_risco_por_faltas(cliente):
+    login(cliente, 'prof1', 'prof123')
+    alunos = cliente.get('/api/modules/1/students').get_json()
+    aluno, outro = alunos[2], alunos[3]
+    assert cliente.put(f"/api/professor/students/{aluno['id']}/absences", json={'absences': 20, 'module_id': 1}).status_code == 200
+    assert cliente.put(f"/api/professor/students/{outro['id']}/absences", json={'absences': 15, 'module_id': 1}).status_code == 200
+    assert cliente.put(f"/api/professor/students/{aluno['id']}/absences", json={'absences': 1, 'module_id': 2}).status_code == 403
+    modulos = cliente.get(f"/api/professor/students/{aluno['id']}/absences").get_json()['modules']
+    assert (modulos[0]['module_id'], modulos[0]['absences'], modulos[0]['ratio']) == (1, 20, 2.0)
+
+    login(cliente, 'coord1', 'coord123')
+    # Os dados de exemplo têm no máximo 8 faltas: as duas matrículas acima lideram a lista
+    resposta = cliente.get('/api/periods/1/at-risk?limit=1')
+    risco = resposta.get_json()
+    assert (risco[0]['enrollment_id'], risco[0]['ratio'], risco[0]['student_name']) == (aluno['enrollment_id'], 2.0, aluno['full_name'])
+    seguinte = cliente.get(f"/api/periods/1/at-risk?limit=1&after={resposta.headers['X-Next-Cursor']}").get_json()
+    assert (seguinte[0]['enrollment_id'], seguinte[0]['ratio']) == (outro['enrollment_id'], 1.5)
+    assert all(linha['ratio'] >= 0.85 for linha in cliente.get('/api/periods/1/at-risk?min_ratio=0.85').get_json())
+    assert cliente.get('/api/periods/999/at-risk').status_code == 403
+
+    # Limite do módulo alterado direto no banco: o trigger refaz as razões, igual a uma reconstrução
+    conn = aplicacao.sqlite3.connect(aplicacao.app.config['DATABASE'])
+    conn.execute('UPDATE Modules SET max_absences = 40 WHERE id = 1')
+    conn.commit()
+    assert cliente.get('/api/periods/1/at-risk?module_id=1&min_ratio=0').get_json()[0]['ratio'] == 0.5
+    mantido = conn.execute('SELECT * FROM AbsenceRisk ORDER BY enrollment_id').fetchall()
+    aplicacao.reconstruir_risco_faltas(conn.cursor())
+    assert conn.execute('SELECT * FROM AbsenceRisk ORDER BY enrollment_id').fetchall() == mantido
+    conn.execute('UPDATE Modules SET max_absences = 10 WHERE id = 1')
+    conn.commit()
+    conn.close()
+
+
+def test_busca_textual_de_alunos(cliente):
+    login(cliente, 'admin', 'admin123')
+    assert cliente.get('/api/students/search?q=*"').status_code == 400
+    # Sem acento e por prefixo, casando com referral_info
+    encontrados = cliente.get('/api/students/search?q=acompanhamento medi').get_json()
+    assert [aluno['student_number'] for aluno in encontrados] == ['20241005']
+    resposta = cliente.get('/api/students/search?q=2024100&limit=2')
+    pagina = resposta.get_json()
+    seguinte = cliente.get(f"/api/students/search?q=2024100&limit=2&after={resposta.headers['X-Next-Cursor']}").get_json()
+    assert len(pagina) == len(seguinte) == 2 and not {a['id'] for a in pagina} & {a['id'] for a in seguinte}
+
+    # Os triggers acompanham inclusão, alteração e exclusão; sem matrícula, o professor não vê o aluno
+    conn = aplicacao.sqlite3.connect(aplicacao.app.config['DATABASE'])
+    conn.execute('''INSERT INTO Students (student_number, full_name, academic_period_id, enrollment_date, observations)
+                    VALUES ('99000001', 'Zeferino Avulso', 1, '2024-02-01', 'Transferência pendente')''')
+    conn.commit()
+    assert [a['full_name'] for a in cliente.get('/api/students/search?q=transferencia').get_json()] == ['Zeferino Avulso']
+    login(cliente, 'coord1', 'coord123')
+    assert len(cliente.get('/api/students/search?q=zefer&period_id=1').get_json()) == 1
+    login(cliente, 'prof1', 'prof123')
+    assert cliente.get('/api/students/search?q=zefer').get_json() == []
+    assert len(cliente.get('/api/students/search?q=Fernanda').get_json()) == 1
+
+    conn.execute("UPDATE Students SET observations = 'Documentação entregue' WHERE student_number = '99000001'")
+    conn.commit()
+    login(cliente, 'admin', 'admin123')
+    assert cliente.get('/api/students/search?q=transferencia').get_json() == []
+    conn.execute("DELETE FROM Students WHERE student_number = '99000001'")
+    conn.commit()
+    conn.close()
+    assert cliente.get('/api/students/search?q=documentacao').get_json() == []
+
+
+def proximo_evento(partes):
+    """Próximo evento do stream SSE, pulando heartbeats: (id, tipo, dados)"""
+    for parte in partes:
+        campos = dict(linha.split(': ', 1) for linha in parte.decode().splitlines() if linha and not linha.startswith(':'))
+        if 'event' in campos:
+            return int(campos['id']), campos['event'], json.loads(campos['data'])
+
+
+def test_stream_de_eventos_do_periodo(cliente, monkeypatch):
+    monkeypatch.setitem(aplicacao.app.config, 'STREAM_HEARTBEAT', 0.05)
+    login(cliente, 'coord1', 'coord123')
+    stream = cliente.get('/api/stream/periods/1', buffered=False)
+    assert stream.mimetype == 'text/event-stream'
+    partes = iter(stream.response)
+    assert next(partes).startswith(b'retry: ')
+
+    professor = aplicacao.app.test_client()
+    login(professor, 'prof1', 'prof123')
+    matricula = professor.get('/api/modules/1/students').get_json()[0]['enrollment_id']
+    professor.put(f'/api/grades/{matricula}', json={'tutor_grade': 6, 'regular_exam_grade': 6,
+                                                    'makeup_exam_grade': 0, 'absences': 1})
+    id_evento, tipo, dados = proximo_evento(partes)
+    assert (tipo, dados['module_id'], dados['enrollments']) == ('grades', 1, [matricula])
+
+    # Reconexão com Last-Event-ID: o evento perdido é repassado antes dos novos
+    stream.close()
+    stream = cliente.get('/api/stream/periods/1', headers={'Last-Event-ID': str(id_evento - 1)}, buffered=False)
+    assert proximo_evento(iter(stream.response)) == (id_evento, tipo, dados)
+    stream.close()
+    assert aplicacao.difusor.estatisticas()['clientes'] == 0
+
+    # Cliente que não lê é expulso quando a fila enche
+    assinatura = aplicacao.difusor.assinar(1)
+    limite = aplicacao.app.config['STREAM_BUFFER']
+    aplicacao.difusor.distribuir([(i, 1, 'grades', '{}') for i in range(limite + 1)])
+    assert assinatura.expulsa and aplicacao.difusor.estatisticas()['clientes'] == 0
+
+    monkeypatch.setitem(aplicacao.app.config, 'STREAM_MAX_CLIENTS', 0)
+    assert cliente.get('/api/stream/periods/1').status_code == 503
+    assert cliente.get('/api/stream/periods/999').status_code == 403
+
+
+def test_stream_ignora_eventos_gravados_sem_assinantes(cliente, monkeypatch):
+    monkeypatch.setitem(aplicacao.app.config, 'STREAM_HEARTBEAT', 0.05)
+    monkeypatch.setitem(aplicacao.app.config, 'STREAM_POLL_SECONDS', 0.05)
+    assert aplicacao.difusor.estatisticas()['clientes'] == 0
+    conn = aplicacao.sqlite3.connect(aplicacao.app.config['DATABASE'])
+    conn.executemany("INSERT INTO ChangeEvents (academic_period_id, kind, data) VALUES (1, 'grades', '{}')",
+                     [()] * (aplicacao.app.config['STREAM_BUFFER'] + 50))
+    conn.commit()
+    conn.close()
+    aplicacao.time.sleep(0.2)
+
+    expulsos = aplicacao.difusor.estatisticas()['expulsos']
+    login(cliente, 'coord1', 'coord123')
+    stream = cliente.get('/api/stream/periods/1', buffered=False)
+    partes = iter(stream.response)
+    next(partes)
+    aplicacao.difusor.acordar()
+    aplicacao.time.sleep(0.2)
+
+    professor = aplicacao.app.test_client()
+    login(professor, 'prof1', 'prof123')
+    matricula = professor.get('/api/modules/1/students').get_json()[0]['enrollment_id']
+    professor.put(f'/api/grades/{matricula}', json={'tutor_grade': 6, 'regular_exam_grade': 6,
+                                                    'makeup_exam_grade': 0, 'absences': 1})
+    # O primeiro evento recebido é o novo; os antigos não encheram a fila
+    _, tipo, dados = proximo_evento(partes)
+    assert (tipo, dados['enrollments']) == ('grades', [matricula])
+    assert aplicacao.difusor.estatisticas()['expulsos'] == expulsos
+    stream.close()
+
+
+def test_importar_alunos_csv(cliente):
+    aplicacao.app.config['WRITE_QUEUE'] = True
+    tarefas = aplicacao.fila_escrita.tarefas
+    login(cliente, 'coord1', 'coord123')
+    csv_alunos = (
+        'student_number;full_name;email;enrollment_date;observations\n'
+        '30000001;Importado Um;um@email.com;2024-02-01;\n'
+        '30000002;Importado Dois;;2024-02-01;Transferido\n'
+        '20241001;Já Existe;;2024-02-01;\n'
+        '30000003;;;2024-02-01;\n'
+        '30000004;Data Ruim;;01/02/2024;\n'
+        '30000001;Repetido no Arquivo;;2024-02-01;\n'
+    )
+    resposta = cliente.post('/api/periods/1/students/import', data={
+        'file': (io.BytesIO(csv_alunos.encode()), 'alunos.csv'),
+    }, content_type='multipart/form-data')
+    assert resposta.status_code == 201
+    dados = resposta.get_json()
+    assert dados['imported'] == 2
+    assert dados['enrollments_created'] == 2 * 5
+    assert sorted(erro['line'] for erro in dados['errors']) == [4, 5, 6, 7]
+    # Toda a importação é uma única tarefa da fila de escrita
+    assert aplicacao.fila_escrita.tarefas - tarefas == 1
+
+    alunos = cliente.get('/api/periods/1/students').get_json()
+    assert {'Importado Um', 'Importado Dois'} <= {a['full_name'] for a in alunos}
+
+    resposta = cliente.post('/api/periods/1/students/import', data={
+        'file': (io.BytesIO(b'nome,email\nx,y\n'), 'alunos.csv'),
+    }, content_type='multipart/form-data')
+    assert resposta.status_code == 400
+
+
+def test_exportar_boletim_csv_e_xlsx(cliente):
+    login(cliente, 'coord1', 'coord123')
+    resposta = cliente.get('/api/periods/1/gradebook.csv')
+    assert resposta.status_code == 200
+    linhas = list(csv.reader(io.StringIO(resposta.get_data(as_text=True).lstrip('\ufeff'))))
+    assert linhas[0][:4] == ['student_number', 'full_name', 'CIE101 final_grade', 'CIE101 absences']
+    alunos = cliente.get('/api/periods/1/students').get_json()
+    assert len(linhas) == 1 + len(alunos)
+
+    resposta = cliente.get('/api/periods/1/gradebook.xlsx')
+    assert resposta.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(resposta.get_data())) as pacote:
+        planilha = ElementTree.fromstring(pacote.read('xl/worksheets/sheet1.xml'))
+    assert len(planilha.findall('.//{*}row')) == len(linhas)
+
+    assert cliente.get('/api/periods/1/gradebook.pdf').status_code == 404
+
+    login(cliente, 'prof2', 'prof123')
+    assert cliente.get('/api/modules/1/gradebook.csv').status_code == 403
+    resposta = cliente.get('/api/modules/2/gradebook.csv')
+    assert resposta.status_code == 200
+    assert resposta.get_data(as_text=True).lstrip('\ufeff').startswith('student_number,full_name,status,tutor_grade')
+
+
+def test_estaticos_versionados_e_pre_comprimidos(cliente, tmp_path, monkeypatch):
+    assert minificar_js('let a = b / c; // x\nlet r = /\\/\\//g; let s = "// y";\n') == 'let a=b / c;\nlet r=/\\/\\//g;let s="// y";\n'
+
+    destino = tmp_path / 'dist'
+    gerar_estaticos(aplicacao.app.static_folder, str(destino))
+    monkeypatch.setitem(aplicacao.app.config, 'STATIC_DIST', str(destino))
+    login(cliente, 'coord1', 'coord123')
+    pagina = cliente.get('/coordinator/periods').get_data(as_text=True)
+    url = next(u for u in re.findall(r'src="([^"]+)"', pagina) if '/js/main.' in u)
+    assert url.startswith('/static/dist/js/main.') and url.endswith('.js')
+
+    minificado = (destino / url[len('/static/dist/'):]).read_bytes()
+    resposta = cliente.get(url, headers={'Accept-Encoding': 'gzip, br'})
+    assert resposta.headers['Content-Encoding'] == 'br'
+    assert 'immutable' in resposta.headers['Cache-Control'] and resposta.headers['Vary'] == 'Accept-Encoding'
+    assert brotli.decompress(resposta.get_data()) == minificado
+    resposta = cliente.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert gzip.decompress(resposta.get_data()) == minificado
+    resposta = cliente.get(url)
+    assert 'Content-Encoding' not in resposta.headers and resposta.get_data() == minificado
+
+    assert cliente.get('/static/dist/manifest.json').status_code == 404
+    with aplicacao.app.test_request_context():
+        assert aplicacao.url_estatico('js/nao_existe.js') == '/static/js/nao_existe.js'
+
+
+def test_compressao_das_respostas(cliente, monkeypatch):
+    monkeypatch.setitem(aplicacao.app.config, 'COMPRESS_MIN_SIZE', 200)
+    login(cliente, 'admin', 'admin123')
+    usuarios = cliente.get('/api/users').get_json()
+    resposta = cliente.get('/api/users', headers={'Accept-Encoding': 'gzip'})
+    assert resposta.headers['Content-Encoding'] == 'gzip' and 'Accept-Encoding' in resposta.headers['Vary']
+    assert json.loads(gzip.decompress(resposta.get_data())) == usuarios
+    resposta = cliente.get('/api/users', headers={'Accept-Encoding': 'gzip, br'})
+    assert resposta.headers['Content-Encoding'] == 'br'
+    assert json.loads(brotli.decompress(resposta.get_data())) == usuarios
+    monkeypatch.setitem(aplicacao.app.config, 'COMPRESS_MIN_SIZE', 10 ** 6)
+    assert 'Content-Encoding' not in cliente.get('/api/users', headers={'Accept-Encoding': 'br'}).headers
+
+    # Respostas em streaming são comprimidas pedaço a pedaço, qualquer que seja o tamanho
+    login(cliente, 'coord1', 'coord123')
+    corpo = cliente.get('/api/periods/1/students?stream=1').get_data()
+    resposta = cliente.get('/api/periods/1/students?stream=1', headers={'Accept-Encoding': 'br'})
+    assert resposta.headers['Content-Encoding'] == 'br' and brotli.decompress(resposta.get_data()) == corpo
+
+    # Nível da rota: o boletim usa gzip 1 (o cabeçalho gzip marca XFL = 4, compressão mais rápida)
+    corpo = cliente.get('/api/periods/1/gradebook.csv').get_data()
+    resposta = cliente.get('/api/periods/1/gradebook.csv', headers={'Accept-Encoding': 'gzip'})
+    assert gzip.decompress(resposta.get_data()) == corpo and resposta.get_data()[8] == 4
+    assert aplicacao.compressao_respostas.estatisticas()['br']['responses'] >= 2